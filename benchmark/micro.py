@@ -0,0 +1,346 @@
+"""Micro benchmarks comparing each optimized stage against its previous implementation.
+
+Run from the repository root, e.g.
+
+    python -m benchmark.micro properties --path dataset --day 1
+
+Without the Azure trace, benchmark.synthetic writes a trace of the same layout.
+"""
+import argparse
+import os
+import random
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from util.DataLoader import DataLoader
+from util.Properties import PropertyTable
+from util.Series import ExecutionStore
+from util.Simulator import FaasSimulator
+from util.Sampler import PropertySampler, PyRandom
+from util.Manager import FixIntervalsimApp, FixIntervalsimSys, GreedysimSys
+from util.Engine import KeepAlivePolicy
+from util import Metrics
+from benchmark import reference
+
+
+def timeit(func, *args, repeat=1, **kwargs):
+    """run func several times and return its last result with the best wall time
+
+    Returns:
+        list: [result, best time in second]
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        tic = perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, perf_counter() - tic)
+    return [result, best]
+
+
+def report(name, t_old, t_new):
+    print("{:<24} old {:>9.3f}s   new {:>9.3f}s   speedup {:>7.1f}x".format(name, t_old, t_new, t_old / max(t_new, 1e-9)))
+
+
+def same_lists(col_a, col_b) -> bool:
+    """compare two columns of list-valued cells"""
+    return all(np.allclose(np.asarray(a, dtype=float), np.asarray(b, dtype=float), rtol=0, atol=1e-12) 
+               for a, b in zip(col_a, col_b))
+
+
+def bench_properties(path, day, repeat):
+    loader = DataLoader(path=path)
+    [mem_files, dur_files] = loader._DataLoader__get_files()[:2]
+    loader.mem_raw = pd.read_csv(os.path.join(path, mem_files[day-1]))
+    loader.dur_raw = pd.read_csv(os.path.join(path, dur_files[day-1]))
+    
+    [old, t_old] = timeit(reference.gen_properties_iterrows, loader.dur_raw, loader.mem_raw, day, repeat=repeat)
+    [new, t_new] = timeit(loader.build_properties, day, repeat=repeat)
+    
+    old = old.set_index(reference.DATA_INFO_COL[:4]).sort_index()
+    new = new.to_frame()
+    assert old.index.equals(new.index), "properties rows differ"
+    for col in reference.DATA_INFO_COL[4:]:
+        assert same_lists(old[col], new[col]), "properties column {} differs".format(col)
+    report("properties", t_old, t_new)
+
+
+def bench_properties_cache(path, day, repeat):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    json_path = os.path.join(path, "properties_{}.json".format(day))
+    npz_path = os.path.join(path, "properties_{}.npz".format(day))
+    loader.data_info.reset_index().to_json(json_path, orient='index')
+    
+    def load_json():
+        return pd.read_json(json_path).T.set_index(reference.DATA_INFO_COL[:4]).sort_index()
+    
+    [old, t_old] = timeit(load_json, repeat=repeat)
+    [new, t_new] = timeit(PropertyTable.load, npz_path, repeat=repeat)
+    os.remove(json_path)
+    
+    assert old.index.equals(new.to_frame().index), "properties rows differ"
+    report("properties cache", t_old, t_new)
+
+
+
+def bench_invoc_series(path, day, repeat):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader)
+    inv_raw = pd.read_csv(os.path.join(path, loader.inv_files[day-1]))
+    simulator.inv_raw = inv_raw
+    
+    random.seed(day)
+    [old, t_old] = timeit(reference.gen_invoc_series, inv_raw, loader.data_info, day)
+    random.seed(day)
+    simulator.sampler.dur_rng = PyRandom()
+    [_, t_new] = timeit(simulator._FaasSimulator__gen_invoc_series, save=False)
+    new = simulator.exe_raw
+    
+    assert old.index.equals(new.index), "execution series rows differ"
+    assert (old.values == new.values).all(), "execution series differ"
+    report("invocation series", t_old, t_new)
+
+
+
+def bench_exec_cache(path, day, repeat):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=day)
+    simulator.prepare()
+    csv_path = os.path.join(path, "execution_series_{}.csv".format(day))
+    store_path = simulator._FaasSimulator__store_path() # seeds other than 0 have their own store
+    simulator.exe_raw.to_csv(csv_path)
+    [app_ids, _] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    app_ids = app_ids[:max(1, len(app_ids) // 100)]
+    
+    def load_csv():
+        return pd.read_csv(csv_path).set_index(["HashOwner", "HashApp", "HashFunction"])
+    
+    def open_store():
+        return ExecutionStore.open(store_path).read()
+    
+    def read_window(): # 1% of the apps, one hour
+        store = ExecutionStore.open(store_path)
+        rows = np.flatnonzero(np.isin(loader.ids.func_app[loader.ids.encode_funcs(*store.names)], app_ids))
+        return store.read(rows, 600, 660)
+    
+    [old, t_old] = timeit(load_csv, repeat=repeat)
+    [new, t_new] = timeit(open_store, repeat=repeat)
+    [_, t_window] = timeit(read_window, repeat=repeat)
+    print("execution series size   csv {:>9d}B   npy {:>9d}B".format(os.path.getsize(csv_path), os.path.getsize(store_path + ".npy")))
+    os.remove(csv_path)
+    
+    assert (old.values == new).all(), "execution series differ"
+    report("execution series cache", t_old, t_new)
+    report("execution series window", t_old, t_window)
+
+
+def bench_sampling(path, day, repeat, n_sample=100000):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    legacy = reference.LegacySampler(loader.data_info, day)
+    sampler = PropertySampler(loader.properties, loader.ids, seed=day)
+    
+    func_ids = np.random.default_rng(day).integers(len(loader.properties), size=n_sample)
+    func_name = loader.data_info.index.droplevel(0)[func_ids]
+    app_ids = loader.ids.func_app[func_ids]
+    
+    def draw_legacy():
+        return [[legacy.generate_func_dur(name) for name in func_name], 
+                [legacy.generate_app_mem(name[:2]) for name in func_name]]
+    
+    def draw_batch():
+        return [sampler.draw_func_dur(func_ids), sampler.draw_app_mem(app_ids)]
+    
+    # the batch sampler draws the same values as random.choices from the same random numbers
+    random.seed(day)
+    [old, t_old] = timeit(draw_legacy)
+    random.seed(day)
+    rand = PyRandom().random(2 * n_sample)
+    assert np.array_equal(old[0], sampler.draw_func_dur(func_ids, rand[:n_sample])), "duration draws differ"
+    assert np.array_equal(old[1], sampler.draw_app_mem(app_ids, rand[n_sample:])), "memory draws differ"
+    
+    [_, t_new] = timeit(draw_batch, repeat=repeat)
+    report("sampling", t_old, t_new)
+
+
+
+def bench_sys_tick(path, day, repeat, total_mem=8*1024, keep_alive_interval=10):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=day)
+    simulator.prepare()
+    [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    app_mem_list = simulator.sampler.draw_app_mem(app_ids)
+    
+    def run(simSys):
+        exe = app_exe.astype(np.int64)
+        for i in range(exe.shape[1]):
+            simSys.update(exe[:, i])
+        return [simSys.cal_cold_rate(), simSys.cal_mem_waste()]
+    
+    def fix_interval(sys_class):
+        simSys = sys_class(app_ids)
+        simSys.keep_alive_interval = keep_alive_interval
+        return run(simSys)
+    
+    def greedy(sys_class):
+        simSys = sys_class(app_ids, app_mem_list)
+        simSys.total_mem = total_mem
+        return run(simSys)
+    
+    [old, t_old] = timeit(fix_interval, reference.FixIntervalsimSysFrame)
+    [new, t_new] = timeit(fix_interval, FixIntervalsimSys, repeat=repeat)
+    assert old == new, "fixed interval results differ"
+    report("fixed interval tick", t_old / app_exe.shape[1], t_new / app_exe.shape[1])
+    
+    # the priority index breaks ties by app id, compare with the sort using the same ties
+    [_, t_old] = timeit(greedy, reference.GreedysimSysFrame)
+    [old, t_sort] = timeit(greedy, reference.GreedysimSysSort, repeat=repeat)
+    [new, t_new] = timeit(greedy, GreedysimSys, repeat=repeat)
+    assert old == new, "greedy results differ"
+    report("greedy tick", t_old / app_exe.shape[1], t_new / app_exe.shape[1])
+    report("greedy tick (sort)", t_sort / app_exe.shape[1], t_new / app_exe.shape[1])
+
+
+def bench_sweep(path, day, repeat, arg_lst=(0, 2*1024, 8*1024, 32*1024, 128*1024)):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=day)
+    simulator.prepare()
+    [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    app_mem_list = simulator.sampler.draw_app_mem(app_ids)
+    
+    def one_by_one():
+        cold_rate_lst = []
+        mem_rate_lst = []
+        for arg in arg_lst:
+            simSys = reference.GreedysimSysSort(app_ids, app_mem_list)
+            simSys.total_mem = arg
+            exe = app_exe.astype(np.int64)
+            for i in range(exe.shape[1]):
+                simSys.update(exe[:, i])
+            cold_rate_lst.append(simSys.cal_cold_rate())
+            mem_rate_lst.append(simSys.cal_mem_waste())
+        return [cold_rate_lst, mem_rate_lst]
+    
+    def sweep():
+        simSys = GreedysimSys(app_ids, app_mem_list, n_policy=len(arg_lst))
+        simSys.total_mem = list(arg_lst)
+        exe_by_minute = np.ascontiguousarray(app_exe.T)
+        for i in range(exe_by_minute.shape[0]):
+            simSys.update(exe_by_minute[i])
+        return [simSys.cal_cold_rate(), simSys.cal_mem_waste()]
+    
+    [old, t_old] = timeit(one_by_one)
+    [new, t_new] = timeit(sweep, repeat=repeat)
+    assert old == new, "sweep results differ"
+    report("greedy sweep", t_old, t_new)
+
+
+def bench_keep_alive(path, day, repeat, intv_lst=(1, 5, 10, 30, 60, 120, 1440)):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=day)
+    simulator.prepare()
+    [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    
+    def per_app():
+        cold_rate_lst = []
+        mem_rate_lst = []
+        for intv in intv_lst:
+            cold_rate = []
+            mem_rate = []
+            for exec_series in app_exe[:, 1:]:
+                simApp = FixIntervalsimApp(intv, exec_series)
+                if not simApp.never_launch:
+                    cold_rate.append(simApp.cold_start_rate)
+                    mem_rate.append(simApp.mem_waste_rate)
+            cold_rate_lst.append(cold_rate)
+            mem_rate_lst.append(mem_rate)
+        return [cold_rate_lst, mem_rate_lst]
+    
+    def evaluator():
+        simulator.keep_alive_eval = None
+        return simulator.run_app_sweep(intv_lst)
+    
+    [old, t_old] = timeit(per_app)
+    [new, t_new] = timeit(evaluator, repeat=repeat)
+    assert old == new, "keep alive results differ"
+    report("keep alive sweep", t_old, t_new)
+
+
+def bench_events(path, day, repeat, intv_lst=(1, 10, 60)):
+    loader = DataLoader(path=path)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=day)
+    simulator.prepare()
+    [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    
+    def minute_step():
+        simSys = FixIntervalsimSys(app_ids, n_policy=len(intv_lst))
+        simSys.keep_alive_interval = list(intv_lst)
+        exe_by_minute = np.ascontiguousarray(app_exe.T)
+        for i in range(exe_by_minute.shape[0]):
+            simSys.update(exe_by_minute[i])
+        return [simSys.cal_cold_rate(), simSys.cal_mem_waste()]
+    
+    def event_driven():
+        return simulator.run_events([KeepAlivePolicy(intv) for intv in intv_lst])
+    
+    [old, t_old] = timeit(minute_step, repeat=repeat)
+    [new, t_new] = timeit(event_driven, repeat=repeat)
+    assert old == new, "event engine results differ"
+    report("keep alive events", t_old, t_new)
+
+
+def bench_metrics(path, day, repeat, n_policy=8, n_app=50000):
+    # per-app rates of many policies, rounded so that ties are frequent as in the simulation results
+    rng = np.random.default_rng(day)
+    cold_rate_lst = [np.round(rng.beta(0.5, 2, n_app), 3).tolist() for _ in range(n_policy)]
+    mem_rate_lst = [rng.random(n_app).tolist() for _ in range(n_policy)]
+    
+    def legacy():
+        return [reference.cdf_pointer_loop(cold_rate_lst), reference.frontier_deepcopy(mem_rate_lst, cold_rate_lst)]
+    
+    def vectorized():
+        return [Metrics.cdf_lst(cold_rate_lst), Metrics.frontier(cold_rate_lst, mem_rate_lst, 0.75)]
+    
+    [old, t_old] = timeit(legacy)
+    [new, t_new] = timeit(vectorized, repeat=repeat)
+    assert np.array_equal(old[0], new[0]), "CDF differs"
+    assert np.array_equal(old[1], new[1]), "frontier differs"
+    report("metrics", t_old, t_new)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="micro benchmarks of the simulation pipeline")
+    parser.add_argument("stage", choices=["properties", "properties-cache", "invoc-series", "exec-cache", "sampling", "sys-tick", "sweep", "keep-alive", "events", "metrics"])
+    parser.add_argument("--path", default="dataset", help="folder of the Azure Functions trace")
+    parser.add_argument("--day", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    
+    if args.stage == "properties":
+        bench_properties(args.path, args.day, args.repeat)
+    elif args.stage == "properties-cache":
+        bench_properties_cache(args.path, args.day, args.repeat)
+    elif args.stage == "invoc-series":
+        bench_invoc_series(args.path, args.day, args.repeat)
+    elif args.stage == "exec-cache":
+        bench_exec_cache(args.path, args.day, args.repeat)
+    elif args.stage == "sampling":
+        bench_sampling(args.path, args.day, args.repeat)
+    elif args.stage == "sys-tick":
+        bench_sys_tick(args.path, args.day, args.repeat)
+    elif args.stage == "sweep":
+        bench_sweep(args.path, args.day, args.repeat)
+    elif args.stage == "keep-alive":
+        bench_keep_alive(args.path, args.day, args.repeat)
+    elif args.stage == "events":
+        bench_events(args.path, args.day, args.repeat)
+    elif args.stage == "metrics":
+        bench_metrics(args.path, args.day, args.repeat)
@@ -0,0 +1,580 @@
+"""Frozen copies of the previous implementations.
+
+They are only used by the micro benchmarks to check that the new
+implementations give the same results and to measure the speedup.
+"""
+import pandas as pd
+import numpy as np
+import random
+import copy
+from tqdm import tqdm
+
+
+DATA_INFO_COL = ["Day", "HashOwner", "HashApp", "HashFunction", "MemAve", "MemProb", "DurAve", "DurProb"]
+
+
+def cal_distribute(percentile_in) -> list:
+    """calculate probability of each average based on percentile (row by row)
+
+    Args:
+        percentile_in (ndarray): input of percentile size 1x5 (1%, 25%, 50%, 75%, 99%)
+
+    Returns:
+        list: list of average, and list of probability of each average, size [1x4 1x4]
+    """
+    
+    pert_range = np.array([0.24, 0.25, 0.25, 0.24])
+    pert_1 = percentile_in
+    pert_2 =  np.delete(np.append(percentile_in, 0), 0)
+    diff = (pert_2 - pert_1)[:4]
+    if sum(diff) == 0: # filter out zero value data
+        raise ValueError
+    else: # percentile weighted probability
+        non_zero_idx = np.where(diff!=0)[0]
+        diff = diff[non_zero_idx]
+        ave_out = percentile_in[1:][non_zero_idx]
+        pert_range = pert_range[non_zero_idx]
+        prob = np.divide(pert_range, diff) / sum(np.divide(pert_range, diff))
+        
+        return [ave_out, prob]
+
+
+def gen_properties_iterrows(dur_raw, mem_raw, i) -> pd.DataFrame:
+    """iterrows implementation of DataLoader.build_properties
+
+    Args:
+        dur_raw (pd.DataFrame): function duration table of the day
+        mem_raw (pd.DataFrame): app memory table of the day
+        i (int): day
+
+    Returns:
+        pd.DataFrame: properties with columns of DATA_INFO_COL, not indexed
+    """
+    
+    this_day = [[] for _ in range(len(dur_raw))]
+    this_mem_raw = mem_raw.drop_duplicates(subset=["HashOwner", "HashApp"]).set_index(["HashOwner", "HashApp"]) # remove duplicate info
+    with tqdm(total=len(dur_raw)) as pbar:
+        for dur_idx, dur_row in dur_raw.iterrows():
+            pbar.update(1)
+            try:
+                mem_row = this_mem_raw.loc[dur_row["HashOwner"], dur_row["HashApp"]]
+                
+                # calculate duration properties
+                try:      
+                    [dur_ave, dur_prob] = cal_distribute(
+                                            dur_row[["percentile_Average_1",
+                                                    "percentile_Average_25",
+                                                    "percentile_Average_50",
+                                                    "percentile_Average_75",
+                                                    "percentile_Average_99"]].values)
+                except ValueError:
+                    dur_ave = [dur_row["Average"]]
+                    dur_prob = [1.0]
+                
+                # calculate memory properties
+                try:
+                    [mem_ave, mem_prob] = cal_distribute(
+                                        mem_row[["AverageAllocatedMb_pct1",
+                                                "AverageAllocatedMb_pct25",
+                                                "AverageAllocatedMb_pct50",
+                                                "AverageAllocatedMb_pct75",
+                                                "AverageAllocatedMb_pct99"]].values)
+                except ValueError:
+                    mem_ave = [mem_row["AverageAllocatedMb"]]
+                    mem_prob = [1.0]
+                # save all good value to this_day
+                this_day[dur_idx] = (str(i), dur_row["HashOwner"], dur_row["HashApp"], dur_row["HashFunction"], mem_ave, mem_prob, dur_ave, dur_prob)
+            except KeyError:
+                continue
+        this_day = list(filter(None, this_day)) # filter out unused entry
+    
+    return pd.DataFrame(this_day, columns=DATA_INFO_COL).drop_duplicates(subset=DATA_INFO_COL[:4]) # remove duplicate info
+
+
+class LegacySampler():
+    """per-sample random.choices after MultiIndex .loc lookups"""
+    
+    def __init__(self, data_info, day) -> None:
+        self.day = day
+        self.dur_info = data_info.sort_index()[["DurAve", "DurProb"]]
+        self.mem_info = data_info.groupby(["Day", "HashOwner", "HashApp"]).max().sort_index()[["MemAve", "MemProb"]]
+    
+    def generate_func_dur(self, ID_arr):
+        [owner_id, app_id, func_id] = ID_arr
+        DurAve = self.dur_info.loc[(str(self.day), owner_id, app_id, func_id), "DurAve"]
+        DurProb = self.dur_info.loc[(str(self.day), owner_id, app_id, func_id), "DurProb"]
+        return random.choices(DurAve, weights=DurProb, k=1)[0] / 60000.0
+    
+    def generate_app_mem(self, ID_arr):
+        [owner_id, app_id] = ID_arr
+        MemAve = self.mem_info.loc[(str(self.day), owner_id, app_id), "MemAve"]
+        MemProb = self.mem_info.loc[(str(self.day), owner_id, app_id), "MemProb"]
+        return int(random.choices(MemAve, weights=MemProb, k=1)[0])
+
+
+def gen_invoc_series(inv_raw, data_info, day) -> pd.DataFrame:
+    """per-cell .loc implementation of FaasSimulator.__gen_invoc_series, draws from the global random
+
+    Args:
+        inv_raw (pd.DataFrame): invocation table of the day
+        data_info (pd.DataFrame): properties of the day indexed by DATA_INFO_COL[:4]
+        day (int): day
+
+    Returns:
+        pd.DataFrame: execution series indexed by [HashOwner, HashApp, HashFunction]
+    """
+    
+    sampler = LegacySampler(data_info, day)
+    generate_func_dur = sampler.generate_func_dur
+    generate_app_mem = sampler.generate_app_mem
+    
+    invoc_info_col = ["HashOwner", "HashApp", "HashFunction"]
+    inv_tmp = copy.deepcopy(inv_raw).set_index(invoc_info_col).iloc[:, 1:].sort_index()
+    func_name = np.vstack([[inv_tmp.index.get_level_values(0).values, 
+                            inv_tmp.index.get_level_values(1).values, 
+                            inv_tmp.index.get_level_values(2).values]]).T 
+    with tqdm(total=len(func_name)) as pbar:
+        for func_ in func_name:
+            pbar.update(1)
+            
+            try: # skip rows without memory/duration
+                dur = generate_func_dur(ID_arr=func_)
+                mem = generate_app_mem(ID_arr=func_[:2])
+            except KeyError:
+                inv_tmp = inv_tmp.drop(index=(func_[0], func_[1], func_[2]))
+                continue # we do not have info for this func               
+            
+            func_invc_series = inv_tmp.loc[(func_[0], func_[1], func_[2])].values
+            for t, state in enumerate(func_invc_series):
+                if state:
+                    dur = generate_func_dur(ID_arr=func_)
+                    if not dur:
+                        dur = 0.01                        
+                    func_start_time = max(0.01, t + 1 - dur)
+                    exec_time = np.ceil(np.arange(func_start_time, t + 1, 1)).astype(int).astype(str) # the duration of this exec
+                    if dur <= 1: # within 1min: num of invocation+1
+                        inv_tmp.loc[(func_[0], func_[1], func_[2]), exec_time[0]] = state + 1
+                    else:   # func has some duration: first time slot: num of invocation+1; following time slot: 1
+                        inv_tmp.loc[(func_[0], func_[1], func_[2]), exec_time[0]] = state + 1
+                        inv_tmp.loc[(func_[0], func_[1], func_[2]), (x for x in exec_time[1:])] = 1
+    
+    return inv_tmp.sort_index()
+
+
+class FixIntervalsimSysFrame():
+    """sys_monitor DataFrame implementation of FixIntervalsimSys"""
+
+    def __init__(self, app_ids) -> None:
+        # app properties
+        self.column_names = ["AppID",
+                             "state", 
+                             "status", 
+                             "memory", 
+                             "idle_timer",
+                             "never_launch",
+                             "idle_time",
+                             "busy_time", 
+                             "cold_start_count", 
+                             "warm_start_count"]
+        self.sys_monitor = pd.DataFrame(columns=self.column_names)
+        # self.sys_monitor[:] = 0
+        self.app_ids = app_ids
+        self.sys_monitor["AppID"] = app_ids
+        self.sys_monitor = self.sys_monitor.fillna(0)
+        
+        self.sys_monitor = self.sys_monitor.set_index("AppID")
+        self.sys_monitor.loc[:, ("state", "status")] = False
+        self.sys_monitor.loc[:, "never_launch"] = True
+        self.keep_alive_interval = 0
+
+
+    def update(self, exec_now):    
+        # update never launch----------------------------------
+        self.sys_monitor["never_launch"] = ~np.any([~self.sys_monitor["never_launch"].values, exec_now.astype(bool)], axis=0)
+
+        # invocation func ----------------------------------
+        invc_app = (exec_now > 1)
+        # invc_app = (exec_now - 2) == 0
+        # invc_app = (exec_now - 1) == 0
+        self.sys_monitor.loc[invc_app, "status"] = True
+        self.sys_monitor.loc[invc_app, "busy_time"] += 1
+        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+        
+        # warm start invocation func need to be count first
+        warm_app = np.all([self.sys_monitor["state"].values, self.sys_monitor["status"].values], axis=0) & invc_app
+        self.sys_monitor.loc[warm_app, "warm_start_count"] += (exec_now[warm_app] - 1) # -1 is a flag added when generating the exec files
+        
+        # cold start invocation func count then (coz this will change state)
+        cold_app = np.all([~self.sys_monitor["state"].values, self.sys_monitor["status"].values], axis=0) & invc_app
+        self.sys_monitor.loc[cold_app, "state"] = True
+        self.sys_monitor.loc[cold_app, "cold_start_count"] += 1
+        self.sys_monitor.loc[cold_app, "warm_start_count"] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+        
+        # stop idle timeout app --------------------------------
+        timeout_apps = self.sys_monitor["idle_timer"].values >= self.keep_alive_interval
+        self.sys_monitor.loc[timeout_apps, "state"] = False
+        self.sys_monitor.loc[timeout_apps, "idle_timer"] = 0
+        
+        # for those func stop running---------------------------
+        stop_funcs = ~exec_now.astype(bool)
+        self.sys_monitor.loc[stop_funcs, "status"] = False
+        
+        # if app is running
+        idle_apps = np.all([self.sys_monitor["state"].values, ~self.sys_monitor["status"].values], axis=0) & stop_funcs
+        self.sys_monitor.loc[idle_apps, (["idle_time", "idle_timer"])] += 1 
+        
+        # running func ----------------------------------
+        invc_app = (exec_now == 1) 
+        self.sys_monitor.loc[invc_app, "busy_time"] += 1
+        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+        
+        return True
+        
+    def cal_cold_rate(self):
+        launch_func = ~self.sys_monitor["never_launch"].values
+        cold_start_count = self.sys_monitor.loc[launch_func, "cold_start_count"].values
+        # if not len(cold_start_count): cold_start_count = np.array([0])
+        warm_start_count = self.sys_monitor.loc[launch_func, "warm_start_count"].values
+        # if not len(warm_start_count): warm_start_count = np.array([0])
+        valid_idx = (cold_start_count | warm_start_count).astype(bool)
+        cold_start_count = cold_start_count[valid_idx]
+        warm_start_count = warm_start_count[valid_idx]
+        return np.divide(cold_start_count, cold_start_count + warm_start_count).tolist()
+    
+    def cal_mem_waste(self):
+        launch_func = ~self.sys_monitor["never_launch"].values
+        idle_time = self.sys_monitor.loc[launch_func, "idle_time"].values
+        # if not len(idle_time): idle_time = np.array([0])
+        busy_time = self.sys_monitor.loc[launch_func, "busy_time"].values
+        valid_idx = (idle_time | busy_time).astype(bool)
+        busy_time = busy_time[valid_idx]
+        idle_time = idle_time[valid_idx]
+        # if not len(busy_time): busy_time = np.array([0])
+        return np.divide(idle_time, idle_time+busy_time).tolist()
+    
+class GreedysimSysFrame(FixIntervalsimSysFrame):
+    """sys_monitor DataFrame implementation of GreedysimSys"""
+
+    def __init__(self, app_ids, app_mem_list) -> None:
+        super().__init__(app_ids)
+        self.total_mem = 0
+        self.current_mem = 0
+        self.system_clock = 0
+        self.column_names = ["AppID",
+                            "state", 
+                            "status", 
+                            "memory", 
+                            "idle_timer",
+                            "never_launch",
+                            "idle_time",
+                            "busy_time", 
+                            "cold_start_count", 
+                            "warm_start_count",
+                            "priority",
+                            "clock",
+                            "frequency"]
+        self.sys_monitor["priority"] = 0
+        self.sys_monitor["clock"] = 0
+        self.sys_monitor["frequency"] = 0
+        
+        self.app_mem_list = app_mem_list     
+        
+    def update(self, exec_now):
+        self.system_clock += 1
+        # update never launch----------------------------------
+        
+        # calculate newly need memory --------------------------------
+        invc_app = (exec_now > 1)        
+        new_app = ~self.sys_monitor["state"].values & invc_app
+        needed_mem = np.sum(self.app_mem_list[new_app])
+        idle_app = self.sys_monitor["state"].values & ~invc_app # previous idle and current not to launch
+        left_mem = np.sum(self.sys_monitor.loc[idle_app, "memory"].values) + (self.total_mem - self.current_mem)
+        if needed_mem > left_mem: # system overflow
+            new_app_mem = np.zeros(len(invc_app))
+            new_app_mem[new_app] = self.app_mem_list[new_app]
+            for app in np.argsort(new_app_mem)[::-1]:
+                if needed_mem < left_mem:
+                    break
+                exec_now[app] = 0
+                needed_mem -= new_app_mem[app]
+            # return False
+        
+        invc_app = (exec_now > 1)   
+        idle_app = self.sys_monitor["state"].values & ~invc_app # previous idle and current not to launch
+        self.sys_monitor["never_launch"] = ~np.any([~self.sys_monitor["never_launch"].values, exec_now.astype(bool)], axis=0)
+        
+
+        # invocation func ----------------------------------
+        # warm start        
+        warm_app = self.sys_monitor["state"].values & invc_app
+        self.sys_monitor.loc[warm_app, "warm_start_count"] += (exec_now[warm_app] - 1)
+
+        # cold start invocation func count then (coz this will change state)
+        cold_app = ~self.sys_monitor["state"].values & invc_app
+        self.sys_monitor.loc[cold_app, "state"] = True
+        self.sys_monitor.loc[cold_app, "cold_start_count"] += 1
+        self.sys_monitor.loc[cold_app, "warm_start_count"] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+        
+        # update priority
+        self.sys_monitor.loc[invc_app, "frequency"] += 1 # update frequency
+        self.sys_monitor.loc[invc_app, "memory"] = self.app_mem_list[invc_app]
+        # self.sys_monitor.loc[invc_app, "priority"] = self.system_clock + self.sys_monitor.loc[invc_app, "frequency"] # update priority
+        self.sys_monitor.loc[invc_app, "priority"] = self.system_clock + np.divide(self.sys_monitor.loc[invc_app, "frequency"].values, self.app_mem_list[invc_app])# update priority
+        
+        # Engage management strategy -------------------------------
+        needed_mem -= (self.total_mem - self.current_mem)
+        if needed_mem > 0:
+            for app in self.sys_monitor.loc[idle_app, :].reset_index().sort_values(by=['priority'])["AppID"].values:
+                if needed_mem <= 0:
+                    break
+                self.sys_monitor.loc[app, "state"] = False
+                needed_mem -= self.sys_monitor.loc[app, "memory"]
+                self.sys_monitor.loc[app, "memory"] = 0 
+            
+        
+        # update idle/busy time, system memory consumption
+        # for those func stop running but app is running
+        idle_apps = self.sys_monitor["state"].values & ~exec_now.astype(bool)
+        self.sys_monitor.loc[idle_apps, (["idle_time", "idle_timer"])] += 1 
+        
+        # for thos func is running running and app is running
+        invc_app = (exec_now == 1) & self.sys_monitor["state"].values
+        self.sys_monitor.loc[invc_app, "busy_time"] += 1
+        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+
+        self.current_mem = np.sum(self.sys_monitor["memory"].values)
+        # print(self.current_mem)
+        
+        return True
+
+
+class AppStateArray():
+    """one-policy AppState of the typed array implementation"""
+    
+    column_names = ["state", 
+                    "status", 
+                    "memory", 
+                    "idle_timer",
+                    "never_launch",
+                    "idle_time",
+                    "busy_time", 
+                    "cold_start_count", 
+                    "warm_start_count",
+                    "priority",
+                    "frequency"]
+    
+    def __init__(self, n_app) -> None:
+        self.state = np.zeros(n_app, dtype=bool)                # False: off, True: On
+        self.status = np.zeros(n_app, dtype=bool)               # False: idle, True: Busy
+        self.memory = np.zeros(n_app, dtype=np.int64)           # memory held by the app
+        self.idle_timer = np.zeros(n_app, dtype=np.int32)
+        self.never_launch = np.ones(n_app, dtype=bool)
+        self.idle_time = np.zeros(n_app, dtype=np.int32)
+        self.busy_time = np.zeros(n_app, dtype=np.int32)
+        self.cold_start_count = np.zeros(n_app, dtype=np.int64)
+        self.warm_start_count = np.zeros(n_app, dtype=np.int64)
+        self.priority = np.zeros(n_app, dtype=np.float64)
+        self.frequency = np.zeros(n_app, dtype=np.int64)
+        
+    def to_frame(self, app_ids) -> pd.DataFrame:
+        return pd.DataFrame({col: getattr(self, col) for col in self.column_names}, 
+                            index=pd.Index(app_ids, name="AppID"))
+            
+class FixIntervalsimSysArray():
+    """single policy typed array implementation of FixIntervalsimSys"""
+
+    def __init__(self, app_ids) -> None:
+        # app properties
+        self.app_ids = app_ids
+        self.apps = AppStateArray(len(app_ids))
+        self.keep_alive_interval = 0
+        
+    @property
+    def sys_monitor(self) -> pd.DataFrame:
+        """snapshot of the app states as a frame indexed by AppID"""
+        return self.apps.to_frame(self.app_ids)
+
+    def update(self, exec_now):    
+        apps = self.apps
+        exec_now = exec_now.astype(np.int64)
+        running = exec_now.astype(bool)
+        # update never launch----------------------------------
+        apps.never_launch &= ~running
+
+        # invocation func ----------------------------------
+        invc_app = (exec_now > 1)
+        apps.status[invc_app] = True
+        apps.busy_time[invc_app] += 1
+        apps.idle_timer[invc_app] = 0
+        
+        # warm start invocation func need to be count first
+        warm_app = apps.state & apps.status & invc_app
+        apps.warm_start_count[warm_app] += (exec_now[warm_app] - 1) # -1 is a flag added when generating the exec files
+        
+        # cold start invocation func count then (coz this will change state)
+        cold_app = ~apps.state & apps.status & invc_app
+        apps.state[cold_app] = True
+        apps.cold_start_count[cold_app] += 1
+        apps.warm_start_count[cold_app] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+        
+        # stop idle timeout app --------------------------------
+        timeout_apps = apps.idle_timer >= self.keep_alive_interval
+        apps.state[timeout_apps] = False
+        apps.idle_timer[timeout_apps] = 0
+        
+        # for those func stop running---------------------------
+        stop_funcs = ~running
+        apps.status[stop_funcs] = False
+        
+        # if app is running
+        idle_apps = apps.state & ~apps.status & stop_funcs
+        apps.idle_time[idle_apps] += 1 
+        apps.idle_timer[idle_apps] += 1 
+        
+        # running func ----------------------------------
+        invc_app = (exec_now == 1) 
+        apps.busy_time[invc_app] += 1
+        apps.idle_timer[invc_app] = 0
+        
+        return True
+        
+    def cal_cold_rate(self):
+        launch_func = ~self.apps.never_launch
+        cold_start_count = self.apps.cold_start_count[launch_func]
+        warm_start_count = self.apps.warm_start_count[launch_func]
+        valid_idx = (cold_start_count | warm_start_count).astype(bool)
+        cold_start_count = cold_start_count[valid_idx]
+        warm_start_count = warm_start_count[valid_idx]
+        return np.divide(cold_start_count, cold_start_count + warm_start_count).tolist()
+    
+    def cal_mem_waste(self):
+        launch_func = ~self.apps.never_launch
+        idle_time = self.apps.idle_time[launch_func]
+        busy_time = self.apps.busy_time[launch_func]
+        valid_idx = (idle_time | busy_time).astype(bool)
+        busy_time = busy_time[valid_idx]
+        idle_time = idle_time[valid_idx]
+        return np.divide(idle_time, idle_time+busy_time).tolist()
+
+
+class GreedysimSysSort(FixIntervalsimSysArray):
+    """GreedysimSys sorting all idle apps by priority on every eviction,
+    ties are broken by app id like the priority index"""
+
+    def __init__(self, app_ids, app_mem_list) -> None:
+        super().__init__(app_ids)
+        self.total_mem = 0
+        self.current_mem = 0
+        self.system_clock = 0
+        self.app_mem_list = app_mem_list     
+        
+    def update(self, exec_now):
+        """advance one minute
+
+        Args:
+            exec_now (ndarray): execution state of every app at this minute, 
+                                invocations dropped for lack of memory are set to 0 in place
+        """
+        apps = self.apps
+        self.system_clock += 1
+        # update never launch----------------------------------
+        
+        # calculate newly need memory --------------------------------
+        invc_app = (exec_now > 1)        
+        new_app = ~apps.state & invc_app
+        needed_mem = np.sum(self.app_mem_list[new_app])
+        idle_app = apps.state & ~invc_app # previous idle and current not to launch
+        left_mem = np.sum(apps.memory[idle_app]) + (self.total_mem - self.current_mem)
+        if needed_mem > left_mem: # system overflow
+            new_app_mem = np.zeros(len(invc_app))
+            new_app_mem[new_app] = self.app_mem_list[new_app]
+            for app in np.argsort(-new_app_mem, kind='stable'):
+                if needed_mem < left_mem:
+                    break
+                exec_now[app] = 0
+                needed_mem -= new_app_mem[app]
+            # return False
+        
+        exec_now = exec_now.astype(np.int64)
+        running = exec_now.astype(bool)
+        invc_app = (exec_now > 1)   
+        idle_app = apps.state & ~invc_app # previous idle and current not to launch
+        apps.never_launch &= ~running
+
+        # invocation func ----------------------------------
+        # warm start        
+        warm_app = apps.state & invc_app
+        apps.warm_start_count[warm_app] += (exec_now[warm_app] - 1)
+
+        # cold start invocation func count then (coz this will change state)
+        cold_app = ~apps.state & invc_app
+        apps.state[cold_app] = True
+        apps.cold_start_count[cold_app] += 1
+        apps.warm_start_count[cold_app] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+        
+        # update priority
+        apps.frequency[invc_app] += 1 # update frequency
+        apps.memory[invc_app] = self.app_mem_list[invc_app]
+        apps.priority[invc_app] = self.system_clock + np.divide(apps.frequency[invc_app], self.app_mem_list[invc_app]) # update priority
+        
+        # Engage management strategy -------------------------------
+        needed_mem -= (self.total_mem - self.current_mem)
+        if needed_mem > 0:
+            idle_idx = np.flatnonzero(idle_app)
+            for app in idle_idx[np.argsort(apps.priority[idle_idx], kind='stable')]:
+                if needed_mem <= 0:
+                    break
+                apps.state[app] = False
+                needed_mem -= apps.memory[app]
+                apps.memory[app] = 0 
+            
+        
+        # update idle/busy time, system memory consumption
+        # for those func stop running but app is running
+        idle_apps = apps.state & ~running
+        apps.idle_time[idle_apps] += 1 
+        apps.idle_timer[idle_apps] += 1 
+        
+        # for thos func is running running and app is running
+        invc_app = (exec_now == 1) & apps.state
+        apps.busy_time[invc_app] += 1
+        apps.idle_timer[invc_app] = 0
+
+        self.current_mem = np.sum(apps.memory)
+        
+        return True
+
+
+def cdf_pointer_loop(cold_rate_in) -> list:
+    """CDF curves of SystemAnalyzer.draw_cold_rate before the metrics module"""
+    cold_rate = copy.deepcopy(cold_rate_in)
+    rates = [x * 0.01 for x in range(101)] # cold rate percentage
+    curves = []
+    for i in range(len(cold_rate)):
+        cold_rate[i].sort() # ascending order
+        cdf_list = [0 for _ in range(101)]
+        ptr = 0
+        for idx, rate in enumerate(rates):
+            while ptr < len(cold_rate[i]) and cold_rate[i][ptr] <= rate: 
+                ptr += 1
+                
+            cdf_list[idx] = ptr * 1.0 / len(cold_rate[i]) # cdf
+        curves.append(cdf_list)
+    return curves
+
+
+def frontier_deepcopy(mem_rate_in, cold_rate_in) -> list:
+    """3rd quartile points of SystemAnalyzer.draw_mem_rate before the metrics module"""
+    mem_idle_rate = []
+    cold_start_rate = []
+    mem_rate = copy.deepcopy(mem_rate_in)
+    cold_rate = copy.deepcopy(cold_rate_in)
+    for i in range(len(mem_rate)):
+        sort_idx = np.argsort(np.array(cold_rate[i]))
+        cold_rate[i] = np.array(cold_rate[i])[sort_idx]
+        mem_rate[i] = np.array(mem_rate[i])[sort_idx]
+        
+        idx_75_pert = int(len(cold_rate[i]) * 0.75)
+        cold_start_rate.append(cold_rate[i][idx_75_pert])
+        mem_idle_rate.append(mem_rate[i][idx_75_pert])
+    return [cold_start_rate, mem_idle_rate]
@@ -0,0 +1,234 @@
+"""Benchmarks of the pipeline stages with regression checks against a saved baseline.
+
+Every stage is timed and its peak of traced memory (tracemalloc: Python objects and NumPy buffers,
+not memory-mapped files) is recorded, with a digest of its output so that changes of results are caught too.
+The stages run on a copy of the trace in a temporary folder, so the caches they write do not touch it.
+Run from the repository root, e.g.
+
+    python -m benchmark.suite --apps 20000 --days 2 --save baseline.json
+    python -m benchmark.suite --apps 20000 --days 2 --compare baseline.json
+    python -m benchmark.suite --path dataset --days 1 --compare baseline_azure.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from util.DataLoader import DataLoader
+from util.Simulator import FaasSimulator
+from util.Period import PeriodSimulator
+from util.Analyzer import SystemAnalyzer
+from util.Placement import FirstFit
+from benchmark.synthetic import SyntheticTrace
+
+
+VERSION = 1
+TRACE_PREFIX = ["app_memory_percentiles", "function_durations_percentiles", "invocations_per_function"]
+
+
+def digest(*arrays) -> str:
+    """short hash of the content of arrays, ragged lists are flattened"""
+    sha = hashlib.sha1()
+    for array in arrays:
+        if isinstance(array, list):
+            array = np.concatenate([np.ravel(np.asarray(a, dtype=np.float64)) for a in array] or [np.zeros(0)])
+        sha.update(np.ascontiguousarray(array).tobytes())
+    return sha.hexdigest()[:16]
+
+
+class StageRecorder():
+    """time, peak traced memory and output digest of each stage, summed over the days"""
+
+    def __init__(self) -> None:
+        self.stages = {}
+
+    def run(self, name, func, *args):
+        """run func(*args) as stage name, func returns [result, digest of its output]
+
+        Returns:
+            result of func
+        """
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        tic = perf_counter()
+        [result, out] = func(*args)
+        elapsed = perf_counter() - tic
+        peak = tracemalloc.get_traced_memory()[1] - base
+        stage = self.stages.setdefault(name, {"time": 0.0, "peak": 0, "digest": ""})
+        stage["time"] += elapsed
+        stage["peak"] = max(stage["peak"], peak)
+        stage["digest"] = hashlib.sha1((stage["digest"] + out).encode()).hexdigest()[:16]
+        return result
+
+
+def link_trace(src, dst, days) -> None:
+    """link the trace files of days of src into dst"""
+    for file in os.listdir(src):
+        if any(file.startswith(prefix) for prefix in TRACE_PREFIX) and int(file[-6:-4]) in days:
+            os.symlink(os.path.abspath(os.path.join(src, file)), os.path.join(dst, file))
+
+
+def run_suite(path, days, seed, intv_lst, mem_lst) -> dict:
+    """run every stage on each day of the trace in path
+
+    Returns:
+        dict: stage -> {"time": seconds, "peak": bytes, "digest": hash of the outputs}
+    """
+    import matplotlib
+    matplotlib.use("Agg") # the analyzer draws, nothing is shown
+    import matplotlib.pyplot as plt
+
+    recorder = StageRecorder()
+    tracemalloc.start()
+    cwd = os.getcwd()
+    try:
+        os.chdir(path) # the analyzer saves to ./result
+        os.makedirs("result", exist_ok=True)
+        for day in days:
+            def load():
+                loader = DataLoader(path=path)
+                loader.load_dataset(day)
+                return [loader, digest(loader.ids.func_app)]
+
+            def prepare():
+                simulator = FaasSimulator(loader, seed=seed)
+                simulator.prepare()
+                return [simulator, digest(simulator.exe_func, np.asarray(simulator.exe_mat))]
+
+            def run_app():
+                result = simulator.run_app_sweep(intv_lst)
+                return [result, digest(*result)]
+
+            def run_instances():
+                result = simulator.run_instances(intv_lst)
+                return [result, digest(*result)]
+
+            def run_sys():
+                result = simulator.run_sys(mem_lst)
+                return [result, digest(*result)]
+
+            def run_period(): # a one-day period is checked against run_sys
+                result = PeriodSimulator(path, [day], seed=seed).run("greedy", mem_lst)[1]
+                assert result == sys_result, "one-day PeriodSimulator differs from run_sys on day {}".format(day)
+                return [result, digest(*result)]
+
+            def run_cluster():
+                result = simulator.run_cluster(mem_lst, 64, FirstFit())
+                return [result, digest(*result[:2], result[3].values)]
+
+            def analyze_rates(): # on the keep-alive rates, both rates of run_sys are not given for the same apps
+                SystemAnalyzer.draw_cold_rate(cold_app, legend=intv_lst, unit="min")
+                SystemAnalyzer.draw_mem_rate(mem_app, cold_app, legend=intv_lst, unit="min")
+                plt.close("all")
+                return [None, ""]
+
+            def analyze_runs():
+                [idle_hist, busy_hist, _] = SystemAnalyzer.draw_idle_busy_time([simulator.exe_raw])
+                plt.close("all")
+                return [None, digest(idle_hist, busy_hist)]
+
+            loader = recorder.run("load_dataset", load) # properties from the CSV files
+            loader = recorder.run("load_dataset (cached)", load)
+            simulator = recorder.run("prepare", prepare) # series from the invocations
+            simulator = recorder.run("prepare (cached)", prepare)
+            [cold_app, mem_app] = recorder.run("run_app", run_app)
+            recorder.run("run_instances", run_instances)
+            sys_result = recorder.run("run_sys", run_sys)
+            recorder.run("run_period (1 day)", run_period)
+            recorder.run("run_cluster", run_cluster)
+            recorder.run("analyzer rates", analyze_rates)
+            recorder.run("analyzer idle/busy", analyze_runs)
+            del loader, simulator
+    finally:
+        os.chdir(cwd)
+        tracemalloc.stop()
+    return recorder.stages
+
+
+def compare(baseline, current, time_tol, mem_tol, time_slack=0.2, mem_slack=1 << 20) -> list:
+    """
+    Args:
+        baseline, current (dict): results of run_suite
+        time_tol, mem_tol (float): allowed relative increase of time and peak memory
+        time_slack, mem_slack (float): allowed absolute increase on top, noise of the short stages
+
+    Returns:
+        list: description of each regression
+    """
+    regressions = []
+    for name, new in current.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if new["time"] > old["time"] * (1 + time_tol) + time_slack:
+            regressions.append("{}: time {:.3f}s -> {:.3f}s".format(name, old["time"], new["time"]))
+        if new["peak"] > old["peak"] * (1 + mem_tol) + mem_slack:
+            regressions.append("{}: peak memory {:.1f}MB -> {:.1f}MB".format(name, old["peak"] / 2**20, new["peak"] / 2**20))
+        if old["digest"] != new["digest"]:
+            regressions.append("{}: output changed".format(name))
+    return regressions
+
+
+def report(stages, baseline=None) -> None:
+    for name, stage in stages.items():
+        line = "{:<24} {:>9.3f}s {:>9.1f}MB".format(name, stage["time"], stage["peak"] / 2**20)
+        if baseline is not None and name in baseline:
+            old = baseline[name]
+            line += "   baseline {:>9.3f}s {:>9.1f}MB".format(old["time"], old["peak"] / 2**20)
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="benchmarks of the simulation pipeline stages")
+    parser.add_argument("--path", default=None, help="folder of a trace, a synthetic trace is generated if missing")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--apps", type=int, default=10000, help="apps of the synthetic trace")
+    parser.add_argument("--burstiness", type=float, default=0.5, help="burstiness of the synthetic trace")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic trace and of the simulation")
+    parser.add_argument("--save", default=None, help="json file the results are saved to, e.g. a new baseline")
+    parser.add_argument("--compare", default=None, help="json file of a baseline")
+    parser.add_argument("--time-tol", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--mem-tol", type=float, default=0.10, help="allowed relative growth of peak memory")
+    args = parser.parse_args()
+
+    intv_lst = [1, 5, 10, 30, 60, 120, 1440]
+    mem_lst = [i * 1024 for i in [1, 4, 16, 64, 256]]
+    days = list(range(1, args.days + 1))
+    config = {"path": os.path.abspath(args.path) if args.path else None, "days": days, "seed": args.seed,
+              "intv_lst": intv_lst, "mem_lst": mem_lst}
+    if args.path is None:
+        config.update(apps=args.apps, burstiness=args.burstiness)
+
+    with tempfile.TemporaryDirectory() as work:
+        if args.path is None:
+            print("generating a synthetic trace of {} apps...".format(args.apps))
+            SyntheticTrace(args.apps, burstiness=args.burstiness, seed=args.seed).write(work, days)
+        else:
+            link_trace(args.path, work, days)
+        stages = run_suite(work, days, args.seed, intv_lst, mem_lst)
+
+    result = {"version": VERSION, "config": config,
+              "platform": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+              "stages": stages}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("version") != VERSION or baseline["config"] != config:
+            sys.exit("baseline {} was run on another configuration: {}".format(args.compare, baseline.get("config")))
+    report(stages, baseline and baseline["stages"])
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=2)
+    if baseline is not None:
+        regressions = compare(baseline["stages"], stages, args.time_tol, args.mem_tol)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,195 @@
+"""Synthetic traces in the layout of the Azure Functions trace, for benchmarks without the real data.
+
+Run from the repository root, e.g.
+
+    python -m benchmark.synthetic /tmp/synthetic --apps 20000 --days 2 --burstiness 0.8
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+MEM_COL = ["HashOwner", "HashApp", "SampleCount", "AverageAllocatedMb",
+           "AverageAllocatedMb_pct1", "AverageAllocatedMb_pct5", "AverageAllocatedMb_pct25", "AverageAllocatedMb_pct50",
+           "AverageAllocatedMb_pct75", "AverageAllocatedMb_pct95", "AverageAllocatedMb_pct99", "AverageAllocatedMb_pct100"]
+DUR_COL = ["HashOwner", "HashApp", "HashFunction", "Average", "Count", "Minimum", "Maximum",
+           "percentile_Average_0", "percentile_Average_1", "percentile_Average_25", "percentile_Average_50",
+           "percentile_Average_75", "percentile_Average_99", "percentile_Average_100"]
+INV_COL = ["HashOwner", "HashApp", "HashFunction", "Trigger"] + [str(t + 1) for t in range(1440)]
+
+MEM_Z = np.array([-2.3, -1.6, -0.7, 0, 0.7, 1.6, 2.3, 3.5]) # standard normal quantiles of the memory percentiles
+DUR_Z = np.array([-3.5, -2.3, -0.7, 0, 0.7, 2.3, 3.5]) # and of the duration percentiles
+TIMER_PERIOD = np.array([1, 2, 5, 10, 15, 30, 60, 120, 360, 720, 1440])
+
+
+def hashes(rng, n) -> np.ndarray:
+    """n random 64-digit hex names, as the anonymized hashes of the trace"""
+    digits = rng.integers(0, 1 << 32, size=(n, 8), dtype=np.uint32).tobytes().hex()
+    return np.array([digits[64 * k:64 * (k + 1)] for k in range(n)], dtype=object)
+
+
+class SyntheticTrace():
+    """owners, apps and functions with per-minute invocations of a configurable burstiness
+
+    The population and the parameters of every function are drawn once and kept across days:
+    a daily rate (log-normal, most functions are rarely invoked), a trigger, a duration distribution
+    and the memory distribution of its app. Timer functions are invoked on a fixed period.
+    The others follow an on/off process: on for burst_len minutes on average, a fraction
+    1 - burstiness of the day, with Poisson counts scaled so that the daily rate does not depend
+    on the burstiness. Every day the rates vary a little, functions without invocation are left out
+    of the invocation file and a fraction missing of the rows of the duration and memory files are dropped,
+    as in the real trace.
+    """
+
+    def __init__(self, n_app=10000, func_per_app=2.0, app_per_owner=2.0, burstiness=0.5, burst_len=10,
+                 timer_frac=0.2, missing=0.05, seed=0) -> None:
+        """
+        Args:
+            n_app (int): number of apps
+            func_per_app (float): average number of functions of an app
+            app_per_owner (float): average number of apps of an owner
+            burstiness (float): fraction of the day a non-timer function is off, in [0, 1)
+            burst_len (float): average length of an on period in minutes
+            timer_frac (float): fraction of timer-triggered functions
+            missing (float): fraction of the functions and apps left out of the duration and memory files each day
+            seed (int): seed of the population and of every day
+        """
+        assert 0 <= burstiness < 1
+        self.burstiness = burstiness
+        self.burst_len = burst_len
+        self.missing = missing
+        self.seed = seed
+        rng = np.random.default_rng([seed, 0])
+
+        n_owner = max(1, int(round(n_app / app_per_owner)))
+        self.owner = hashes(rng, n_owner)
+        self.app = hashes(rng, n_app)
+        self.app_owner = np.sort(rng.integers(n_owner, size=n_app))
+        self.app_mem = 10 ** rng.uniform(1.5, 2.7, n_app) # median memory in MB
+        self.app_mem_spread = rng.uniform(0, 0.3, n_app)
+
+        n_func_app = rng.geometric(1 / func_per_app, n_app)
+        self.func_app = np.repeat(np.arange(n_app), n_func_app)
+        n_func = len(self.func_app)
+        self.func = hashes(rng, n_func)
+        self.rate = 10 ** rng.normal(0.5, 1.5, n_func) # invocations per day
+        self.timer = rng.random(n_func) < timer_frac
+        self.period = rng.choice(TIMER_PERIOD, n_func)
+        self.phase = rng.integers(0, self.period)
+        self.trigger = np.where(self.timer, "timer", rng.choice(["http", "queue", "event", "storage"], n_func))
+        self.dur = 10 ** rng.uniform(0.5, 5, n_func) # median duration in ms
+        self.dur_sigma = rng.uniform(0.05, 1.5, n_func)
+
+    @property
+    def n_func(self) -> int:
+        return len(self.func_app)
+
+    def invocations(self, rng, func) -> np.ndarray:
+        """
+        Args:
+            func (ndarray): functions drawn
+
+        Returns:
+            ndarray: invocation counts of the day, function x minute
+        """
+        n_func = len(func)
+        rate = self.rate[func] * rng.lognormal(0, 0.2, n_func) / 1440
+        on = np.ones((n_func, 1440), dtype=bool)
+        duty = 1 - self.burstiness
+        if self.burstiness > 0: # two-state Markov chain started in its stationary state
+            p_off = 1 / self.burst_len
+            p_on = duty * p_off / (1 - duty)
+            state = rng.random(n_func) < duty
+            flip = rng.random((n_func, 1440))
+            for t in range(1440):
+                state = np.where(state, flip[:, t] >= p_off, flip[:, t] < p_on)
+                on[:, t] = state
+        counts = rng.poisson(np.where(on, rate[:, None] / duty, 0)).astype(np.int32)
+
+        minute = np.arange(1440)
+        timer = self.timer[func]
+        counts[timer] = ((minute - self.phase[func][timer, None]) % self.period[func][timer, None] == 0)
+        return counts
+
+    def durations(self, rng, func, count) -> pd.DataFrame:
+        """rows of the function_durations_percentiles file"""
+        sigma = self.dur_sigma[func, None]
+        pct = np.maximum(np.round(self.dur[func, None] * np.exp(sigma * DUR_Z)), 0).astype(np.int64)
+        table = pd.DataFrame(pct, columns=DUR_COL[7:])
+        table.insert(0, "HashOwner", self.owner[self.app_owner[self.func_app[func]]])
+        table.insert(1, "HashApp", self.app[self.func_app[func]])
+        table.insert(2, "HashFunction", self.func[func])
+        table.insert(3, "Average", self.dur[func] * np.exp(self.dur_sigma[func] ** 2 / 2))
+        table.insert(4, "Count", count)
+        table.insert(5, "Minimum", pct[:, 0])
+        table.insert(6, "Maximum", pct[:, -1])
+        return table
+
+    def memory(self, rng, app) -> pd.DataFrame:
+        """rows of the app_memory_percentiles file"""
+        spread = self.app_mem_spread[app, None]
+        pct = np.maximum(np.round(self.app_mem[app, None] * (1 + spread * MEM_Z)), 1).astype(np.int64)
+        table = pd.DataFrame(pct, columns=MEM_COL[4:])
+        table.insert(0, "HashOwner", self.owner[self.app_owner[app]])
+        table.insert(1, "HashApp", self.app[app])
+        table.insert(2, "SampleCount", rng.integers(1, 1000, len(app)))
+        table.insert(3, "AverageAllocatedMb", np.round(self.app_mem[app]).astype(np.int64))
+        return table
+
+    def write_day(self, path, day, chunk_size=10000) -> None:
+        """write the three files of a day, invocations chunk_size functions at a time"""
+        rng = np.random.default_rng([self.seed, day])
+        inv_path = os.path.join(path, "invocations_per_function_md.anon.d{:02d}.csv".format(day))
+        count = np.zeros(self.n_func, dtype=np.int64)
+        with open(inv_path, 'w') as f:
+            f.write(",".join(INV_COL) + "\n")
+            for lo in range(0, self.n_func, chunk_size):
+                func = np.arange(lo, min(lo + chunk_size, self.n_func))
+                counts = self.invocations(rng, func)
+                count[func] = counts.sum(axis=1)
+                invoked = count[func] > 0
+                func = func[invoked]
+                table = pd.DataFrame(counts[invoked], columns=INV_COL[4:])
+                table.insert(0, "HashOwner", self.owner[self.app_owner[self.func_app[func]]])
+                table.insert(1, "HashApp", self.app[self.func_app[func]])
+                table.insert(2, "HashFunction", self.func[func])
+                table.insert(3, "Trigger", self.trigger[func])
+                table.to_csv(f, header=False, index=False)
+
+        func = np.flatnonzero(rng.random(self.n_func) >= self.missing)
+        self.durations(rng, func, count[func]).to_csv(
+            os.path.join(path, "function_durations_percentiles.anon.d{:02d}.csv".format(day)), index=False)
+        app = np.flatnonzero(rng.random(len(self.app)) >= self.missing)
+        self.memory(rng, app).to_csv(
+            os.path.join(path, "app_memory_percentiles.anon.d{:02d}.csv".format(day)), index=False)
+
+    def write(self, path, days) -> None:
+        """
+        Args:
+            path (str): output folder, created if missing
+            days (list): days written
+        """
+        os.makedirs(path, exist_ok=True)
+        for day in days:
+            self.write_day(path, day)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="synthetic trace in the layout of the Azure Functions trace")
+    parser.add_argument("path", help="output folder")
+    parser.add_argument("--apps", type=int, default=10000)
+    parser.add_argument("--func-per-app", type=float, default=2.0)
+    parser.add_argument("--app-per-owner", type=float, default=2.0)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--burstiness", type=float, default=0.5, help="fraction of the day a function is off, in [0, 1)")
+    parser.add_argument("--burst-len", type=float, default=10, help="average on period in minutes")
+    parser.add_argument("--timer-frac", type=float, default=0.2)
+    parser.add_argument("--missing", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trace = SyntheticTrace(args.apps, args.func_per_app, args.app_per_owner, args.burstiness, args.burst_len,
+                           args.timer_frac, args.missing, args.seed)
+    trace.write(args.path, range(1, args.days + 1))
@@ -2,9 +2,9 @@ import numpy as np
 import pandas as pd
 import tqdm
 import matplotlib.pyplot as plt
-from util.DataLoader import DataLoader
-from util.Simulator import FaasSimulator
-from multiprocessing import Process, Pool
+from util.Scheduler import DayScheduler
+from util.Period import PeriodSimulator
+from util.Cache import ResultCache
 import ipdb
 import os
 from util.Analyzer import SystemAnalyzer
@@ -16,67 +16,45 @@ arg_lst = [i*8*1024 for i in [200, 220, 240,  250, 260, 280, 300, 400]]
 # arg_lst = [5, 10, 20, 30, 45, 60, 90, 120, 1440]
 # intv_lst = [1, 2, 4, 5, 6, 8, 10, 20, 30, 45, 60, 90, 120, 1440]
 # arg_lst = [5, 10]
+# arg_lst = [0.5, 0.75, 0.9, 0.99] # tail percentiles of the histogram policy
 min_day = 1
 max_day = 12
+seed = 0 # seed of the random streams of every day
 # max_day = 1
 
 
-# process for fixed-interval strategy
-def proc(i):
-    global arg_lst
-    try:
-        loader = DataLoader(path="dataset")
-        loader.load_dataset(i)
-        
-        simulator = FaasSimulator(loader)
-        simulator.prepare()
-        
-
-        [cold_rate_lst, mem_rate_lst] = simulator.run_sys(arg_lst)
-        
-        return [cold_rate_lst, mem_rate_lst]
-    except KeyboardInterrupt:
-        pass
-    # return True
+policy = "greedy" # "greedy" / "oracle" (furthest next use evicted, offline heuristic): memory sizes, "fixed" / "keep-alive": keep alive intervals, "histogram": tail percentiles
+n_worker = 24
+batch_size = 1 # memory sizes simulated together by a task
+continuous = False # True: days back to back through one system state, apps stay warm across midnight
+cache_dir = "result/cache" # results of previous runs, only missing (day, parameter) points are simulated, None: no cache
+cache_size = 4 << 30 # bytes kept in cache_dir, least recently used results are removed first
 
+# sweeps over several policies and seeds: python sweep.py spec.json
 print(".....................Starting.............................")
 
 if __name__ == '__main__': 
-    # p_lst = []
-    # for i in range(12):
-    #     p_lst.append(Process(target=proc, args=(i+1,)))
-    #     p_lst[i].start()
-        
-    # [p_lst[i].join for i in range(12)]
-    
-    result_lst = []
-    # try:
-    pool = Pool(24)
-    result_lst = pool.map(proc, list(range(min_day, max_day+1)))
-        # result_lst.append(result)
-        
-    pool.close()
-    pool.join()
-    # except KeyboardInterrupt:
-    #     pid = os.getpid()
-    #     os.popen('taskkill.exe /f /pid:%d'%pid)
-    #     exit
-    # except Exception as e:
-    #     print(e)
-    
-    # print(result_lst)
-    print("..................Simulation Finish.....................")
-    
     itv_len = len(arg_lst)
+    if continuous:
+        period = PeriodSimulator(path="dataset", days=range(min_day, max_day+1), seed=seed)
+        [day_result, [cold_rate_data, mem_rate_data]] = period.run(policy, arg_lst)
+        print("..................Simulation Finish.....................")
+    else:
+        # each day is loaded once into shared memory, the workers run (day, policy, memory size) tasks
+        cache = None if cache_dir is None else ResultCache(cache_dir, max_bytes=cache_size)
+        scheduler = DayScheduler(path="dataset", seed=seed, n_worker=n_worker, batch_size=batch_size, cache=cache)
+        result = scheduler.run([(i, policy, arg) for i in range(min_day, max_day+1) for arg in arg_lst])
+        
+        # print(result)
+        print("..................Simulation Finish.....................")
 
-    # unpack result from multi-processing list
-    cold_rate_data = [[] for _ in range(itv_len)]
-    mem_rate_data = [[] for _ in range(itv_len)]
-    for j in range(itv_len): # itv
-        for i in range(len(result_lst)): # day 
-            # ipdb.set_trace()
-            cold_rate_data[j] += result_lst[i][0][j]  # [day][cold/mem][intv]
-            mem_rate_data[j] += result_lst[i][1][j]
+        # unpack result from multi-processing list
+        cold_rate_data = [[] for _ in range(itv_len)]
+        mem_rate_data = [[] for _ in range(itv_len)]
+        for j in range(itv_len): # itv
+            for i in range(min_day, max_day+1): # day 
+                cold_rate_data[j] += result[(i, policy, arg_lst[j])][0]  # [cold/mem]
+                mem_rate_data[j] += result[(i, policy, arg_lst[j])][1]
 
     plt.figure(1)
     SystemAnalyzer.draw_cold_rate(cold_rate_data, legend=arg_lst, unit="Mb")
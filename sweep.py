@@ -0,0 +1,135 @@
+"""Sweeps of policies and parameters over days and seeds, described by a JSON spec.
+
+    python sweep.py sweep.json
+    python sweep.py sweep.json --days 1-3 --workers 64
+
+A spec lists the parameter grid of each policy (policies as in util.Scheduler.run_task), given as a list
+or as {"values": [...]} / {"range": [start, stop, step]} with an optional "scale" factor, e.g.
+
+    {
+        "path": "dataset",
+        "days": [1, 12],
+        "seeds": [0],
+        "policies": {"greedy": {"values": [200, 250, 300, 400], "scale": 8192},
+                     "keep-alive": [5, 10, 20, 30, 60, 120, 1440]},
+        "n_worker": 64,
+        "batch_size": 1,
+        "cache_dir": "result/cache",
+        "output": "result"
+    }
+
+days is [first, last] or {"list": [...]}. Every (seed, day, policy, parameter) is a task of one DayScheduler.
+The per-app rates of each (seed, policy) are saved in output as {policy}_seed{seed}_cold_rate.csv and _mem_rate.csv,
+one row per app with its Day and Parameter, in the order of the spec (the apps of a day differ between parameters
+of the system policies, so the rates are not a matrix).
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from util.Cache import ResultCache
+from util.Scheduler import DayScheduler
+
+
+DEFAULT = {"path": "dataset", "days": [1, 1], "seeds": [0], "policies": {}, "n_worker": None, "batch_size": 1,
+           "budget": None, "cache_dir": "result/cache", "cache_size": 4 << 30, "telemetry_dir": None, "output": "result"}
+
+
+def expand_grid(grid) -> list:
+    """
+    Args:
+        grid (list or dict): parameters, or {"values": [...]} / {"range": [start, stop, step]} with "scale"
+
+    Returns:
+        list: parameters of the grid
+    """
+    if isinstance(grid, list):
+        return grid
+    if "values" in grid:
+        values = grid["values"]
+    elif "range" in grid:
+        values = np.arange(*grid["range"]).tolist()
+    else:
+        raise ValueError("grid {} has neither values nor range".format(grid))
+    scale = grid.get("scale", 1)
+    return [v * scale for v in values]
+
+
+def expand_days(days) -> list:
+    if isinstance(days, dict):
+        return list(days["list"])
+    if isinstance(days, str): # "first-last"
+        days = [int(d) for d in days.split("-")]
+    [first, last] = days if len(days) == 2 else days * 2
+    return list(range(first, last + 1))
+
+
+def load_spec(file, overrides=None) -> dict:
+    """
+    Returns:
+        dict: spec of the file over DEFAULT, with the entries of overrides that are not None
+    """
+    with open(file) as f:
+        spec = dict(DEFAULT, **json.load(f))
+    unknown = set(spec) - set(DEFAULT)
+    if unknown:
+        raise ValueError("unknown entries {} in {}".format(sorted(unknown), file))
+    spec.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    spec["days"] = expand_days(spec["days"])
+    spec["policies"] = {policy: expand_grid(grid) for policy, grid in spec["policies"].items()}
+    if not spec["policies"]:
+        raise ValueError("no policy in {}".format(file))
+    return spec
+
+
+def run_sweep(spec) -> dict:
+    """
+    Returns:
+        dict: (seed, day, policy, parameter) -> [cold start rates, memory waste rates], in the order of the spec
+    """
+    cache = None if spec["cache_dir"] is None else ResultCache(spec["cache_dir"], max_bytes=spec["cache_size"])
+    if spec["telemetry_dir"] is not None:
+        os.makedirs(spec["telemetry_dir"], exist_ok=True)
+    scheduler = DayScheduler(spec["path"], n_worker=spec["n_worker"], batch_size=spec["batch_size"],
+                             budget=spec["budget"], telemetry_dir=spec["telemetry_dir"], cache=cache)
+    return scheduler.run_seeds([(seed, day, policy, arg) for seed in spec["seeds"] for policy, arg_lst in spec["policies"].items()
+                                for arg in arg_lst for day in spec["days"]])
+
+
+def rate_frames(result, seed, policy) -> list:
+    """
+    Returns:
+        list: [cold start rates, memory waste rates] of the runs of (seed, policy), frames of Day, Parameter, Rate
+    """
+    frames = [[], []]
+    for [task_seed, day, task_policy, arg], rates in result.items():
+        if (task_seed, task_policy) == (seed, policy):
+            for k in range(2):
+                frames[k].append(pd.DataFrame({"Day": day, "Parameter": arg, "Rate": rates[k]}))
+    return [pd.concat(frame, ignore_index=True) for frame in frames]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="sweep of policies and parameters over days and seeds")
+    parser.add_argument("spec", help="json file of the sweep")
+    parser.add_argument("--path", default=None, help="folder of the trace")
+    parser.add_argument("--days", default=None, help="first-last, e.g. 1-12")
+    parser.add_argument("--seeds", type=int, nargs="+", default=None)
+    parser.add_argument("--workers", dest="n_worker", type=int, default=None, help="processes, all cores if missing")
+    parser.add_argument("--output", default=None, help="folder of the rate files")
+    args = vars(parser.parse_args())
+
+    spec = load_spec(args.pop("spec"), args)
+    result = run_sweep(spec)
+    os.makedirs(spec["output"], exist_ok=True)
+    for seed in spec["seeds"]:
+        for policy in spec["policies"]:
+            prefix = "{}_seed{}".format(policy, seed)
+            [cold_rate, mem_rate] = rate_frames(result, seed, policy)
+            cold_rate.to_csv(os.path.join(spec["output"], prefix + "_cold_rate.csv"), index=False)
+            mem_rate.to_csv(os.path.join(spec["output"], prefix + "_mem_rate.csv"), index=False)
+            print("{}: mean cold start rate by parameter {}".format(
+                prefix, cold_rate.groupby("Parameter", sort=False)["Rate"].mean().round(4).to_dict()))
@@ -0,0 +1,134 @@
+import numpy as np
+import hashlib
+import json
+import os
+from util.Properties import atomic_write
+from util.Telemetry import Telemetry
+
+
+TRACE_PREFIX = ["app_memory_percentiles", "function_durations_percentiles", "invocations_per_function"]
+
+
+def code_version() -> str:
+    """
+    Returns:
+        str: hash of the sources of util, results cached by another version are not found
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    sha = hashlib.sha1()
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(".py"):
+            with open(os.path.join(folder, file), 'rb') as f:
+                sha.update(file.encode() + f.read())
+    return sha.hexdigest()[:16]
+
+
+def trace_fingerprint(path, day) -> str:
+    """
+    Returns:
+        str: hash of the name, size and modification time of the trace files of the day
+    """
+    sha = hashlib.sha1()
+    for file in sorted(os.listdir(path)):
+        if any(file.startswith(prefix) for prefix in TRACE_PREFIX) and file.endswith("d{:02d}.csv".format(day)):
+            stat = os.stat(os.path.join(path, file))
+            sha.update("{} {} {}\n".format(file, stat.st_size, stat.st_mtime_ns).encode())
+    return sha.hexdigest()[:16]
+
+
+class ResultCache():
+    """content-addressed store of the results of (day, policy, parameter, seed) runs
+
+    An entry is keyed by a hash of the trace fingerprint of the day, the policy, the parameter, the seed
+    and the code version, so a changed trace or simulator is never served from an older run.
+    It holds the per-app cold start and memory waste rates in {key}.npz, and the Telemetry of the run
+    in {key}.telemetry.npz if it was recorded. Entries are used in least-recently-used order
+    (file modification time, touched on every hit) and the oldest are removed once the folder
+    holds more than max_bytes. The folder is listed once, by the first put, then the order and size
+    of the entries are kept in memory.
+    """
+
+    version = code_version()
+
+    def __init__(self, path, max_bytes=1 << 30) -> None:
+        """
+        Args:
+            path (str): folder of the entries, created if missing
+            max_bytes (int): size of the entries kept
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries = None # size of every entry, least recently used first
+        self.total = 0
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, fingerprint, policy, arg, seed) -> str:
+        return hashlib.sha1(json.dumps([fingerprint, policy, arg, seed, self.version]).encode()).hexdigest()
+
+    def __file(self, key, telemetry=False) -> str:
+        return os.path.join(self.path, key + (".telemetry.npz" if telemetry else ".npz"))
+
+    def __list(self) -> None:
+        """read the size and last use of the entries in the folder"""
+        entries = {}
+        for file in os.listdir(self.path):
+            if file.endswith(".npz"):
+                stat = os.stat(os.path.join(self.path, file))
+                entry = entries.setdefault(file.split(".")[0], [0, 0])
+                entry[0] = max(entry[0], stat.st_mtime_ns)
+                entry[1] += stat.st_size
+        self.entries = {key: size for [key, [_, size]] in sorted(entries.items(), key=lambda item: item[1][0])}
+        self.total = sum(self.entries.values())
+
+    def get(self, key, telemetry=False):
+        """
+        Args:
+            telemetry (bool): the Telemetry of the run is needed, a run cached without it is a miss
+
+        Returns:
+            list: [cold start rates, memory waste rates, Telemetry or None], None if not cached
+        """
+        files = [self.__file(key)] + ([self.__file(key, True)] if telemetry else [])
+        try:
+            with np.load(files[0]) as npz:
+                result = [npz["cold_rate"].tolist(), npz["mem_rate"].tolist(), None]
+            if telemetry:
+                result[2] = Telemetry.load(files[1])[0]
+            for file in files:
+                os.utime(file)
+        except (OSError, ValueError, KeyError, TypeError): # missing, partially evicted or of another format
+            return None
+        if self.entries is not None and key in self.entries:
+            self.entries[key] = self.entries.pop(key)
+        return result
+
+    def put(self, key, cold_rate, mem_rate, telemetry=None, meta=None) -> None:
+        """store a run, then remove the oldest entries over the size limit
+
+        Args:
+            meta (dict): description of the run saved with its telemetry
+        """
+        if self.entries is None:
+            self.__list()
+        if telemetry is not None:
+            telemetry.save(self.__file(key, True), meta)
+        with atomic_write(self.__file(key)) as f:
+            np.savez(f, cold_rate=np.asarray(cold_rate, dtype=np.float64), mem_rate=np.asarray(mem_rate, dtype=np.float64))
+        size = 0
+        for file in [self.__file(key), self.__file(key, True)]:
+            if os.path.exists(file):
+                size += os.stat(file).st_size
+        self.total += size - self.entries.pop(key, 0)
+        self.entries[key] = size
+        self.evict()
+
+    def evict(self) -> None:
+        """remove the least recently used entries, with their telemetry, until the folder holds at most max_bytes"""
+        if self.entries is None:
+            self.__list()
+        while self.total > self.max_bytes:
+            key = next(iter(self.entries))
+            for file in [self.__file(key), self.__file(key, True)]:
+                if os.path.exists(file):
+                    os.remove(file)
+            self.total -= self.entries.pop(key)
@@ -1,20 +1,33 @@
 import pandas as pd
 import numpy as np
 import os
+from util.Properties import PropertyTable
+from util.Interner import HashInterner
+from util.Reader import TraceReader
 from tqdm import tqdm, trange
 import ipdb
 
 class DataLoader():
-    def __init__(self, path) -> None:
+    def __init__(self, path, budget=None) -> None:
+        """
+        Args:
+            path (str): folder of the trace
+            budget (dict): memory budget of each stage of TraceReader
+        """
         self.data_path = path
+        self.reader = TraceReader(budget)
         self.mem_raw = None
         self.dur_raw = None
+        self.mem_files = []
+        self.dur_files = []
         self.inv_files = []
         self.json_ = False
         self.exec_ = False
         self.exec_files = []
         self.max_day = 0
         self.day_id = 1
+        self.properties = None
+        self.ids = None
         self.data_info_col = ["Day", "HashOwner", "HashApp", "HashFunction", "MemAve", "MemProb", "DurAve", "DurProb"]
         self.data_info = pd.DataFrame({"Day":[],
                                        "HashOwner":[], 
@@ -24,6 +37,16 @@ class DataLoader():
                                        "MemProb":[],
                                        "DurAve":[],
                                        "DurProb":[]})
+        self.dur_pct_col = ["percentile_Average_1",
+                            "percentile_Average_25",
+                            "percentile_Average_50",
+                            "percentile_Average_75",
+                            "percentile_Average_99"]
+        self.mem_pct_col = ["AverageAllocatedMb_pct1",
+                            "AverageAllocatedMb_pct25",
+                            "AverageAllocatedMb_pct50",
+                            "AverageAllocatedMb_pct75",
+                            "AverageAllocatedMb_pct99"]
         
     def __get_files(self) -> list:
         """get files in data path
@@ -33,11 +56,12 @@ class DataLoader():
         """
         files_names = os.listdir(self.data_path)
         # json_name = [v for v in files_names if 'json' in v]
-        mem_files = [file for file in files_names if file[0] ==  'a']
-        dur_files = [file for file in files_names if file[0] ==  'f']
-        inv_files = [file for file in files_names if file[0] ==  'i']
-        exe_files = [file for file in files_names if file[0] ==  'e']
-        json_files = [file for file in files_names if file[0] ==  'p']
+        # match whole prefixes, caches of other formats are saved in the same folder
+        mem_files = [file for file in files_names if file.startswith("app_memory_percentiles")]
+        dur_files = [file for file in files_names if file.startswith("function_durations_percentiles")]
+        inv_files = [file for file in files_names if file.startswith("invocations_per_function")]
+        exe_files = [file for file in files_names if file.startswith("execution_store_") and file.endswith(".npy")]
+        json_files = [file for file in files_names if file.startswith("properties_") and file.endswith(".json")]
         mem_files.sort()
         dur_files.sort()
         inv_files.sort()
@@ -60,33 +84,80 @@ class DataLoader():
             
             
     def __cal_distribute(self, percentile_in) -> list:
-        """calculate probability of each average based on percentile
+        """calculate probability of each average based on percentile, for all rows at once
         due to the incompleted percentile data in the dataset, we only calculate
         probability of 25%, 50%, 75%, 99%
         
         In case there are no changes in these percentile, these percentiles are neglected.
+        Rows without any change (99% == 1%) have no distribution and are marked invalid.
 
         Args:
-            percentile_in (ndarray): input of percentile size 1x5 (1%, 25%, 50%, 75%, 99%)
+            percentile_in (ndarray): input of percentile size Nx5 (1%, 25%, 50%, 75%, 99%)
 
         Returns:
-            list: list of average, and list of probability of each average, size [1x4 1x4]
+            list: Nx4 average, Nx4 probability, Nx4 mask of kept percentiles, N mask of valid rows
         """
         
         pert_range = np.array([0.24, 0.25, 0.25, 0.24])
-        pert_1 = percentile_in
-        pert_2 =  np.delete(np.append(percentile_in, 0), 0)
-        diff = (pert_2 - pert_1)[:4]
-        if sum(diff) == 0: # filter out zero value data
-            raise ValueError
-        else: # percentile weighted probability
-            non_zero_idx = np.where(diff!=0)[0]
-            diff = diff[non_zero_idx]
-            ave_out = percentile_in[1:][non_zero_idx]
-            pert_range = pert_range[non_zero_idx]
-            prob = np.divide(pert_range, diff) / sum(np.divide(pert_range, diff))
+        diff = percentile_in[:, 1:] - percentile_in[:, :4]
+        valid = diff.sum(axis=1) != 0 # filter out zero value data
+        keep = (diff != 0) & valid[:, None]
+        
+        # percentile weighted probability
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.divide(pert_range, diff, out=np.zeros(diff.shape), where=keep)
+            prob = weight / weight.sum(axis=1, keepdims=True)
+        
+        return [percentile_in[:, 1:], prob, keep, valid]
+    
+    def __pack_distribute(self, percentile_in, average_in) -> list:
+        """pack the distribution of each row into flat arrays with row offsets, 
+        rows without distribution fall back to their average with probability 1.0
+
+        Args:
+            percentile_in (ndarray): input of percentile size Nx5 (1%, 25%, 50%, 75%, 99%)
+            average_in (ndarray): average of each row size N
+
+        Returns:
+            list: flat average, flat probability, row offsets size N+1
+        """
+        
+        [ave, prob, keep, valid] = self.__cal_distribute(percentile_in)
+        ave = ave.astype(np.float64)
+        ave[~valid, 0] = average_in[~valid]
+        prob[~valid, 0] = 1.0
+        keep[~valid, 0] = True
+        ptr = np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int64)
+        
+        return [ave[keep], prob[keep], ptr]
             
-            return [ave_out, prob]
+            
+    def build_properties(self, i) -> PropertyTable:
+        """ calculate app/func's mem/dur distribution of the loaded raw tables
+            duration and memory rows are joined in a single merge, 
+            all distributions are calculated as 2-D arrays
+        
+        Args:
+            i (int): day of the raw tables
+
+        Returns:
+            PropertyTable: properties of the day
+        """
+        
+        # filter out app/func names that have both mem and dur properties
+        this_mem_raw = self.mem_raw.drop_duplicates(subset=["HashOwner", "HashApp"]) # remove duplicate info
+        this_day = self.dur_raw[["HashOwner", "HashApp", "HashFunction", "Average"] + self.dur_pct_col].merge(
+                        this_mem_raw[["HashOwner", "HashApp", "AverageAllocatedMb"] + self.mem_pct_col],
+                        on=["HashOwner", "HashApp"], how="inner")
+        this_day = this_day.drop_duplicates(subset=["HashOwner", "HashApp", "HashFunction"]) # remove duplicate info
+        
+        # calculate duration and memory properties
+        return PropertyTable.from_arrays(i, 
+                                         this_day["HashOwner"].values,
+                                         this_day["HashApp"].values,
+                                         this_day["HashFunction"].values,
+                                         self.__pack_distribute(this_day[self.mem_pct_col].values, this_day["AverageAllocatedMb"].values),
+                                         self.__pack_distribute(this_day[self.dur_pct_col].values, this_day["Average"].values))
             
             
     def __gen_properties(self, i, save=True) -> None:
@@ -99,64 +170,48 @@ class DataLoader():
             
         """
 
-        # print("Generating function properties...")
-        # filter out app/func names that have both mem and dur properties
-        # for i in range(self.max_day):
-        this_day = [[] for _ in range(len(self.dur_raw))]
-        this_mem_raw = self.mem_raw.drop_duplicates(subset=["HashOwner", "HashApp"]).set_index(["HashOwner", "HashApp"]) # remove duplicate info
-        # print("Processing Day{} data...".format(i+1))
-        with tqdm(total=len(self.dur_raw)) as pbar:
-            for dur_idx, dur_row in self.dur_raw.iterrows():
-                pbar.update(1)
-                try:
-                    mem_row = this_mem_raw.loc[dur_row["HashOwner"], dur_row["HashApp"]]
-                    
-                    # calculate duration properties
-                    try:      
-                        [dur_ave, dur_prob] = self.__cal_distribute(
-                                                dur_row[["percentile_Average_1",
-                                                        "percentile_Average_25",
-                                                        "percentile_Average_50",
-                                                        "percentile_Average_75",
-                                                        "percentile_Average_99"]].values)
-                    except ValueError:
-                        dur_ave = [dur_row["Average"]]
-                        dur_prob = [1.0]
-                        if dur_ave == 0:
-                            continue
-                    
-                    # calculate memory properties
-                    try:
-                        [mem_ave, mem_prob] = self.__cal_distribute(
-                                            mem_row[["AverageAllocatedMb_pct1",
-                                                    "AverageAllocatedMb_pct25",
-                                                    "AverageAllocatedMb_pct50",
-                                                    "AverageAllocatedMb_pct75",
-                                                    "AverageAllocatedMb_pct99"]].values)
-                    except ValueError:
-                        mem_ave = [mem_row["AverageAllocatedMb"]]
-                        mem_prob = [1.0]
-                        if mem_ave == 0:
-                            continue
-                    # save all good value to this_day
-                    this_day[dur_idx] = (str(i), dur_row["HashOwner"], dur_row["HashApp"], dur_row["HashFunction"], mem_ave, mem_prob, dur_ave, dur_prob)
-                    if type(dur_ave[0]) != int:
-                        
-                        print(dur_ave)
-                except KeyError:
-                    continue
-            this_day = list(filter(None, this_day)) # filter out unused entry
-            # full_data += this_day
-        self.data_info = pd.DataFrame(this_day, columns=self.data_info_col).drop_duplicates(subset=self.data_info_col[:4]) # remove duplicate info
-        
-        # self.data_info = self.data_info.pivot_table(["MemAve", "MemProb", "DurAve", "DurProb"], index=["Day", "HashOwner", "HashApp", "HashFunction"], aggfunc="mean")
+        self.properties = self.build_properties(i)
         
         if save == True:
-            output_path = os.path.join(self.data_path, "properties_{}.json".format(i))
-            self.data_info.to_json(output_path, orient='index')
-            
-        self.data_info = self.data_info.set_index(self.data_info_col[:4]).sort_index()
+            self.properties.save(self.__properties_path(i), self.__source_paths(i))
+    
+    def __properties_path(self, i) -> str:
+        return os.path.join(self.data_path, "properties_{}.npz".format(i))
     
+    def __source_paths(self, i) -> list:
+        return [os.path.join(self.data_path, self.mem_files[i-1]), os.path.join(self.data_path, self.dur_files[i-1])]
+    
+    def __migrate_json(self, i) -> bool:
+        """convert a properties_{i}.json cache of the previous version to the npz cache
+        the JSON cache is only trusted if it is newer than the source files
+
+        Returns:
+            bool: True if the properties are loaded from JSON
+        """
+        
+        json_path = os.path.join(self.data_path, "properties_{}.json".format(i))
+        if not os.path.exists(json_path):
+            return False
+        if os.path.getmtime(json_path) < max(os.path.getmtime(src) for src in self.__source_paths(i)):
+            return False
+        
+        data_info = pd.read_json(json_path).T.set_index(self.data_info_col[:4]).sort_index()
+        self.properties = PropertyTable.from_frame(data_info)
+        self.properties.save(self.__properties_path(i), self.__source_paths(i))
+        return True
+    
+    @property
+    def data_info(self) -> pd.DataFrame:
+        """list-valued properties frame indexed by [Day, HashOwner, HashApp, HashFunction],
+        materialized from self.properties on first access
+        """
+        if self._data_info is None:
+            self._data_info = self.properties.to_frame()
+        return self._data_info
+    
+    @data_info.setter
+    def data_info(self, value) -> None:
+        self._data_info = value
 
     
     def load_dataset(self, i) -> None:
@@ -169,29 +224,23 @@ class DataLoader():
         # self.mem_raw = [ [] for _ in range(self.max_day)]
         # self.dur_raw = [ [] for _ in range(self.max_day)]
         # self.inv_raw = [ [] for _ in range(self.max_day)]
+        self.mem_files = mem_files
+        self.dur_files = dur_files
         self.inv_files = inv_files
         self.exec_files = exec_files
         
         print("[P_{}] Getting dataset properties...".format(i))
-        # if self.json_:
-        json_ = "properties_{}.json".format(i)
-        if json_ in json_files:
-            print("[P_{}] Loading properties from JSON...".format(i))
-            json_path = os.path.join(self.data_path, json_)
-            self.data_info = pd.read_json(json_path).T.set_index(self.data_info_col[:4]).sort_index()
-            
-            # print("Now we are loading the invocation data...")
-            # for i in trange(self.max_day):
-            #     self.inv_raw[i] = pd.read_csv(os.path.join(self.data_path, inv_files[i]))
+        self.data_info = None
+        self.properties = PropertyTable.load(self.__properties_path(i), self.__source_paths(i))
+        if self.properties is not None:
+            print("[P_{}] Loading properties from cache...".format(i))
+        elif self.__migrate_json(i):
+            print("[P_{}] Migrated properties from JSON...".format(i))
         else:
             print("[P_{}] Generating properties from dataset...".format(i))
-            # print("It can be slow...But no worries we will save the result after finishing!")
-            # for i in trange(self.max_day):
-            # print(mem_files, i)
-            # print(os.path.join(self.data_path, mem_files[i-1]))
-            self.mem_raw = pd.read_csv(os.path.join(self.data_path, mem_files[i-1]))
-            self.dur_raw = pd.read_csv(os.path.join(self.data_path, dur_files[i-1]))
-                # self.inv_raw[i] = pd.read_csv(os.path.join(self.data_path, inv_files[i]))
+            self.mem_raw = self.reader.read_memory(os.path.join(self.data_path, mem_files[i-1]), self.mem_pct_col)
+            self.dur_raw = self.reader.read_duration(os.path.join(self.data_path, dur_files[i-1]), self.dur_pct_col)
             self.__gen_properties(i)
-            # print(self.data_info)
+            [self.mem_raw, self.dur_raw] = [None, None]
+        self.ids = HashInterner.from_properties(self.properties)
         print("[P_{}] Properties getting SUCCESS!".format(i))
\ No newline at end of file
@@ -0,0 +1,374 @@
+import numpy as np
+import heapq
+
+# order of simultaneous events
+END, INVOKE, EXPIRE, BUSY = 0, 1, 2, 3
+SMALL_BATCH = 8 # events of the same time and kind processed one by one, cheaper than array calls
+
+
+class KeepAlivePolicy():
+    """fixed keep alive of FixIntervalsimSys: an app is shut down after being idle for interval minutes,
+    an invocation at the expiry time keeps it, an execution without invocation does not.
+    With interval 0 the app is released right after each invocation.
+    """
+
+    count_cold_busy = True # executions of a shut down app count as busy time
+
+    def __init__(self, interval) -> None:
+        self.interval = interval
+
+    def reset(self, engine) -> None:
+        self.expire_at = np.full(engine.n_app, np.nan) # nan while the app has no expiry
+
+    def invoke(self, engine, t, apps, counts) -> None:
+        warm = engine.warm[apps]
+        self.expire_at[apps] = np.nan
+        engine.warm_start_count[apps] += np.where(warm, counts, counts - 1)
+        cold = apps[~warm]
+        engine.launch(t, cold)
+        engine.cold_start_count[cold] += 1
+        if self.interval == 0 and t < engine.horizon: # expire at t, only timers of other apps come before
+            engine.shut_down(t, apps)
+
+    def invoke_one(self, engine, t, app, count) -> None:
+        self.expire_at[app] = np.nan
+        if engine.warm[app]:
+            engine.warm_start_count[app] += count
+        else:
+            engine.launch_one(t, app)
+            engine.cold_start_count[app] += 1
+            engine.warm_start_count[app] += count - 1
+        if self.interval == 0 and t < engine.horizon: # expire at t, only timers of other apps come before
+            engine.shut_down_one(t, app)
+
+    def busy(self, engine, t, apps) -> None:
+        self.expire_at[apps] = np.nan
+
+    def busy_one(self, engine, t, app) -> None:
+        self.expire_at[app] = np.nan
+
+    def idle(self, engine, t, apps) -> None:
+        self.expire_at[apps] = t + self.interval
+        engine.schedule(t + self.interval, apps)
+
+    def idle_one(self, engine, t, app) -> None:
+        self.expire_at[app] = t + self.interval
+        engine.schedule(t + self.interval, app)
+
+    def expire(self, engine, t, apps) -> None:
+        due = apps[engine.warm[apps] & (self.expire_at[apps] == t)]
+        self.expire_at[due] = np.nan
+        engine.shut_down(t, due)
+
+    def expire_one(self, engine, t, app) -> None:
+        if engine.warm[app] and self.expire_at[app] == t:
+            self.expire_at[app] = np.nan
+            engine.shut_down_one(t, app)
+
+
+class GreedyMemoryPolicy():
+    """GreedyDual memory management of GreedysimSys: apps stay alive until memory is short,
+    then idle apps are shut down from the lowest priority clock + frequency / memory.
+    Cold starts that cannot fit even after shutting down all idle apps are dropped, largest first.
+    Invocations at the same time are admitted together, as one minute of GreedysimSys.
+    """
+
+    count_cold_busy = False
+
+    def __init__(self, total_mem, app_mem_list) -> None:
+        """
+        Args:
+            total_mem (int): memory of the system
+            app_mem_list (ndarray): memory of each app id
+        """
+        self.total_mem = total_mem
+        self.app_mem_list = app_mem_list
+
+    def reset(self, engine) -> None:
+        self.app_mem = self.app_mem_list.tolist()
+        self.current_mem = 0
+        self.frequency = [0] * engine.n_app
+        self.priority = [0.0] * engine.n_app
+        self.priority_heap = [] # (priority, app) of launched apps, checked lazily
+
+    def invoke(self, engine, t, apps, counts) -> None:
+        self.__admit(engine, t, apps.tolist(), counts.tolist())
+
+    def invoke_one(self, engine, t, app, count) -> None:
+        mem = self.app_mem[app]
+        warm = engine.warm[app]
+        if not warm and mem > self.total_mem: # system overflow, dropped
+            self.__shut_down_lowest(engine, t, self.current_mem - self.total_mem)
+            return
+        needed_mem = (0 if warm else mem) - (self.total_mem - self.current_mem)
+        if warm:
+            engine.warm_start_count[app] += count
+        else:
+            engine.launch_one(t, app)
+            engine.cold_start_count[app] += 1
+            engine.warm_start_count[app] += count - 1
+            self.current_mem += mem
+        self.frequency[app] += 1
+        self.priority[app] = t + 1 + self.frequency[app] / mem
+        self.__shut_down_lowest(engine, t, needed_mem)
+        heapq.heappush(self.priority_heap, (self.priority[app], app))
+
+    def __admit(self, engine, t, apps, counts) -> None:
+        """admit the invocations of time t together, on lists: evictions go one by one in priority order"""
+        app_mem = self.app_mem
+        warm = [engine.warm[app] for app in apps] # apps are distinct, launching one does not change the others
+        new_apps = [app for app, app_warm in zip(apps, warm) if not app_warm]
+        needed_mem = sum(app_mem[app] for app in new_apps)
+        left_mem = self.total_mem - sum(app_mem[app] for app, app_warm in zip(apps, warm) if app_warm)
+        dropped = set()
+        if needed_mem > left_mem: # system overflow
+            for app in sorted(new_apps, key=lambda app: (-app_mem[app], app)):
+                if needed_mem < left_mem:
+                    break
+                dropped.add(app)
+                needed_mem -= app_mem[app]
+
+        free_mem = self.total_mem - self.current_mem
+        invoked = []
+        for app, count, app_warm in zip(apps, counts, warm):
+            if app in dropped:
+                continue
+            if app_warm:
+                engine.warm_start_count[app] += count
+            else:
+                engine.launch_one(t, app)
+                engine.cold_start_count[app] += 1
+                engine.warm_start_count[app] += count - 1
+                self.current_mem += app_mem[app]
+            self.frequency[app] += 1
+            self.priority[app] = t + 1 + self.frequency[app] / app_mem[app] # clock counts minutes from 1
+            invoked.append(app)
+
+        # apps invoked now have a new priority, their heap entries are all stale
+        self.__shut_down_lowest(engine, t, needed_mem - free_mem)
+        for app in invoked:
+            heapq.heappush(self.priority_heap, (self.priority[app], app))
+
+    def __shut_down_lowest(self, engine, t, needed_mem) -> None:
+        """shut down the idle apps of lowest priority until they free needed_mem"""
+        while needed_mem > 0 and self.priority_heap:
+            [priority, app] = heapq.heappop(self.priority_heap)
+            if not engine.warm[app] or self.priority[app] != priority:
+                continue
+            engine.shut_down_one(t, app)
+            self.current_mem -= self.app_mem[app]
+            needed_mem -= self.app_mem[app]
+
+    def busy(self, engine, t, apps) -> None:
+        pass
+
+    def busy_one(self, engine, t, app) -> None:
+        pass
+
+    def idle(self, engine, t, apps) -> None:
+        pass
+
+    def idle_one(self, engine, t, app) -> None:
+        pass
+
+    def expire(self, engine, t, apps) -> None:
+        pass
+
+    def expire_one(self, engine, t, app) -> None:
+        pass
+
+
+class EventEngine():
+    """discrete-event simulation of app instances
+
+    The input is the list of execution spans of every app, with real valued times in minute.
+    Spans of an app may overlap, the app is busy while any of them runs. Events are processed
+    in time order, simultaneous events in the order END, INVOKE, EXPIRE, BUSY (start of a span
+    without invocation). The policy decides which apps are alive, the engine only touches
+    the apps of each event, so the cost grows with the number of events and not with apps x minutes.
+    The events of the same time and kind are processed together: the methods of the policy get
+    the sorted apps of such a batch as an array, each once, so the spans of a minute series
+    take a few numpy calls per minute instead of Python code per event. Events alone at their time,
+    as most starts of sub-minute spans, go to the *_one methods of the policy with a single app,
+    small batches of ends and starts without invocation are processed one by one as well.
+
+    On the minute spans of an execution series, KeepAlivePolicy gives the same results as
+    FixIntervalsimSys and GreedyMemoryPolicy the same cold starts and idle time as GreedysimSys.
+    GreedysimSys does not count the invocation minute as busy, the engine does.
+    """
+
+    def __init__(self, n_app, policy, horizon=1440) -> None:
+        """
+        Args:
+            n_app (int): number of apps, spans refer to apps by id in [0, n_app)
+            policy: KeepAlivePolicy, GreedyMemoryPolicy or any object with the same methods
+            horizon (float): end of the simulation in minute
+        """
+        self.n_app = n_app
+        self.policy = policy
+        self.horizon = horizon
+
+    def schedule(self, t, apps) -> None:
+        """ask the policy to check apps (an array, or a single app) at time t (EXPIRE event)"""
+        if t < self.horizon:
+            if t not in self.timers:
+                heapq.heappush(self.timer_times, t)
+                self.timers[t] = [[], []] # single apps, arrays of apps
+            if isinstance(apps, int):
+                self.timers[t][0].append(apps)
+            elif len(apps):
+                self.timers[t][1].append(apps)
+
+    def __expire_until(self, t, inclusive) -> None:
+        """fire the timers before t, and at t if inclusive"""
+        while self.timer_times and (self.timer_times[0] < t or (inclusive and self.timer_times[0] == t)):
+            t_timer = heapq.heappop(self.timer_times)
+            [single, arrays] = self.timers.pop(t_timer)
+            if not arrays and len(single) <= SMALL_BATCH:
+                for app in sorted(single):
+                    self.policy.expire_one(self, t_timer, app)
+            else:
+                self.policy.expire(self, t_timer, np.unique(np.concatenate(arrays + [single])).astype(np.int64))
+
+    def __account(self, t, apps) -> None:
+        """add the time since the last change of each app (each once) to its idle or busy time"""
+        elapsed = t - self.since[apps]
+        active = self.active[apps] > 0
+        busy = active & (self.warm[apps] | self.policy.count_cold_busy)
+        idle = ~active & self.warm[apps]
+        self.busy_time[apps[busy]] += elapsed[busy]
+        self.idle_time[apps[idle]] += elapsed[idle]
+        self.since[apps] = t
+
+    def __account_one(self, t, app) -> None:
+        """__account of a single app, without the array calls"""
+        elapsed = t - self.since[app]
+        if self.active[app]:
+            if self.warm[app] or self.policy.count_cold_busy:
+                self.busy_time[app] += elapsed
+        elif self.warm[app]:
+            self.idle_time[app] += elapsed
+        self.since[app] = t
+
+    def launch_one(self, t, app) -> None:
+        self.__account_one(t, app)
+        self.warm[app] = True
+
+    def launch(self, t, apps) -> None:
+        if len(apps):
+            self.__account(t, apps)
+            self.warm[apps] = True
+
+    def shut_down_one(self, t, app) -> None:
+        self.__account_one(t, app)
+        self.warm[app] = False
+
+    def shut_down(self, t, apps) -> None:
+        if len(apps):
+            self.__account(t, apps)
+            self.warm[apps] = False
+
+    def __run_one(self, t, what, app, count) -> None:
+        """process one event"""
+        self.__account_one(t, app)
+        if what == END:
+            self.active[app] -= 1
+            if not self.active[app] and self.warm[app]:
+                self.policy.idle_one(self, t, app)
+        elif what == INVOKE:
+            self.active[app] += 1
+            self.launched[app] = True
+            self.policy.invoke_one(self, t, app, count)
+        else: # BUSY
+            if not self.active[app]:
+                self.policy.busy_one(self, t, app)
+            self.active[app] += 1
+            self.launched[app] = True
+
+    def __run_batch(self, t, what, ev_app, ev_count) -> None:
+        """process the events of the same time and kind, sorted by app, each app once"""
+        new = ev_app[1:] != ev_app[:-1]
+        if new.all(): # no app has several spans
+            [apps, first, n_span] = [ev_app, None, 1]
+        else:
+            first = np.flatnonzero(np.concatenate([[True], new])) # first event of each app
+            [apps, n_span] = [ev_app[first], np.diff(first, append=len(ev_app))]
+        self.__account(t, apps)
+        if what == END:
+            self.active[apps] -= n_span
+            idle = apps[(self.active[apps] == 0) & self.warm[apps]]
+            if len(idle):
+                self.policy.idle(self, t, idle)
+        elif what == INVOKE: # all invocations of an app at the same time at once
+            self.active[apps] += n_span
+            self.launched[apps] = True
+            self.policy.invoke(self, t, apps, ev_count if first is None else np.add.reduceat(ev_count, first))
+        else: # BUSY
+            busy = apps[self.active[apps] == 0]
+            if len(busy):
+                self.policy.busy(self, t, busy)
+            self.active[apps] += n_span
+            self.launched[apps] = True
+
+    def run(self, app, start, end, count):
+        """simulate the spans
+
+        Args:
+            app (ndarray): app id of each span
+            start, end (ndarray): time of the span in minute, end > start
+            count (ndarray): number of invocations at the start of the span, 0 if none
+
+        Returns:
+            EventEngine: self, with the counters of every app
+        """
+
+        n_app = self.n_app
+        self.warm = np.zeros(n_app, dtype=bool)
+        self.active = np.zeros(n_app, dtype=np.int64)
+        self.since = np.zeros(n_app)
+        self.launched = np.zeros(n_app, dtype=bool)
+        self.cold_start_count = np.zeros(n_app, dtype=np.int64)
+        self.warm_start_count = np.zeros(n_app, dtype=np.int64)
+        self.idle_time = np.zeros(n_app)
+        self.busy_time = np.zeros(n_app)
+        [self.timer_times, self.timers] = [[], {}] # heap of the timer times, apps to check at each time
+        self.policy.reset(self)
+
+        # span starts and ends, sorted once and cut into batches of the same time and kind
+        time = np.concatenate([start, end]).astype(np.float64)
+        kind = np.concatenate([np.where(count > 0, INVOKE, BUSY), np.full(len(end), END)])
+        ev_app = np.concatenate([app, app]).astype(np.int64)
+        ev_count = np.concatenate([count, np.zeros(len(end), dtype=np.int64)]).astype(np.int64)
+        order = np.lexsort((ev_app, kind, time))
+        [time, kind, ev_app, ev_count] = [time[order], kind[order], ev_app[order], ev_count[order]]
+        bound = np.flatnonzero(np.diff(time, prepend=np.nan) != 0)
+        bound = np.union1d(bound, np.flatnonzero(np.diff(kind, prepend=-1) != 0))
+        bound = np.append(bound, len(time))
+
+        [app_lst, count_lst, timer_times] = [ev_app.tolist(), ev_count.tolist(), self.timer_times]
+        for [lo, hi, t, what] in zip(bound[:-1].tolist(), bound[1:].tolist(), time[bound[:-1]].tolist(), kind[bound[:-1]].tolist()):
+            if timer_times and timer_times[0] <= t:
+                self.__expire_until(t, what > EXPIRE)
+            if hi - lo == 1 or (hi - lo <= SMALL_BATCH and what != INVOKE): # invocations of a time are admitted together
+                for k in range(lo, hi):
+                    self.__run_one(t, what, app_lst[k], count_lst[k])
+            else:
+                self.__run_batch(t, what, ev_app[lo:hi], ev_count[lo:hi])
+
+        self.__expire_until(np.inf, True)
+        self.__account(self.horizon, np.arange(n_app))
+        return self
+
+    def __launched_rate(self, part, other) -> list:
+        """part / (part + other) of the launched apps with a nonzero total"""
+        launched = np.array(self.launched, dtype=bool)
+        part = np.array(part)
+        other = np.array(other)
+        valid = launched & ((part + other) > 0)
+        return np.divide(part[valid], part[valid] + other[valid]).tolist()
+
+    def cal_cold_rate(self):
+        return self.__launched_rate(self.cold_start_count, self.warm_start_count)
+
+    def cal_mem_waste(self):
+        return self.__launched_rate(self.idle_time, self.busy_time)
@@ -0,0 +1,115 @@
+import pandas as pd
+import numpy as np
+
+
+class HashInterner():
+    """dictionary encoding of HashOwner/HashApp/HashFunction into dense int32 ids
+
+    Ids follow the sorted order of the hash names, so the functions of an app and the
+    apps of an owner are contiguous. The hierarchy is kept as CSR offsets:
+    apps of owner o are [owner_ptr[o], owner_ptr[o+1]),
+    functions of app a are [app_ptr[a], app_ptr[a+1]).
+    """
+
+    def __init__(self, owner, app, func) -> None:
+        """
+        Args:
+            owner, app, func (ndarray): names of every function, sorted and unique
+        """
+
+        n_func = len(func)
+        new_app = np.ones(n_func, dtype=bool)
+        new_app[1:] = (owner[1:] != owner[:-1]) | (app[1:] != app[:-1])
+        app_first = np.flatnonzero(new_app)
+        self.func_name = func
+        self.func_app = (np.cumsum(new_app) - 1).astype(np.int32)
+        self.app_ptr = np.append(app_first, n_func).astype(np.int64)
+
+        app_owner = owner[app_first]
+        new_owner = np.ones(len(app_first), dtype=bool)
+        new_owner[1:] = app_owner[1:] != app_owner[:-1]
+        owner_first = np.flatnonzero(new_owner)
+        self.app_name = app[app_first]
+        self.app_owner = (np.cumsum(new_owner) - 1).astype(np.int32)
+        self.owner_ptr = np.append(owner_first, len(app_first)).astype(np.int64)
+        self.owner_name = app_owner[owner_first]
+
+        self.__func_index = None
+        self.__app_index = None
+
+    @classmethod
+    def from_properties(cls, properties):
+        """intern the functions of a PropertyTable, function id is the row of the table"""
+        return cls(properties.owner, properties.app, properties.func)
+
+    @property
+    def n_owner(self) -> int:
+        return len(self.owner_name)
+
+    @property
+    def n_app(self) -> int:
+        return len(self.app_name)
+
+    @property
+    def n_func(self) -> int:
+        return len(self.func_name)
+
+    def __func_lookup(self) -> pd.MultiIndex:
+        if self.__func_index is None:
+            self.__func_index = pd.MultiIndex.from_arrays(self.decode_funcs(np.arange(self.n_func)))
+        return self.__func_index
+
+    def __app_lookup(self) -> pd.MultiIndex:
+        if self.__app_index is None:
+            self.__app_index = pd.MultiIndex.from_arrays(self.decode_apps(np.arange(self.n_app)))
+        return self.__app_index
+
+    def encode_funcs(self, owner, app, func):
+        """
+        Returns:
+            ndarray: function id of each (owner, app, func), -1 if unknown
+        """
+        return self.__func_lookup().get_indexer(pd.MultiIndex.from_arrays([owner, app, func])).astype(np.int32)
+
+    def encode_apps(self, owner, app):
+        """
+        Returns:
+            ndarray: app id of each (owner, app), -1 if unknown
+        """
+        return self.__app_lookup().get_indexer(pd.MultiIndex.from_arrays([owner, app])).astype(np.int32)
+
+    def decode_funcs(self, func_ids) -> list:
+        """
+        Returns:
+            list: [HashOwner, HashApp, HashFunction] names of the functions
+        """
+        app_ids = self.func_app[func_ids]
+        return [self.owner_name[self.app_owner[app_ids]], self.app_name[app_ids], self.func_name[func_ids]]
+
+    def decode_apps(self, app_ids) -> list:
+        """
+        Returns:
+            list: [HashOwner, HashApp] names of the apps
+        """
+        return [self.owner_name[self.app_owner[app_ids]], self.app_name[app_ids]]
+
+    def func_frame_index(self, func_ids) -> pd.MultiIndex:
+        """[HashOwner, HashApp, HashFunction] index of the functions, for DataFrame output"""
+        return pd.MultiIndex.from_arrays(self.decode_funcs(func_ids), names=["HashOwner", "HashApp", "HashFunction"])
+
+    def app_max(self, func_ids, series):
+        """collapse function rows into app rows by taking the maximum of each column
+
+        Args:
+            func_ids (ndarray): sorted function id of each row
+            series (ndarray): one row per function
+
+        Returns:
+            list: [app ids, one row per app]
+        """
+
+        app_ids = self.func_app[func_ids]
+        if not len(app_ids):
+            return [app_ids, series[:0]]
+        first = np.flatnonzero(np.diff(app_ids, prepend=-1))
+        return [app_ids[first], np.maximum.reduceat(series, first, axis=0)]
@@ -1,131 +1,9 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import copy
 import os
 import ipdb
 
-class simFunction():
-    def __init__(self, ID, times) -> None:
-        self.ID = ID
-        self.times = times
-
-class simApp():
-    def __init__(self, ID) -> None:
-        """_summary_
-
-        Args:
-            ID (str): app ID
-        """
-            
-        self.ID = ID
-        self.func_dict = dict()
-        self.mem_allocated = 0
-        self.idle_time = 0.0
-        self.state = True # idle = False vs occupied = True
-    
-    def update(self):
-        self.state = True
-        if len(self.func_dict) == 0:
-            self.idle_time += 1.0
-            self.state = False
-            return
-        for func in self.func_dict:
-            if func.dur_left < 0:
-                self.func_dict.pop(func.ID)
-                
-    def step(self):
-        for func in self.func_dict:
-            func.step()
-        
-class simOwner():
-    def __init__(self, ID) -> None:
-        self.ID = ID
-        self.app_dict = dict()
-        
-    def update(self) -> None: #key management strategy
-        for app in self.app_dict:
-            if app.state == False: # idle app
-                self.app_dict.pop(app.ID)
-            else:
-                app.update()
-                
-    def step(self):
-        for app in self.app_dict:
-            app.step()
-        
-class FixIntervalsimOwner(simOwner):
-    def __init__(self, ID, timeout) -> None:
-        super().__init__(ID)
-        self.timeout = timeout
-        
-    def update(self):
-        for app in self.app_dict:
-            if app.state == False and app.idle_time > self.timeout: # idle app
-                self.app_dict.pop(app.ID)
-            else:
-                app.update()
-                
-class CachesimOwner(simOwner):
-    def __init__(self, ID) -> None:
-        super().__init__(ID)
-        
-    def update(self) -> None:
-        # calculate priority for each app
-        pass
-        
-class BaselineManager():
-    def __init__(self, data_info, owner_dict) -> None:
-        self.data_info = data_info
-        self.system_clock = [0, 0] # [day, sec]
-        self.owner_dict = owner_dict
-        self.control_type = 'base'
-    
-    def __register_app(self, ID_arr, memory):
-        [owner_id, app_id, func_id] = ID_arr
-        if app_id not in self.owner_dict[owner_id].app_dict.keys():
-            app = simApp(ID=app_id)
-            app.mem_allocated = memory
-            self.owner_dict[owner_id].app_dict[app_id] = app
-            return True
-        else:
-            return False
-    
-    def __register_owner(self, ID):
-        if ID not in self.owner_dict.keys(): # new owners app, register it
-            self.owner_dict[ID] = simOwner(ID)
-            return True
-        else:
-            return False
-            
-    
-    def register_func(self, ID_arr, mem, times):
-        """register a function
-
-        Args:
-            day (str): day of running
-            ID_arr (ndarray): ID in a array ([OwnerID, AppID, FunctionID])
-            times (int): how many times this function runs within 1 secs
-        """
-        
-        
-        
-        [owner_id, app_id, func_id] = ID_arr
-        result_owner = self.__register_owner(owner_id)
-        result_app = self.__register_app(ID_arr, mem)
-        
-        # dur = self.__generate_func_dur(day=day, ID_arr=ID_arr)
-        func = simFunction(func_id, times)
-        
-        if result_app == True: # which means cold start
-            self.owner_dict[owner_id].app_dict[app_id].func_dict[func_id] = func
-        else:
-            if func_id in self.owner_dict[owner_id].app_dict[app_id].func_dict.keys():
-                # which means previous invocation in queue
-                self.owner_dict[owner_id].app_dict[app_id].func_dict[func_id].dur_left += func.dur_left
-            else:
-                self.owner_dict[owner_id].app_dict[app_id].func_dict[func_id] = func
-                
 class FixIntervalsimApp():
     def __init__(self, interval, func_series_in) -> None:
         # app properties
@@ -185,189 +63,817 @@ class FixIntervalsimApp():
             self.cold_start_rate = self.cold_start_count / (self.cold_start_count + self.warm_start_count)
             self.mem_waste_rate = self.idle_time / (self.idle_time + self.busy_time)
             
+class FixIntervalEvaluator():
+    """fixed keep-alive results of many apps for any interval, from the idle gaps of their series
+    
+    Minutes flagged with more than one invocation (>= 3) are skipped like FixIntervalsimApp does.
+    On the remaining minutes an app only changes state on invocations (2) and idle minutes (0):
+    an invocation is a cold start if it is the first one or if an idle run longer than the
+    interval happened since the previous invocation, and an idle run counts min(length, interval + 1)
+    idle minutes if the app is still alive when it starts.
+    """
+    
+    def __init__(self, exec_series, chunk_size=4096) -> None:
+        """
+        Args:
+            exec_series (ndarray): execution series, app x minute
+            chunk_size (int): number of apps processed at once
+        """
+        
+        self.n_app = len(exec_series)
+        self.n_invoc = np.zeros(self.n_app, dtype=np.int64)
+        self.busy_time = np.zeros(self.n_app, dtype=np.int64)
+        gap = [[], []]
+        run = [[], [], []]
+        for lo in range(0, self.n_app, chunk_size):
+            chunk = self.__idle_gaps(exec_series[lo:lo + chunk_size])
+            self.n_invoc[lo:lo + chunk_size] = chunk[0]
+            self.busy_time[lo:lo + chunk_size] = chunk[1]
+            gap[0].append(chunk[2] + lo)
+            gap[1].append(chunk[3])
+            run[0].append(chunk[4] + lo)
+            run[1].append(chunk[5])
+            run[2].append(chunk[6])
+        
+        # longest idle run between an invocation and the previous one of the same app
+        [self.gap_app, self.gap_max] = [np.concatenate(v) if v else np.zeros(0, dtype=np.int64) for v in gap]
+        # idle runs after the first invocation, with the longest earlier run since the last invocation
+        [self.run_app, self.run_len, self.run_prev_max] = [np.concatenate(v) if v else np.zeros(0, dtype=np.int64) for v in run]
+    
+    @staticmethod
+    def __idle_gaps(exec_series) -> list:
+        """run-length encode the idle minutes of a block of apps
+        
+        Returns:
+            list: invocations and busy minutes of each app, 
+                  [app, longest idle run] of every invocation after the first,
+                  [app, length, longest earlier run since the last invocation] of every idle run after the first invocation
+        """
+        
+        n_app = len(exec_series)
+        kept = exec_series < 3
+        app = np.nonzero(kept)[0]
+        value = exec_series[kept]
+        
+        invoc = value == 2
+        n_invoc = np.bincount(app[invoc], minlength=n_app)
+        busy_time = np.bincount(app[value > 0], minlength=n_app)
+        
+        # segment: minutes of an app following the same invocation, unique and increasing over the block
+        invoc_seen = np.cumsum(invoc)
+        invoc_before = (np.cumsum(n_invoc) - n_invoc)[app] # invocations of the previous apps
+        seg = invoc_seen + app
+        after_first = invoc_seen > invoc_before
+        
+        idle = value == 0
+        new_app = np.ones(len(app), dtype=bool)
+        new_app[1:] = app[1:] != app[:-1]
+        run_start = idle & (new_app | ~np.roll(idle, 1))
+        run_len = np.bincount(np.cumsum(run_start)[idle] - 1)
+        [run_app, run_len, run_seg] = [v[after_first[run_start]] for v in [app[run_start], run_len, seg[run_start]]]
+        
+        # running maximum of the run length inside each segment
+        scale = exec_series.shape[1] + 1
+        run_max = np.maximum.accumulate(run_seg * scale + run_len) - run_seg * scale
+        same_seg = np.zeros(len(run_seg), dtype=bool)
+        same_seg[1:] = run_seg[1:] == run_seg[:-1]
+        run_prev_max = np.where(same_seg, np.roll(run_max, 1), 0)
+        
+        # an invocation after the first closes the segment just before it
+        seg_last = np.ones(len(run_seg), dtype=bool)
+        seg_last[:-1] = ~same_seg[1:]
+        seg_max = np.zeros(len(app) + n_app + 1, dtype=np.int64)
+        seg_max[run_seg[seg_last]] = run_max[seg_last]
+        gap_invoc = invoc & (invoc_seen > invoc_before + 1)
+        gap_max = seg_max[seg[gap_invoc] - 1]
+        
+        return [n_invoc, busy_time, app[gap_invoc], gap_max, run_app, run_len, run_prev_max]
+    
+    def evaluate(self, intv) -> list:
+        """
+        Args:
+            intv (int): keep alive interval
+            
+        Returns:
+            list: [cold start rates, memory waste rates] of the launched apps, same as FixIntervalsimApp
+        """
+        
+        launched = self.n_invoc > 0
+        cold_start = launched + np.bincount(self.gap_app[self.gap_max > intv], minlength=self.n_app)
+        idle_len = np.where(self.run_prev_max <= intv, np.minimum(self.run_len, intv + 1), 0)
+        idle_time = np.bincount(self.run_app, weights=idle_len, minlength=self.n_app).astype(np.int64)
+        
+        cold_rate = np.divide(cold_start[launched], self.n_invoc[launched])
+        mem_rate = np.divide(idle_time[launched], idle_time[launched] + self.busy_time[launched])
+        return [cold_rate.tolist(), mem_rate.tolist()]
+            
+class InstanceEvaluator():
+    """fixed keep-alive results at instance granularity, from the instances each app needs every minute
+    
+    An app runs one instance per concurrent execution. Idle instances are reused last-in first-out and 
+    each one is shut down after interval idle minutes, so the instances warm at a minute are the most
+    needed over the interval + 1 minutes up to it: a window maximum of the demand.
+    New instances above the ones warm at the previous minute are cold starts, 
+    every warm instance not running wastes the memory of the app for the minute.
+    """
+    
+    def __init__(self, demand, n_invoc, chunk_size=4096) -> None:
+        """
+        Args:
+            demand (ndarray): instances needed, app x minute
+            n_invoc (ndarray): invocations of each app
+            chunk_size (int): number of apps processed at once
+        """
+        self.demand = demand
+        self.n_invoc = np.asarray(n_invoc, dtype=np.int64)
+        self.chunk_size = chunk_size
+        self.busy_time = demand.sum(axis=1, dtype=np.int64)
+    
+    @staticmethod
+    def __window_max(series, width):
+        """maximum of the last width columns up to each column, by doubling windows
+
+        Args:
+            series (ndarray): one row per app
+            width (int): window length in minutes
+        """
+        if width >= series.shape[1]:
+            return np.maximum.accumulate(series, axis=1)
+        out = series.copy()
+        span = 1 # out covers windows of span columns
+        while 2 * span <= width:
+            out[:, span:] = np.maximum(out[:, span:], out[:, :-span])
+            span *= 2
+        if span < width: # two overlapping windows of span columns
+            shift = width - span
+            out[:, shift:] = np.maximum(out[:, shift:], out[:, :-shift])
+        return out
+    
+    def warm(self, intv, lo=0, hi=None):
+        """
+        Returns:
+            ndarray: instances kept warm at the end of each minute, apps [lo, hi) x minute
+        """
+        return self.__window_max(self.demand[lo:hi], intv + 1)
+    
+    def evaluate(self, intv) -> list:
+        """
+        Args:
+            intv (int): keep alive interval of each instance
+            
+        Returns:
+            list: [cold start rates, memory waste rates] of the invoked apps
+        """
+        n_app = len(self.demand)
+        cold_start = np.zeros(n_app, dtype=np.int64)
+        idle_time = np.zeros(n_app, dtype=np.int64)
+        for lo in range(0, n_app, self.chunk_size):
+            demand = self.demand[lo:lo + self.chunk_size].astype(np.int64)
+            warm = self.__window_max(demand, intv + 1)
+            cold_start[lo:lo + self.chunk_size] = np.maximum(demand[:, 1:] - warm[:, :-1], 0).sum(axis=1) + demand[:, 0]
+            idle_time[lo:lo + self.chunk_size] = (warm - demand).sum(axis=1)
+        
+        launched = self.n_invoc > 0
+        cold_rate = np.divide(cold_start[launched], self.n_invoc[launched])
+        mem_rate = np.divide(idle_time[launched], idle_time[launched] + self.busy_time[launched])
+        return [cold_rate.tolist(), mem_rate.tolist()]
+    
+    def memory(self, intv, app_mem):
+        """
+        Args:
+            intv (int): keep alive interval of each instance
+            app_mem (ndarray): memory of an instance of each app
+
+        Returns:
+            ndarray: memory held by the warm instances of all apps at each minute
+        """
+        total = np.zeros(self.demand.shape[1], dtype=np.int64)
+        for lo in range(0, len(self.demand), self.chunk_size):
+            total += np.asarray(app_mem[lo:lo + self.chunk_size], dtype=np.int64) @ self.warm(intv, lo, lo + self.chunk_size)
+        return total
+
+class AppState():
+    """per-app state of the system simulators as typed arrays of shape (policy, app),
+    each row is the independent state of one policy of a sweep
+    """
+    
+    column_names = ["state", 
+                    "status", 
+                    "memory", 
+                    "idle_timer",
+                    "never_launch",
+                    "idle_time",
+                    "busy_time", 
+                    "cold_start_count", 
+                    "warm_start_count",
+                    "priority",
+                    "frequency"]
+    
+    def __init__(self, n_app, n_policy=1) -> None:
+        shape = (n_policy, n_app)
+        self.state = np.zeros(shape, dtype=bool)                # False: off, True: On
+        self.status = np.zeros(shape, dtype=bool)               # False: idle, True: Busy
+        self.memory = np.zeros(shape, dtype=np.int64)           # memory held by the app
+        self.idle_timer = np.zeros(shape, dtype=np.int32)
+        self.never_launch = np.ones(shape, dtype=bool)
+        self.idle_time = np.zeros(shape, dtype=np.int32)
+        self.busy_time = np.zeros(shape, dtype=np.int32)
+        self.cold_start_count = np.zeros(shape, dtype=np.int64)
+        self.warm_start_count = np.zeros(shape, dtype=np.int64)
+        self.priority = np.zeros(shape, dtype=np.float64)
+        self.frequency = np.zeros(shape, dtype=np.int64)
+    
+    @property
+    def n_policy(self) -> int:
+        return self.state.shape[0]
+        
+    def to_frame(self, app_ids) -> pd.DataFrame:
+        index = pd.MultiIndex.from_product([range(self.n_policy), app_ids], names=["Policy", "AppID"])
+        return pd.DataFrame({col: getattr(self, col).ravel() for col in self.column_names}, index=index)
+            
 class FixIntervalsimSys():
-    def __init__(self, app_name_list) -> None:
+    def __init__(self, app_ids, n_policy=None) -> None:
+        """
+        Args:
+            app_ids (ndarray): app id of each app
+            n_policy (int): number of policies simulated together, 
+                            policy parameters are then given as one value per policy.
+                            None for a single policy with scalar parameters
+        """
         # app properties
-        self.column_names = ["HashOwner",
-                             "HashApp",
-                             "state", 
-                             "status", 
-                             "memory", 
-                             "idle_timer",
-                             "never_launch",
-                             "idle_time",
-                             "busy_time", 
-                             "cold_start_count", 
-                             "warm_start_count"]
-        self.sys_monitor = pd.DataFrame(columns=self.column_names)
-        # self.sys_monitor[:] = 0
-        self.app_name_list = app_name_list
-        self.sys_monitor[self.column_names[:2]] = app_name_list
-        self.sys_monitor = self.sys_monitor.fillna(0)
-        
-        self.sys_monitor = self.sys_monitor.set_index(self.column_names[:2])
-        self.sys_monitor.loc[:, ("state", "status")] = False
-        self.sys_monitor.loc[:, "never_launch"] = True
+        self.app_ids = app_ids
+        self.n_policy = n_policy
+        self.apps = AppState(len(app_ids), 1 if n_policy is None else n_policy)
         self.keep_alive_interval = 0
-
+        self.telemetry = None # Telemetry recording every minute if set
+        
+    @property
+    def sys_monitor(self) -> pd.DataFrame:
+        """snapshot of the app states as a frame indexed by AppID, or by [Policy, AppID] for a sweep"""
+        frame = self.apps.to_frame(self.app_ids)
+        if self.n_policy is None:
+            frame = frame.droplevel("Policy")
+        return frame
+    
+    def policy_param(self, value):
+        """
+        Returns:
+            ndarray: scalar or per-policy parameter as a (policy, 1) column
+        """
+        return np.broadcast_to(np.reshape(value, (-1, 1)), (self.apps.n_policy, 1))
+    
+    def per_policy(self, rows) -> list:
+        """
+        Returns:
+            list: one result per policy for a sweep, the result itself for a single policy
+        """
+        return rows[0] if self.n_policy is None else rows
 
     def update(self, exec_now):    
+        """advance one minute
+
+        Args:
+            exec_now (ndarray): execution state of every app at this minute, 
+                                shared by all policies or one row per policy
+        """
+        apps = self.apps
+        exec_now = np.broadcast_to(exec_now.astype(np.int64), apps.state.shape)
+        running = exec_now.astype(bool)
         # update never launch----------------------------------
-        self.sys_monitor["never_launch"] = ~np.any([~self.sys_monitor["never_launch"].values, exec_now.astype(bool)], axis=0)
+        apps.never_launch &= ~running
 
         # invocation func ----------------------------------
         invc_app = (exec_now > 1)
-        # invc_app = (exec_now - 2) == 0
-        # invc_app = (exec_now - 1) == 0
-        self.sys_monitor.loc[invc_app, "status"] = True
-        self.sys_monitor.loc[invc_app, "busy_time"] += 1
-        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+        apps.status[invc_app] = True
+        apps.busy_time[invc_app] += 1
+        apps.idle_timer[invc_app] = 0
         
         # warm start invocation func need to be count first
-        warm_app = np.all([self.sys_monitor["state"].values, self.sys_monitor["status"].values], axis=0) & invc_app
-        self.sys_monitor.loc[warm_app, "warm_start_count"] += (exec_now[warm_app] - 1) # -1 is a flag added when generating the exec files
+        warm_app = apps.state & apps.status & invc_app
+        apps.warm_start_count[warm_app] += (exec_now[warm_app] - 1) # -1 is a flag added when generating the exec files
         
         # cold start invocation func count then (coz this will change state)
-        cold_app = np.all([~self.sys_monitor["state"].values, self.sys_monitor["status"].values], axis=0) & invc_app
-        self.sys_monitor.loc[cold_app, "state"] = True
-        self.sys_monitor.loc[cold_app, "cold_start_count"] += 1
-        self.sys_monitor.loc[cold_app, "warm_start_count"] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+        cold_app = ~apps.state & apps.status & invc_app
+        apps.state[cold_app] = True
+        apps.cold_start_count[cold_app] += 1
+        apps.warm_start_count[cold_app] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
         
         # stop idle timeout app --------------------------------
-        timeout_apps = self.sys_monitor["idle_timer"].values >= self.keep_alive_interval
-        self.sys_monitor.loc[timeout_apps, "state"] = False
-        self.sys_monitor.loc[timeout_apps, "idle_timer"] = 0
+        timeout_apps = apps.idle_timer >= self.policy_param(self.keep_alive_interval)
+        if self.telemetry is not None:
+            n_timeout = np.count_nonzero(timeout_apps & apps.state, axis=1)
+        apps.state[timeout_apps] = False
+        apps.idle_timer[timeout_apps] = 0
         
         # for those func stop running---------------------------
-        stop_funcs = ~exec_now.astype(bool)
-        self.sys_monitor.loc[stop_funcs, "status"] = False
+        stop_funcs = ~running
+        apps.status[stop_funcs] = False
         
         # if app is running
-        idle_apps = np.all([self.sys_monitor["state"].values, ~self.sys_monitor["status"].values], axis=0) & stop_funcs
-        self.sys_monitor.loc[idle_apps, (["idle_time", "idle_timer"])] += 1 
+        idle_apps = apps.state & ~apps.status & stop_funcs
+        apps.idle_time[idle_apps] += 1 
+        apps.idle_timer[idle_apps] += 1 
         
         # running func ----------------------------------
         invc_app = (exec_now == 1) 
-        self.sys_monitor.loc[invc_app, "busy_time"] += 1
-        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+        apps.busy_time[invc_app] += 1
+        apps.idle_timer[invc_app] = 0
         
+        if self.telemetry is not None:
+            self.telemetry.record(0, np.count_nonzero(apps.state & running, axis=1), np.count_nonzero(idle_apps, axis=1),
+                                  np.count_nonzero(cold_app, axis=1), n_timeout, 0)
         return True
+    
+    def snapshot(self) -> list:
+        """
+        Returns:
+            list: copy of the counters [cold starts, warm starts, idle time, busy time], 
+                  the since argument of the rates of a period
+        """
+        apps = self.apps
+        return [apps.cold_start_count.copy(), apps.warm_start_count.copy(), apps.idle_time.copy(), apps.busy_time.copy()]
+    
+    def __launched_rate(self, part, other) -> list:
+        """part / (part + other) of the launched apps with a nonzero total, per policy"""
+        valid = ~self.apps.never_launch & (part | other).astype(bool)
+        rate = np.divide(part, part + other, out=np.zeros(part.shape), where=valid)
+        return self.per_policy([row[mask].tolist() for row, mask in zip(rate, valid)])
         
-    def cal_cold_rate(self):
-        launch_func = ~self.sys_monitor["never_launch"].values
-        cold_start_count = self.sys_monitor.loc[launch_func, "cold_start_count"].values
-        # if not len(cold_start_count): cold_start_count = np.array([0])
-        warm_start_count = self.sys_monitor.loc[launch_func, "warm_start_count"].values
-        # if not len(warm_start_count): warm_start_count = np.array([0])
-        valid_idx = (cold_start_count | warm_start_count).astype(bool)
-        cold_start_count = cold_start_count[valid_idx]
-        warm_start_count = warm_start_count[valid_idx]
-        return np.divide(cold_start_count, cold_start_count + warm_start_count).tolist()
-    
-    def cal_mem_waste(self):
-        launch_func = ~self.sys_monitor["never_launch"].values
-        # ipdb.set_trace()
-        idle_time = self.sys_monitor.loc[launch_func, "idle_time"].values
-        # if not len(idle_time): idle_time = np.array([0])
-        busy_time = self.sys_monitor.loc[launch_func, "busy_time"].values
-        valid_idx = (idle_time | busy_time).astype(bool)
-        busy_time = busy_time[valid_idx]
-        idle_time = idle_time[valid_idx]
-        # if not len(busy_time): busy_time = np.array([0])
-        return np.divide(idle_time, idle_time+busy_time).tolist()
+    def cal_cold_rate(self, since=None):
+        """
+        Args:
+            since (list): snapshot at the start of the period, None for the whole run
+        """
+        if since is None:
+            return self.__launched_rate(self.apps.cold_start_count, self.apps.warm_start_count)
+        return self.__launched_rate(self.apps.cold_start_count - since[0], self.apps.warm_start_count - since[1])
+    
+    def cal_mem_waste(self, since=None):
+        """
+        Args:
+            since (list): snapshot at the start of the period, None for the whole run
+        """
+        if since is None:
+            return self.__launched_rate(self.apps.idle_time, self.apps.busy_time)
+        return self.__launched_rate(self.apps.idle_time - since[2], self.apps.busy_time - since[3])
     
 class GreedysimSys(FixIntervalsimSys):
-    def __init__(self, app_name_list, app_mem_list) -> None:
-        super().__init__(app_name_list)
+    def __init__(self, app_ids, app_mem_list, n_policy=None) -> None:
+        super().__init__(app_ids, n_policy)
         self.total_mem = 0
         self.current_mem = 0
         self.system_clock = 0
-        self.column_names = ["HashOwner",
-                            "HashApp",
-                            "state", 
-                            "status", 
-                            "memory", 
-                            "idle_timer",
-                            "never_launch",
-                            "idle_time",
-                            "busy_time", 
-                            "cold_start_count", 
-                            "warm_start_count",
-                            "priority",
-                            "clock",
-                            "frequency"]
-        self.sys_monitor["priority"] = 0
-        self.sys_monitor["clock"] = 0
-        self.sys_monitor["frequency"] = 0
-        
         self.app_mem_list = app_mem_list     
+        # apps by descending memory, to drop the largest new invocations on overflow
+        self.size_order = np.argsort(-app_mem_list, kind='stable')
+        # launched apps of each policy sorted by (priority, app), entries are checked lazily:
+        # an entry is stale once the app is shut down or its priority changed
+        self.index_priority = [np.zeros(0, dtype=np.float64) for _ in range(self.apps.n_policy)]
+        self.index_app = [np.zeros(0, dtype=np.int64) for _ in range(self.apps.n_policy)]
+        self.index_dirty = np.zeros(self.apps.state.shape, dtype=bool) # priority changed since the last insert
+        
+    def priority(self, invc_app):
+        """
+        Args:
+            invc_app (tuple): (policy, app) coordinates of the apps invoked at this minute
+
+        Returns:
+            ndarray: new priority of each invoked app, the lowest priorities are evicted first
+        """
+        return self.system_clock + np.divide(self.apps.frequency[invc_app], self.app_mem_list[invc_app[1]])
+    
+    def __drop_overflow(self, exec_now, new_app, needed_mem, left_mem):
+        """drop the largest new invocations of one policy until the needed memory fits, 
+        exec_now is modified in place
+
+        Returns:
+            int: memory still needed by the remaining new invocations
+        """
+        new_app_order = self.size_order[new_app[self.size_order]]
+        left_needed = needed_mem - np.cumsum(self.app_mem_list[new_app_order])
+        n_drop = np.searchsorted(-left_needed, -left_mem, side='right') + 1 # first left_needed < left_mem
+        exec_now[new_app_order[:n_drop]] = 0
+        if n_drop > len(new_app_order): # no memory left at all, nothing can run
+            exec_now[:] = 0
+            return 0
+        return left_needed[n_drop - 1]
+    
+    def invoke(self, exec_now) -> list:
+        """count the warm and cold starts of the invocations of this minute, 
+        launch the invoked apps and update their priority
+
+        Returns:
+            list: [(policy, app) coordinates of the invocations, whether each one was a warm start]
+        """
+        apps = self.apps
+        apps.never_launch &= ~exec_now.astype(bool)
+        invc_app = np.unravel_index(np.flatnonzero(exec_now > 1), exec_now.shape)
+        invc_exec = exec_now[invc_app]
+        warm_app = apps.state[invc_app]
+        apps.warm_start_count[invc_app] += np.where(warm_app, invc_exec - 1, invc_exec - 2) # -2 is one for flag, one for cold start
+        apps.cold_start_count[invc_app] += ~warm_app
+        apps.state[invc_app] = True
+        
+        # update priority
+        apps.frequency[invc_app] += 1 # update frequency
+        apps.memory[invc_app] = self.app_mem_list[invc_app[1]]
+        apps.priority[invc_app] = self.priority(invc_app) # update priority
+        return [invc_app, warm_app]
+    
+    def count_time(self, exec_now) -> np.ndarray:
+        """update idle/busy time of the launched apps at the end of the minute
+
+        Returns:
+            ndarray: launched apps idle at this minute
+        """
+        apps = self.apps
+        # for those func stop running but app is running
+        idle_apps = apps.state & ~exec_now.astype(bool)
+        apps.idle_time += idle_apps
+        apps.idle_timer += idle_apps
+        
+        # for thos func is running running and app is running
+        busy_apps = (exec_now == 1) & apps.state
+        apps.busy_time += busy_apps
+        apps.idle_timer *= ~busy_apps
+        return idle_apps
+    
+    def __index_insert(self, p, app):
+        """insert apps into the priority index of policy p with their current priority, ties are ordered by app id"""
+        priority = self.apps.priority[p, app]
+        order = np.lexsort((app, priority))
+        [priority, app] = [priority[order], app[order]]
+        pos = np.searchsorted(self.index_priority[p], priority, side='left')
+        tie_end = np.searchsorted(self.index_priority[p], priority, side='right')
+        for k in np.flatnonzero(tie_end > pos): # equal priorities are rare
+            pos[k] += np.searchsorted(self.index_app[p][pos[k]:tie_end[k]], app[k])
+        self.index_priority[p] = np.insert(self.index_priority[p], pos, priority)
+        self.index_app[p] = np.insert(self.index_app[p], pos, app)
+    
+    def __index_valid(self, p, lo, hi):
+        """
+        Returns:
+            ndarray: mask of the entries [lo, hi) of the index of policy p still matching a launched app
+        """
+        app = self.index_app[p][lo:hi]
+        return self.apps.state[p, app] & (self.apps.priority[p, app] == self.index_priority[p][lo:hi])
+    
+    def __evict(self, p, idle_app, needed_mem):
+        """shut down idle apps of policy p from the lowest priority until needed_mem is freed
+        apps invoked in this tick stay dirty, their index entries are all stale
+
+        Returns:
+            int: number of apps shut down
+        """
+        [state, memory] = [self.apps.state[p], self.apps.memory[p]]
+        dirty = np.flatnonzero(self.index_dirty[p] & idle_app)
+        self.__index_insert(p, dirty)
+        self.index_dirty[p, dirty] = False
+        
+        # look at growing windows of the lowest priorities until enough memory is found
+        n_index = len(self.index_app[p])
+        window = 64
+        while True:
+            window = min(window, n_index)
+            valid = self.__index_valid(p, 0, window)
+            app = self.index_app[p][:window][valid]
+            freed = np.cumsum(memory[app])
+            if window == n_index or (len(freed) and freed[-1] >= needed_mem):
+                break
+            window *= 2
+        n_evict = min(np.searchsorted(freed, needed_mem) + 1, len(app)) # until freed >= needed_mem
+        state[app[:n_evict]] = False
+        memory[app[:n_evict]] = 0
+        
+        # drop the evicted and stale entries of the window, or of the whole index once they dominate
+        if n_index > 2 * np.count_nonzero(state) + 1024:
+            window = n_index
+        keep = np.ones(n_index, dtype=bool)
+        keep[:window] = self.__index_valid(p, 0, window)
+        self.index_priority[p] = self.index_priority[p][keep]
+        self.index_app[p] = self.index_app[p][keep]
+        return n_evict
         
     def update(self, exec_now):
+        """advance one minute
+
+        Args:
+            exec_now (ndarray): execution state of every app at this minute, 
+                                shared by all policies or one row per policy.
+                                Each policy drops invocations for lack of memory in its own copy
+        """
+        apps = self.apps
         self.system_clock += 1
+        exec_now = np.array(np.broadcast_to(exec_now, apps.state.shape), dtype=np.int64)
+        total_mem = self.policy_param(self.total_mem)[:, 0]
         # update never launch----------------------------------
         
         # calculate newly need memory --------------------------------
         invc_app = (exec_now > 1)        
-        new_app = ~self.sys_monitor["state"].values & invc_app
-        # ipdb.set_trace()
-        needed_mem = np.sum(self.app_mem_list[new_app])
-        idle_app = self.sys_monitor["state"].values & ~invc_app # previous idle and current not to launch
-        left_mem = np.sum(self.sys_monitor.loc[idle_app, "memory"].values) + (self.total_mem - self.current_mem)
-        if needed_mem > left_mem: # system overflow
-            new_app_mem = np.zeros(len(invc_app))
-            new_app_mem[new_app] = self.app_mem_list[new_app]
-            for app in np.argsort(new_app_mem)[::-1]:
-                if needed_mem < left_mem:
-                    break
-                exec_now[app] = 0
-                needed_mem -= new_app_mem[app]
-            # return False
+        new_app = ~apps.state & invc_app
+        needed_mem = new_app @ self.app_mem_list
+        idle_app = apps.state & ~invc_app # previous idle and current not to launch
+        left_mem = np.sum(apps.memory * idle_app, axis=1) + (total_mem - self.current_mem)
+        rejected = np.zeros(apps.n_policy, dtype=np.int64)
+        for p in np.flatnonzero(needed_mem > left_mem): # system overflow
+            rejected[p] = np.sum(np.maximum(exec_now[p] - 1, 0))
+            needed_mem[p] = self.__drop_overflow(exec_now[p], new_app[p], needed_mem[p], left_mem[p])
+            rejected[p] -= np.sum(np.maximum(exec_now[p] - 1, 0))
         
-        invc_app = (exec_now > 1)   
-        idle_app = self.sys_monitor["state"].values & ~invc_app # previous idle and current not to launch
-        self.sys_monitor["never_launch"] = ~np.any([~self.sys_monitor["never_launch"].values, exec_now.astype(bool)], axis=0)
+        running = exec_now.astype(bool)
+
+        # invocation func, on the (policy, app) coordinates of the invocations -------------
+        [invc_app, warm_app] = self.invoke(exec_now)
+        self.index_dirty[invc_app] = True
         
+        # Engage management strategy -------------------------------
+        needed_mem -= (total_mem - self.current_mem)
+        evictions = np.zeros(apps.n_policy, dtype=np.int64)
+        for p in np.flatnonzero(needed_mem > 0):
+            evictions[p] = self.__evict(p, idle_app[p], needed_mem[p])
+        
+        # update idle/busy time, system memory consumption
+        idle_apps = self.count_time(exec_now)
+        self.current_mem = np.sum(apps.memory, axis=1)
+        
+        if self.telemetry is not None:
+            self.telemetry.record(self.current_mem, np.count_nonzero(apps.state & running, axis=1), np.count_nonzero(idle_apps, axis=1),
+                                  np.bincount(invc_app[0], weights=~warm_app, minlength=apps.n_policy), evictions, rejected)
+        return True
 
-        # invocation func ----------------------------------
-        # warm start        
-        warm_app = self.sys_monitor["state"].values & invc_app
-        self.sys_monitor.loc[warm_app, "warm_start_count"] += (exec_now[warm_app] - 1)
 
-        # cold start invocation func count then (coz this will change state)
-        cold_app = ~self.sys_monitor["state"].values & invc_app
-        self.sys_monitor.loc[cold_app, "state"] = True
-        self.sys_monitor.loc[cold_app, "cold_start_count"] += 1
-        self.sys_monitor.loc[cold_app, "warm_start_count"] += (exec_now[cold_app] - 2) # -2 is one for flag, one for cold start
+class BeladysimSys(GreedysimSys):
+    """offline next-use eviction: GreedysimSys evicting the idle apps invoked again furthest in the future
+    
+    The minute of the next invocation of every app after every minute is precomputed from the whole series.
+    At each invocation the priority of an app becomes minus its next use, it does not change while the app is idle,
+    so the priority index of GreedysimSys evicts the furthest next use first and the apps never invoked again before any other.
+    It is a heuristic with future knowledge, not a bound: it ignores the memory of the apps, so it may evict
+    several small apps where one large app would have made room, and launching an app may still fail for lack of memory.
+    It beats the greedy priority when the memory holds most of the busy apps, and can do slightly worse
+    under heavy pressure (e.g. 1-2% more cold starts than greedy at 10-40 GB on a synthetic day, 55% fewer at 160 GB).
+    """
+    
+    def __init__(self, app_ids, app_mem_list, exe_by_minute, n_policy=None) -> None:
+        """
+        Args:
+            app_ids (ndarray): app id of each app
+            app_mem_list (ndarray): memory of each app
+            exe_by_minute (ndarray): execution series of the whole run, minute x app, the updates follow its rows
+            n_policy (int): number of policies simulated together, as in FixIntervalsimSys
+        """
+        super().__init__(app_ids, app_mem_list, n_policy)
+        self.next_use = self.next_use_index(exe_by_minute)
+    
+    @staticmethod
+    def next_use_index(exe_by_minute):
+        """
+        Returns:
+            ndarray: minute of the next invocation of every app strictly after every minute, minute x app, 
+                     number of minutes if there is none
+        """
+        n_minute = exe_by_minute.shape[0]
+        dtype = np.min_scalar_type(n_minute)
+        invc_minute = np.where(exe_by_minute > 1, np.arange(n_minute, dtype=dtype)[:, None], dtype.type(n_minute))
+        next_use = np.full(exe_by_minute.shape, n_minute, dtype=dtype)
+        next_use[:-1] = np.minimum.accumulate(invc_minute[:0:-1], axis=0)[::-1]
+        return next_use
+    
+    def priority(self, invc_app):
+        # many apps share a next use, the fraction of the app id orders them by app id as the index does with ties
+        return invc_app[1] / len(self.app_ids) - self.next_use[self.system_clock - 1, invc_app[1]]
+
+
+class KeepAlivesimSys(FixIntervalsimSys):
+    """system simulator of the keep-alive policies of util.Policy
+
+    Each minute the policy is updated with the idle gaps ended by the invocations, then every app is
+    loaded or unloaded from its windows and the minutes since its last execution ended (since_end).
+    With FixedKeepAlive the results are the same as FixIntervalsimSys.
+    """
+    
+    never_run = np.int32(1 << 30) # since_end of the apps that never ran
+    
+    def __init__(self, app_ids, policy, n_policy=None) -> None:
+        """
+        Args:
+            app_ids (ndarray): app id of each app
+            policy: FixedKeepAlive, HistogramKeepAlive or any object with the same methods
+            n_policy (int): number of policies simulated together, as in FixIntervalsimSys
+        """
+        super().__init__(app_ids, n_policy)
+        self.policy = policy
+        self.policy.reset(self.apps.n_policy, len(app_ids))
+        self.since_end = np.full(len(app_ids), self.never_run, dtype=np.int32)
+    
+    def update(self, exec_now):
+        """advance one minute
+
+        Args:
+            exec_now (ndarray): execution state of every app at this minute, shared by all policies
+        """
+        apps = self.apps
+        policy = self.policy
+        exec_now = np.asarray(exec_now).astype(np.int64)
+        running = exec_now.astype(bool)
+        apps.never_launch &= ~running
         
-        # update priority
-        self.sys_monitor.loc[invc_app, "frequency"] += 1 # update frequency
-        self.sys_monitor.loc[invc_app, "memory"] = self.app_mem_list[invc_app]
-        # self.sys_monitor.loc[invc_app, "priority"] = self.system_clock + self.sys_monitor.loc[invc_app, "frequency"] # update priority
-        self.sys_monitor.loc[invc_app, "priority"] = self.system_clock + np.divide(self.sys_monitor.loc[invc_app, "frequency"].values, self.app_mem_list[invc_app])# update priority
+        # invocation func, the idle gap since the previous execution goes to the policy
+        invc = np.flatnonzero(exec_now > 1)
+        ran = self.since_end[invc] != self.never_run
+        policy.update(invc[ran], self.since_end[invc[ran]])
+        self.since_end[invc] = 0
         
-        # Engage management strategy -------------------------------
-        needed_mem -= (self.total_mem - self.current_mem)
-        if needed_mem > 0:
-            for app in self.sys_monitor.loc[idle_app, :].reset_index().sort_values(by=['priority'])[["HashOwner", "HashApp"]].values:
-                # ipdb.set_trace()
-                if needed_mem <= 0:
-                    break
-                self.sys_monitor.loc[(app[0], app[1]), "state"] = False
-                needed_mem -= self.sys_monitor.loc[(app[0], app[1]), "memory"]
-                self.sys_monitor.loc[(app[0], app[1]), "memory"] = 0 
-            
+        invc_exec = exec_now[invc]
+        warm_app = apps.state[:, invc]
+        apps.warm_start_count[:, invc] += np.where(warm_app, invc_exec - 1, invc_exec - 2) # -2 is one for flag, one for cold start
+        apps.cold_start_count[:, invc] += ~warm_app
+        apps.state[:, invc] = True
+        apps.busy_time[:, invc] += 1
         
-        # update idle/busy time, system memory consumption
-        # for those func stop running but app is running
-        idle_apps = self.sys_monitor["state"].values & ~exec_now.astype(bool)
-        self.sys_monitor.loc[idle_apps, (["idle_time", "idle_timer"])] += 1 
+        # windows: unload after pre_warm + keep_alive idle minutes or until the next pre-warm, 
+        # load one minute before pre_warm is reached
+        since = self.since_end
+        pre_warm = policy.pre_warm
+        if self.telemetry is not None:
+            launched = apps.state.copy()
+        apps.state &= ~(since >= pre_warm + policy.keep_alive)
+        idle_next = ~running & (pre_warm > 0)
+        apps.state &= ~(idle_next & (since + 1 < pre_warm))
+        apps.state |= idle_next & (since + 1 == pre_warm)
         
-        # for thos func is running running and app is running
-        invc_app = (exec_now == 1) & self.sys_monitor["state"].values
-        self.sys_monitor.loc[invc_app, "busy_time"] += 1
-        self.sys_monitor.loc[invc_app, "idle_timer"] = 0
+        # idle/busy time
+        apps.idle_time += apps.state & ~running
+        apps.busy_time += exec_now == 1
+        self.since_end = np.where(running, 0, np.minimum(since + 1, self.never_run)).astype(np.int32)
+        
+        if self.telemetry is not None:
+            self.telemetry.record(0, np.count_nonzero(apps.state & running, axis=1), np.count_nonzero(apps.state & ~running, axis=1),
+                                  np.count_nonzero(~warm_app, axis=1), np.count_nonzero(launched & ~apps.state, axis=1), 0)
+        return True
+
+
+class ClustersimSys(GreedysimSys):
+    """GreedysimSys on a cluster: total_mem is split into n_node nodes of equal memory
+    
+    The invocations, priorities and idle/busy time are counted as in GreedysimSys, an app runs on one node. A new app is placed by the placement strategy (util.Placement)
+    and evicts idle apps of that node only, by the priority of GreedysimSys; it is dropped 
+    if no node can hold it, even when the free memory of all nodes together would (fragmented).
+    Nodes are arrays of shape (policy, node), a placement looks at all nodes at once.
+    With one node the results are the same as GreedysimSys as long as no invocation is dropped.
+    """
+    
+    def __init__(self, app_ids, app_mem_list, placement, n_node, app_key=None, n_policy=None) -> None:
+        """
+        Args:
+            app_ids (ndarray): app id of each app
+            app_mem_list (ndarray): memory of each app
+            placement: FirstFit, BestFit, OwnerHashRing or any object with the same methods
+            n_node (int): number of nodes
+            app_key (ndarray): key of each app hashed by the placement, e.g. its owner, app_ids if None
+            n_policy (int): number of policies simulated together, as in FixIntervalsimSys
+        """
+        super().__init__(app_ids, np.asarray(app_mem_list, dtype=np.int64), n_policy)
+        self.n_node = n_node
+        self.placement = placement
+        self.placement.reset(n_node, app_ids if app_key is None else app_key)
+        shape = (self.apps.n_policy, n_node)
+        self.app_node = np.full(self.apps.state.shape, -1, dtype=np.int32) # node of each launched app
+        self.node_used = np.zeros(shape, dtype=np.int64)
+        self.node_mem_time = np.zeros(shape, dtype=np.int64) # memory x minutes
+        self.node_peak = np.zeros(shape, dtype=np.int64)
+        self.node_cold = np.zeros(shape, dtype=np.int64)
+        self.node_evict = np.zeros(shape, dtype=np.int64)
+        self.rejected = np.zeros(self.apps.n_policy, dtype=np.int64) # dropped invocations
+        self.fragmented = np.zeros(self.apps.n_policy, dtype=np.int64) # dropped apps the whole cluster could hold
+    
+    @property
+    def node_capacity(self):
+        """
+        Returns:
+            ndarray: memory of a node of each policy
+        """
+        return self.policy_param(self.total_mem)[:, 0] // self.n_node
+    
+    def __place(self, p, new_app, idle_app, exec_now, node_mem) -> int:
+        """place the new apps of policy p one by one, exec_now of the dropped ones is set to 0 in place
 
-        self.current_mem = np.sum(self.sys_monitor["memory"].values)
-        # print(self.current_mem)
+        Placement is sequential per app: each choice depends on the nodes filled and evicted by the apps before it,
+        and is one scan of the arrays of the nodes by the placement.
+        
+        Returns:
+            int: number of apps evicted
+        """
+        apps = self.apps
+        [state, memory, node] = [apps.state[p], apps.memory[p], self.app_node[p]]
+        free = node_mem - self.node_used[p]
         
-        return True
\ No newline at end of file
+        # idle apps of every node by (priority, app), a node evicts a prefix of its slice
+        cand = np.flatnonzero(idle_app)
+        cand = cand[np.lexsort((cand, apps.priority[p, cand], node[cand]))]
+        cand_node = node[cand]
+        cand_freed = np.cumsum(memory[cand])
+        taken = np.searchsorted(cand_node, np.arange(self.n_node)) # first idle app left of each node
+        evictable = np.bincount(cand_node, weights=memory[cand], minlength=self.n_node).astype(np.int64)
+        
+        # room of a node (free + evictable) only shrinks during the minute, larger apps are dropped without a placement.
+        # Evicting moves memory from evictable to free, only the node of the app loses room
+        room = free + evictable
+        room_max = room.max(initial=0)
+        room_total = room.sum()
+        n_evict = 0
+        for app in new_app:
+            mem = self.app_mem_list[app]
+            k = self.placement.choose(free, evictable, mem, app) if mem <= room_max else -1
+            if k < 0:
+                self.rejected[p] += exec_now[app] - 1
+                self.fragmented[p] += room_total >= mem
+                exec_now[app] = 0
+                continue
+            if free[k] < mem:
+                base = cand_freed[taken[k] - 1] if taken[k] > 0 else 0
+                end = taken[k] + np.searchsorted(cand_freed[taken[k]:], base + mem - free[k]) + 1 # until freed >= needed
+                victim = cand[taken[k]:end]
+                freed = cand_freed[end - 1] - base
+                state[victim] = False
+                memory[victim] = 0
+                node[victim] = -1
+                free[k] += freed
+                evictable[k] -= freed
+                taken[k] = end
+                n_evict += len(victim)
+                self.node_evict[p, k] += len(victim)
+            free[k] -= mem
+            node[app] = k
+            room[k] -= mem
+            if room[k] + mem == room_max: # the node had the most room
+                room_max = room.max()
+            room_total -= mem
+        return n_evict
+        
+    def update(self, exec_now):
+        """advance one minute
+
+        Args:
+            exec_now (ndarray): execution state of every app at this minute, 
+                                shared by all policies or one row per policy.
+                                Each policy drops invocations that cannot be placed in its own copy
+        """
+        apps = self.apps
+        self.system_clock += 1
+        exec_now = np.array(np.broadcast_to(exec_now, apps.state.shape), dtype=np.int64)
+        node_mem = self.node_capacity
+        
+        invc_app = (exec_now > 1)
+        new_app = ~apps.state & invc_app
+        idle_app = apps.state & ~invc_app # previous idle and current not to launch
+        rejected = self.rejected.copy()
+        evictions = np.zeros(apps.n_policy, dtype=np.int64)
+        for p in np.flatnonzero(new_app.any(axis=1)):
+            evictions[p] = self.__place(p, np.flatnonzero(new_app[p]), idle_app[p], exec_now[p], node_mem[p])
+        
+        running = exec_now.astype(bool)
+        
+        # invocation func, on the (policy, app) coordinates of the invocations -------------
+        [invc_app, warm_app] = self.invoke(exec_now)
+        np.add.at(self.node_cold, (invc_app[0][~warm_app], self.app_node[invc_app][~warm_app]), 1)
+        
+        # update idle/busy time
+        idle_apps = self.count_time(exec_now)
+        
+        # node memory
+        [p_idx, app_idx] = np.nonzero(apps.state)
+        self.node_used = np.bincount(p_idx * self.n_node + self.app_node[p_idx, app_idx], weights=apps.memory[p_idx, app_idx], 
+                                     minlength=apps.n_policy * self.n_node).astype(np.int64).reshape(apps.n_policy, self.n_node)
+        self.node_mem_time += self.node_used
+        np.maximum(self.node_peak, self.node_used, out=self.node_peak)
+        
+        if self.telemetry is not None:
+            self.telemetry.record(self.node_used.sum(axis=1), np.count_nonzero(apps.state & running, axis=1), np.count_nonzero(idle_apps, axis=1),
+                                  np.bincount(invc_app[0], weights=~warm_app, minlength=apps.n_policy), evictions, self.rejected - rejected)
+        return True
+    
+    def node_stats(self) -> pd.DataFrame:
+        """per-node metrics indexed by [Policy, Node]: memory, mean and peak memory used, 
+        mean utilization, cold starts and evictions on the node"""
+        capacity = np.repeat(self.node_capacity[:, None], self.n_node, axis=1)
+        mean_mem = self.node_mem_time / max(self.system_clock, 1)
+        index = pd.MultiIndex.from_product([range(self.apps.n_policy), range(self.n_node)], names=["Policy", "Node"])
+        return pd.DataFrame({"capacity": capacity.ravel(), 
+                             "mean_mem": mean_mem.ravel(), 
+                             "peak_mem": self.node_peak.ravel(),
+                             "utilization": np.divide(mean_mem, capacity, out=np.zeros(capacity.shape), where=capacity > 0).ravel(),
+                             "cold_starts": self.node_cold.ravel(), 
+                             "evictions": self.node_evict.ravel()}, index=index)
+    
+    def cluster_stats(self) -> pd.DataFrame:
+        """cluster-wide metrics indexed by Policy: the node metrics summed, 
+        the spread of the utilization across nodes, dropped invocations and fragmented placements"""
+        nodes = self.node_stats()
+        by_policy = nodes.groupby(level="Policy")
+        stats = by_policy[["capacity", "mean_mem", "cold_starts", "evictions"]].sum()
+        stats["utilization"] = np.divide(stats["mean_mem"], stats["capacity"], out=np.zeros(len(stats)), where=stats["capacity"] > 0)
+        stats["node_utilization_std"] = by_policy["utilization"].std(ddof=0)
+        stats["rejected"] = self.rejected
+        stats["fragmented"] = self.fragmented
+        return stats
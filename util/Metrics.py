@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+
+RATE_GRID = np.arange(101) * 0.01 # rates of the CDF figures, 0% to 100%
+
+
+def cdf(values, grid=RATE_GRID):
+    """empirical CDF of values on a grid
+
+    Args:
+        values (array_like): per-app rates of one policy
+        grid (ndarray): points where the CDF is evaluated
+
+    Returns:
+        ndarray: fraction of values <= each point of grid, nan if values is empty
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    if not len(values):
+        return np.full(len(grid), np.nan)
+    return np.searchsorted(values, grid, side='right') / len(values)
+
+
+def cdf_lst(rate_lst, grid=RATE_GRID):
+    """
+    Returns:
+        ndarray: CDF of each policy of rate_lst, policy x grid
+    """
+    return np.array([cdf(rate, grid) for rate in rate_lst]).reshape(len(rate_lst), len(grid))
+
+
+def quantiles(rate_lst, q):
+    """
+    Args:
+        rate_lst (list): per-app rates of each policy
+        q (array_like): quantiles in [0, 1]
+
+    Returns:
+        ndarray: quantiles of each policy, policy x q, nan for a policy without apps
+    """
+    q = np.atleast_1d(q)
+    return np.array([np.quantile(rate, q) if len(rate) else np.full(len(q), np.nan) for rate in rate_lst]).reshape(len(rate_lst), len(q))
+
+
+def frontier(cold_rate_lst, mem_rate_lst, p=0.75) -> list:
+    """cold start rate vs memory waste rate at percentile p of each policy:
+    the app at position int(n * p) in the order of cold start rate gives both rates
+
+    Args:
+        cold_rate_lst (list): per-app cold start rates of each policy
+        mem_rate_lst (list): per-app memory waste rates of each policy, same apps
+        p (float): percentile of the cold start rate in [0, 1)
+
+    Returns:
+        list: [cold start rate, memory waste rate] arrays, one value per policy
+    """
+    assert len(cold_rate_lst) == len(mem_rate_lst)
+    cold_point = np.full(len(cold_rate_lst), np.nan)
+    mem_point = np.full(len(cold_rate_lst), np.nan)
+    for i, (cold_rate, mem_rate) in enumerate(zip(cold_rate_lst, mem_rate_lst)):
+        if not len(cold_rate):
+            continue
+        cold_rate = np.asarray(cold_rate)
+        app = np.argsort(cold_rate)[int(len(cold_rate) * p)]
+        cold_point[i] = cold_rate[app]
+        mem_point[i] = mem_rate[app]
+    return [cold_point, mem_point]
+
+
+def idle_busy_runs(app_exe, interior=True) -> list:
+    """maximal idle gaps and busy runs of every app of an execution series,
+    from the edges of the busy minutes found by one diff over the whole matrix
+
+    Args:
+        app_exe (ndarray): execution series, app x minute
+        interior (bool): keep only the idle gaps between two busy runs, 
+                         the ones at the start or end of the day are cut by the day boundary
+
+    Returns:
+        list: [idle gaps, busy runs], each as [row, start, length] arrays in row-major order
+    """
+    [n_row, n_minute] = np.shape(app_exe)
+    busy = np.zeros((n_row, n_minute + 2), dtype=bool)
+    busy[:, 1:-1] = np.asarray(app_exe) != 0
+    # edges alternate inside a row: start of run k at position 2k, its end at 2k + 1
+    edge = np.flatnonzero(busy[:, 1:] != busy[:, :-1])
+    [row, start] = np.divmod(edge[0::2], n_minute + 1)
+    end = edge[1::2] - row * (n_minute + 1)
+
+    # gap after each busy run until the next one of its row
+    same_row = row[1:] == row[:-1]
+    gap = [row[:-1][same_row], end[:-1][same_row], (start[1:] - end[:-1])[same_row]]
+    if not interior:
+        first = np.ones(len(row), dtype=bool)
+        first[1:] = ~same_row
+        last = np.ones(len(row), dtype=bool)
+        last[:-1] = ~same_row
+        idle_row = np.flatnonzero(np.bincount(row, minlength=n_row) == 0)
+        gap = [np.concatenate(col) for col in zip(gap, 
+                                                  [row[first], np.zeros(first.sum(), dtype=np.int64), start[first]],
+                                                  [row[last], end[last], n_minute - end[last]],
+                                                  [idle_row, np.zeros(len(idle_row), dtype=np.int64), np.full(len(idle_row), n_minute)])]
+        keep = gap[2] > 0
+        order = np.lexsort((gap[1][keep], gap[0][keep]))
+        gap = [col[keep][order] for col in gap]
+    return [gap, [row, start, end - start]]
+
+
+def run_summary(row, length, n_row, prefix) -> pd.DataFrame:
+    """
+    Returns:
+        pd.DataFrame: number, mean and max length of the runs of each row, 0 without runs
+    """
+    count = np.bincount(row, minlength=n_row)
+    total = np.bincount(row, weights=length, minlength=n_row)
+    longest = np.zeros(n_row, dtype=np.int64)
+    np.maximum.at(longest, row, length)
+    return pd.DataFrame({prefix + "_count": count,
+                         prefix + "_mean": np.divide(total, count, out=np.zeros(n_row), where=count > 0),
+                         prefix + "_max": longest})
+
+
+def run_length_stats(series_lst, app_ids_lst=None, interior=True) -> list:
+    """idle gap and busy run length distributions of every app of every day
+
+    Args:
+        series_lst (list): execution series of each day, app x minute
+        app_ids_lst (list): app id of each row of each day, row position if None
+        interior (bool): idle gaps between two busy runs only, as in idle_busy_runs
+
+    Returns:
+        list: [idle gap histogram, busy run histogram, per-app summary frame of each day],
+              histogram[k] is the number of runs of k minutes
+    """
+    n_minute = max((series.shape[1] for series in series_lst), default=0)
+    idle_hist = np.zeros(n_minute + 1, dtype=np.int64)
+    busy_hist = np.zeros(n_minute + 1, dtype=np.int64)
+    summary_lst = []
+    for k, series in enumerate(series_lst):
+        [[idle_row, _, idle_len], [busy_row, _, busy_len]] = idle_busy_runs(series, interior)
+        idle_hist += np.bincount(idle_len, minlength=n_minute + 1)
+        busy_hist += np.bincount(busy_len, minlength=n_minute + 1)
+        summary = pd.concat([run_summary(idle_row, idle_len, len(series), "gap"), 
+                             run_summary(busy_row, busy_len, len(series), "busy")], axis=1)
+        summary.index = pd.Index(np.arange(len(series)) if app_ids_lst is None else app_ids_lst[k], name="AppID")
+        summary_lst.append(summary)
+    return [idle_hist, busy_hist, summary_lst]
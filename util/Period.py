@@ -0,0 +1,115 @@
+import numpy as np
+from tqdm import trange
+from util.DataLoader import DataLoader
+from util.Simulator import FaasSimulator
+from util.Interner import HashInterner
+from util.Manager import FixIntervalsimSys, GreedysimSys
+from util.Telemetry import Telemetry
+
+
+class PeriodSimulator():
+    """several days simulated back to back through one system state, apps stay warm across midnight
+
+    Apps are aligned across days by name in a period-wide HashInterner, the union of the functions of all days.
+    The memory of an app is the one FaasSimulator.app_memory draws on the first day the app has an execution series,
+    so a one-day period gives the results of FaasSimulator.run_sys.
+    Only one day of execution series is held at a time.
+    """
+
+    def __init__(self, path, days, seed=0, budget=None) -> None:
+        """
+        Args:
+            path (str): folder of the trace
+            days (list): days simulated, in order
+            seed (int): seed of the random streams of every day
+            budget (dict): memory budget of each stage of TraceReader
+        """
+        self.path = path
+        self.days = list(days)
+        self.seed = seed
+        self.budget = budget
+        self.ids = None # apps of the period
+        self.app_mem_list = None # memory of every app of the period
+
+    def __load_day(self, day) -> DataLoader:
+        loader = DataLoader(path=self.path, budget=self.budget)
+        loader.load_dataset(day)
+        return loader
+
+    def prepare(self) -> None:
+        """align the apps of all days, only the properties of each day are read"""
+        names = [[], [], []]
+        for day in self.days:
+            properties = self.__load_day(day).properties
+            for k, col in enumerate([properties.owner, properties.app, properties.func]):
+                names[k].append(col)
+        names = [np.concatenate(col) for col in names]
+        order = np.lexsort((names[2], names[1], names[0]))
+        keep = np.ones(len(order), dtype=bool) # unique functions
+        keep[1:] = (names[0][order][1:] != names[0][order][:-1]) | (names[1][order][1:] != names[1][order][:-1]) | \
+                   (names[2][order][1:] != names[2][order][:-1])
+        self.ids = HashInterner(*[col[order][keep] for col in names])
+
+        self.app_mem_list = np.zeros(self.ids.n_app, dtype=np.int64)
+        drawn = np.zeros(self.ids.n_app, dtype=bool)
+        for day in self.days:
+            loader = self.__load_day(day)
+            simulator = FaasSimulator(loader, seed=self.seed)
+            simulator.prepare()
+            [app_ids, app_mem] = simulator.app_memory() # the apps and draws of run_sys on the day
+            app_map = self.ids.encode_apps(*loader.ids.decode_apps(app_ids))
+            new = ~drawn[app_map]
+            self.app_mem_list[app_map[new]] = app_mem[new]
+            drawn[app_map] = True
+
+    def __day_series(self, day):
+        """
+        Returns:
+            ndarray: execution series of the day on the apps of the period, one row per minute
+        """
+        loader = self.__load_day(day)
+        simulator = FaasSimulator(loader, seed=self.seed)
+        simulator.prepare()
+        [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+        exe_by_minute = np.zeros((app_exe.shape[1], self.ids.n_app), dtype=app_exe.dtype)
+        exe_by_minute[:, self.ids.encode_apps(*loader.ids.decode_apps(app_ids))] = app_exe.T
+        return exe_by_minute
+
+    def run(self, policy, arg_lst, telemetry_path=None) -> list:
+        """simulate all parameters of arg_lst together over the period
+
+        Args:
+            policy (str): "greedy" (GreedysimSys, memory size) or "fixed" (FixIntervalsimSys, keep alive interval)
+            arg_lst (list): parameters
+            telemetry_path (str): npz file of the per-minute Telemetry of the whole period, not recorded if None
+
+        Returns:
+            list: [per-day results, whole-period result], a result is [cold start rates, memory waste rates]
+                  with one list per parameter. Rates of a day count the apps launched up to that day.
+        """
+        if self.ids is None:
+            self.prepare()
+        app_ids = np.arange(self.ids.n_app)
+        if policy == "greedy":
+            simSys = GreedysimSys(app_ids, self.app_mem_list, n_policy=len(arg_lst))
+            simSys.total_mem = list(arg_lst)
+        elif policy == "fixed":
+            simSys = FixIntervalsimSys(app_ids, n_policy=len(arg_lst))
+            simSys.keep_alive_interval = list(arg_lst)
+        else:
+            raise ValueError("unknown policy {}".format(policy))
+
+        if telemetry_path is not None:
+            simSys.telemetry = Telemetry(1440 * len(self.days), len(arg_lst))
+        day_result = []
+        for day in self.days:
+            exe_by_minute = self.__day_series(day)
+            since = simSys.snapshot()
+            for i in trange(exe_by_minute.shape[0]):
+                if not simSys.update(exe_by_minute[i]):
+                    print("System Memory Overflow!")
+                    break
+            day_result.append([simSys.cal_cold_rate(since), simSys.cal_mem_waste(since)])
+        if telemetry_path is not None:
+            simSys.telemetry.save(telemetry_path, meta={"days": self.days, "seed": self.seed, "policy": policy, "arg_lst": list(arg_lst)})
+        return [day_result, [simSys.cal_cold_rate(), simSys.cal_mem_waste()]]
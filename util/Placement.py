@@ -0,0 +1,76 @@
+import numpy as np
+import hashlib
+
+
+class FirstFit():
+    """placement of the apps of ClustersimSys on the nodes of a cluster
+
+    reset is called once with the number of nodes and a key of every app.
+    choose is called for every app to launch, with the free memory of every node
+    and the memory held by the idle apps of every node that can be evicted.
+    It returns the node of the app, evicting on it if its free memory is not enough, or -1 if no node can hold it.
+
+    FirstFit takes the first node with enough free memory, else the first one once its idle apps are evicted.
+    """
+
+    def reset(self, n_node, app_key) -> None:
+        self.n_node = n_node
+
+    def choose(self, free, evictable, mem, app) -> int:
+        for room in [free, free + evictable]:
+            fit = room >= mem
+            node = int(np.argmax(fit))
+            if fit[node]:
+                return node
+        return -1
+
+
+class BestFit(FirstFit):
+    """the node with the least free memory left after the app, evicting on the node with the least room left if needed"""
+
+    def choose(self, free, evictable, mem, app) -> int:
+        for room in [free, free + evictable]:
+            node = int(np.argmin(np.where(room >= mem, room, np.iinfo(np.int64).max)))
+            if room[node] >= mem:
+                return node
+        return -1
+
+
+class OwnerHashRing(FirstFit):
+    """consistent hashing of the owners: the apps of an owner go to the first node of the ring after the owner,
+    or to the next ones with enough memory. Nodes have replicas points on the ring to spread the owners evenly,
+    keys are hashed by name so that an owner stays on the same nodes across days.
+    """
+
+    def __init__(self, replicas=8, seed=0) -> None:
+        """
+        Args:
+            replicas (int): points of every node on the ring
+            seed (int): salt of the positions of the nodes
+        """
+        self.replicas = replicas
+        self.seed = seed
+
+    @staticmethod
+    def position(key) -> np.uint64:
+        return np.frombuffer(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), dtype=np.uint64)[0]
+
+    def reset(self, n_node, app_key) -> None:
+        super().reset(n_node, app_key)
+        point = np.array([self.position("{}-{}-{}".format(self.seed, node, k))
+                          for node in range(n_node) for k in range(self.replicas)], dtype=np.uint64)
+        order = np.argsort(point, kind='stable')
+        ring_node = np.repeat(np.arange(n_node), self.replicas)[order]
+        self.ring = np.concatenate([ring_node, ring_node]) # ring order of the nodes from any point is a slice
+        [key, key_idx] = np.unique(np.asarray(app_key), return_inverse=True)
+        key_point = np.array([self.position(k) for k in key], dtype=np.uint64)
+        self.start = (np.searchsorted(point[order], key_point) % len(point))[key_idx]
+
+    def choose(self, free, evictable, mem, app) -> int:
+        order = self.ring[self.start[app]:self.start[app] + len(self.ring) // 2]
+        for room in [free, free + evictable]:
+            fit = room[order] >= mem
+            k = int(np.argmax(fit))
+            if fit[k]:
+                return int(order[k])
+        return -1
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class FixedKeepAlive():
+    """keep-alive windows of KeepAlivesimSys
+
+    A policy gives two windows per (policy, app), in minutes of idle time since the last execution ended:
+    pre_warm, the app is unloaded when its execution ends and loaded again after pre_warm minutes
+    (0: kept loaded), and keep_alive, the app is unloaded after pre_warm + keep_alive idle minutes.
+    update is called every minute with the idle gaps ended by the invocations of that minute,
+    a policy only changes the windows of those apps.
+
+    FixedKeepAlive keeps every app loaded for the same interval, as FixIntervalsimSys.
+    """
+
+    def __init__(self, interval) -> None:
+        """
+        Args:
+            interval (int or list): keep alive interval, one per policy of a sweep
+        """
+        self.interval = interval
+
+    def reset(self, n_policy, n_app) -> None:
+        self.pre_warm = np.zeros((n_policy, n_app), dtype=np.int32)
+        self.keep_alive = np.zeros((n_policy, n_app), dtype=np.int32)
+        self.keep_alive[:] = np.reshape(self.interval, (-1, 1))
+
+    def update(self, app, idle_gap) -> None:
+        pass
+
+
+class HistogramKeepAlive(FixedKeepAlive):
+    """hybrid histogram policy: windows from the distribution of the idle gaps of each app
+
+    Every app keeps a histogram of its idle gaps in minutes, up to hist_len. Once it is representative,
+    pre_warm is the head percentile of the gaps (minus a margin) and the app is kept loaded until
+    the tail percentile (plus a margin). Apps with few gaps or a flat histogram are kept alive
+    for default_keep_alive as the fixed policy, apps with mostly gaps longer than the histogram
+    are kept loaded for hist_len.
+    The histogram is shared by all policies of a sweep, windows are recomputed for the invoked apps only.
+    """
+
+    def __init__(self, head=0.05, tail=0.99, margin=0.1, hist_len=240, default_keep_alive=10,
+                 min_count=5, min_cv=2.0, max_oob=0.5) -> None:
+        """
+        Args:
+            head, tail (float or list): percentiles of the pre-warm and keep-alive windows, one per policy of a sweep
+            margin (float): fraction by which pre-warm is shortened and keep-alive lengthened
+            hist_len (int): number of 1-minute bins of the histogram
+            default_keep_alive (int): keep alive interval of the apps without a representative histogram
+            min_count (int): number of gaps needed for a representative histogram
+            min_cv (float): coefficient of variation of the bin counts needed for a representative histogram
+            max_oob (float): largest fraction of gaps longer than the histogram
+        """
+        self.head = head
+        self.tail = tail
+        self.margin = margin
+        self.hist_len = hist_len
+        self.default_keep_alive = default_keep_alive
+        self.min_count = min_count
+        self.min_cv = min_cv
+        self.max_oob = max_oob
+
+    def reset(self, n_policy, n_app) -> None:
+        self.pre_warm = np.zeros((n_policy, n_app), dtype=np.int32)
+        self.keep_alive = np.full((n_policy, n_app), self.default_keep_alive, dtype=np.int32)
+        self.hist = np.zeros((n_app, self.hist_len), dtype=np.uint16)
+        self.n_gap = np.zeros(n_app, dtype=np.int64)
+        self.n_oob = np.zeros(n_app, dtype=np.int64)
+
+    def update(self, app, idle_gap) -> None:
+        if not len(app):
+            return
+        inside = idle_gap < self.hist_len
+        np.add.at(self.hist, (app[inside], idle_gap[inside]), 1)
+        self.n_gap[app] += 1
+        self.n_oob[app[~inside]] += 1
+
+        # windows of the invoked apps
+        hist = self.hist[app].astype(np.int64)
+        n_in = hist.sum(axis=1)
+        mean = n_in / self.hist_len
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = hist.std(axis=1) / mean
+        representative = (self.n_gap[app] >= self.min_count) & (n_in > 0) & (cv >= self.min_cv)
+        oob = self.n_oob[app] > self.max_oob * self.n_gap[app]
+
+        cum = np.cumsum(hist, axis=1)
+        head = np.reshape(self.head, (-1, 1, 1))
+        tail = np.reshape(self.tail, (-1, 1, 1))
+        # first bin reaching the percentile, for each policy and app: gaps of these lengths start warm
+        head_bin = (cum[None] < head * n_in[None, :, None]).sum(axis=2)
+        tail_bin = (cum[None] < tail * n_in[None, :, None]).sum(axis=2)
+        pre_warm = np.floor(head_bin * (1 - self.margin)).astype(np.int32)
+        keep_alive = np.maximum(np.ceil(tail_bin * (1 + self.margin)).astype(np.int32) - pre_warm, 0)
+
+        pre_warm[:, ~representative | oob] = 0
+        keep_alive[:, ~representative] = self.default_keep_alive
+        keep_alive[:, oob] = self.hist_len
+        self.pre_warm[:, app] = pre_warm
+        self.keep_alive[:, app] = keep_alive
@@ -0,0 +1,284 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import chain
+
+
+def fingerprint(path) -> dict:
+    """fingerprint of a source file used to invalidate caches built from it
+
+    Args:
+        path (str): path of the source file
+
+    Returns:
+        dict: name, size, mtime and blake2b digest of the file
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    stat = os.stat(path)
+    return {"name": os.path.basename(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest.hexdigest()}
+
+
+@contextmanager
+def atomic_write(path):
+    """open a unique temporary file next to path, moved onto path once written
+
+    Readers never see a partial file, and processes writing the same cache at once
+    (e.g. the loads of a day for several seeds) each write their own temporary file, the last one wins.
+
+    Yields:
+        file: binary file to write
+    """
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.chmod(tmp_path, 0o644) # mkstemp files are private
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def same_source(recorded, paths) -> bool:
+    """check whether the recorded fingerprints still describe the source files
+    size and mtime are checked first, the file is only hashed again if the mtime changed.
+    The record of a file touched without change takes its new mtime, see fresh_source to save it.
+
+    Args:
+        recorded (list): fingerprints saved with the cache
+        paths (list): paths of the source files
+
+    Returns:
+        bool: True if all sources are unchanged
+    """
+
+    if len(recorded) != len(paths):
+        return False
+    for record, path in zip(recorded, paths):
+        if not os.path.exists(path) or record["name"] != os.path.basename(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != record["size"]:
+            return False
+        if stat.st_mtime_ns != record["mtime"]:
+            if fingerprint(path)["hash"] != record["hash"]:
+                return False
+            record["mtime"] = stat.st_mtime_ns
+    return True
+
+
+def fresh_source(path, meta, sources) -> bool:
+    """same_source on the sources of the meta of an npz cache,
+    the mtimes of touched sources are saved into the cache so that the next load does not hash them again
+
+    Args:
+        path (str): npz cache holding the meta
+        meta (dict): meta of the cache, with its fingerprints in "sources"
+        sources (list): paths of the source files
+
+    Returns:
+        bool: True if all sources are unchanged
+    """
+
+    mtime = [record["mtime"] for record in meta["sources"]]
+    if not same_source(meta["sources"], sources):
+        return False
+    if mtime != [record["mtime"] for record in meta["sources"]]:
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            arrays["meta"] = np.array(json.dumps(meta))
+            with atomic_write(path) as f:
+                np.savez(f, **arrays)
+        except OSError: # read-only cache, still valid, the sources are hashed again next time
+            pass
+    return True
+
+
+def take_segments(rows, ptr) -> list:
+    """flat positions of the given rows of a flat array with row offsets
+
+    Args:
+        rows (ndarray): rows to take
+        ptr (ndarray): row offsets, row k owns [ptr[k], ptr[k+1])
+
+    Returns:
+        list: flat index of the taken values, row offsets of the taken rows
+    """
+
+    count = (ptr[1:] - ptr[:-1])[rows]
+    new_ptr = np.concatenate([[0], np.cumsum(count)]).astype(np.int64)
+    flat_idx = np.repeat(ptr[:-1][rows] - new_ptr[:-1], count) + np.arange(new_ptr[-1])
+    return [flat_idx, new_ptr]
+
+
+class PropertyTable():
+    """columnar app/func properties of one day
+
+    Rows are functions sorted by (HashOwner, HashApp, HashFunction). The variable-length
+    distributions are stored as flat value/probability arrays with row offsets,
+    row k owns values [ptr[k], ptr[k+1]).
+    """
+
+    version = 1
+    key_col = ["Day", "HashOwner", "HashApp", "HashFunction"]
+
+    def __init__(self, day, owner, app, func, mem_ave, mem_prob, mem_ptr, dur_ave, dur_prob, dur_ptr) -> None:
+        self.day = str(day)
+        self.owner = owner
+        self.app = app
+        self.func = func
+        self.mem_ave = mem_ave
+        self.mem_prob = mem_prob
+        self.mem_ptr = mem_ptr
+        self.dur_ave = dur_ave
+        self.dur_prob = dur_prob
+        self.dur_ptr = dur_ptr
+
+    def __len__(self) -> int:
+        return len(self.func)
+
+    @classmethod
+    def from_arrays(cls, day, owner, app, func, mem, dur):
+        """build a table from unsorted rows
+
+        Args:
+            day (int): day of the properties
+            owner, app, func (ndarray): hash names of each row
+            mem, dur (list): [average, probability, ptr] flat distribution of each row
+
+        Returns:
+            PropertyTable: table sorted by hash names
+        """
+
+        owner = np.asarray(owner).astype(str)
+        app = np.asarray(app).astype(str)
+        func = np.asarray(func).astype(str)
+        order = np.lexsort((func, app, owner))
+        [mem_ave, mem_prob, mem_ptr] = cls.__take(order, *mem)
+        [dur_ave, dur_prob, dur_ptr] = cls.__take(order, *dur)
+        return cls(day, owner[order], app[order], func[order], mem_ave, mem_prob, mem_ptr, dur_ave, dur_prob, dur_ptr)
+
+    @classmethod
+    def from_frame(cls, data_info):
+        """build a table from a data_info frame with list-valued cells (e.g. a JSON cache)
+
+        Args:
+            data_info (pd.DataFrame): properties indexed by key_col
+
+        Returns:
+            PropertyTable: the same properties in columnar form
+        """
+
+        data_info = data_info.reset_index()
+        day = data_info["Day"].iloc[0] if len(data_info) else ""
+
+        def flatten(ave_col, prob_col):
+            count = np.fromiter((len(x) for x in data_info[ave_col]), dtype=np.int64, count=len(data_info))
+            ptr = np.concatenate([[0], np.cumsum(count)])
+            ave = np.fromiter(chain.from_iterable(data_info[ave_col]), dtype=np.float64, count=ptr[-1])
+            prob = np.fromiter(chain.from_iterable(data_info[prob_col]), dtype=np.float64, count=ptr[-1])
+            return [ave, prob, ptr]
+
+        return cls.from_arrays(day, data_info["HashOwner"].values, data_info["HashApp"].values, data_info["HashFunction"].values,
+                               flatten("MemAve", "MemProb"), flatten("DurAve", "DurProb"))
+
+    @staticmethod
+    def __take(rows, ave, prob, ptr) -> list:
+        """gather the flat distributions of the given rows
+
+        Returns:
+            list: [average, probability, ptr] of the selected rows
+        """
+
+        [flat_idx, new_ptr] = take_segments(rows, ptr)
+        return [ave[flat_idx], prob[flat_idx], new_ptr]
+
+    def to_frame(self) -> pd.DataFrame:
+        """materialize the table as the list-valued data_info frame
+
+        Returns:
+            pd.DataFrame: properties indexed by key_col and sorted
+        """
+
+        def unflatten(ave, prob, ptr):
+            ave = ave.tolist()
+            prob = prob.tolist()
+            bound = list(zip(ptr[:-1].tolist(), ptr[1:].tolist()))
+            return [[ave[s:e] for s, e in bound], [prob[s:e] for s, e in bound]]
+
+        [mem_ave, mem_prob] = unflatten(self.mem_ave, self.mem_prob, self.mem_ptr)
+        [dur_ave, dur_prob] = unflatten(self.dur_ave, self.dur_prob, self.dur_ptr)
+
+        index = pd.MultiIndex.from_arrays([np.full(len(self), self.day, dtype=object),
+                                           self.owner.astype(object),
+                                           self.app.astype(object),
+                                           self.func.astype(object)], names=self.key_col)
+        return pd.DataFrame({"MemAve": mem_ave,
+                             "MemProb": mem_prob,
+                             "DurAve": dur_ave,
+                             "DurProb": dur_prob}, index=index)
+
+    def save(self, path, sources) -> None:
+        """save the table as an uncompressed npz file
+
+        Args:
+            path (str): output file
+            sources (list): paths of the source files, fingerprinted for invalidation
+        """
+
+        meta = {"version": self.version,
+                "day": self.day,
+                "sources": [fingerprint(src) for src in sources]}
+        with atomic_write(path) as f:
+            np.savez(f,
+                     meta=np.array(json.dumps(meta)),
+                     owner=self.owner.astype(bytes),
+                     app=self.app.astype(bytes),
+                     func=self.func.astype(bytes),
+                     mem_ave=self.mem_ave,
+                     mem_prob=self.mem_prob,
+                     mem_ptr=self.mem_ptr,
+                     dur_ave=self.dur_ave,
+                     dur_prob=self.dur_prob,
+                     dur_ptr=self.dur_ptr)
+
+    @classmethod
+    def load(cls, path, sources=None):
+        """load a table saved by save
+
+        Args:
+            path (str): npz file
+            sources (list): paths of the source files, skip the check if None
+
+        Returns:
+            PropertyTable: the table, None if the file is missing, of another version or out of date
+        """
+
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta["version"] != cls.version:
+                return None
+            if sources is not None and not fresh_source(path, meta, sources):
+                return None
+            return cls(meta["day"],
+                       npz["owner"].astype(str),
+                       npz["app"].astype(str),
+                       npz["func"].astype(str),
+                       npz["mem_ave"], npz["mem_prob"], npz["mem_ptr"],
+                       npz["dur_ave"], npz["dur_prob"], npz["dur_ptr"])
@@ -0,0 +1,106 @@
+import pandas as pd
+import numpy as np
+
+
+class TraceReader():
+    """column-projected, chunked reader of the Azure Functions trace CSV files
+
+    Each stage reads only the columns it uses, with explicit dtypes: categorical hashes,
+    float64 percentiles (the properties are computed from their differences) and
+    unsigned minute counts. Files are parsed in chunks of rows bounded by the memory
+    budget of the stage, so the peak memory of a worker does not grow with the file.
+    """
+
+    hash_col = ["HashOwner", "HashApp", "HashFunction"]
+    minute_col = [str(t + 1) for t in range(1440)]
+    parse_overhead = 32 # bytes held by the parser for each field of a chunk, estimate
+    default_budget = {"memory": 64 << 20, "duration": 64 << 20, "invocation": 256 << 20}
+
+    def __init__(self, budget=None) -> None:
+        """
+        Args:
+            budget (dict): bytes of parsed rows held at once by each stage,
+                           "memory", "duration" and "invocation", default_budget if missing
+        """
+        self.budget = dict(self.default_budget, **(budget or {}))
+
+    def chunk_rows(self, stage, dtype) -> int:
+        """
+        Args:
+            stage (str): key of the budget
+            dtype (dict): dtype of each column read
+
+        Returns:
+            int: number of rows parsed at once
+        """
+        row_bytes = sum(self.parse_overhead + (8 if kind == 'category' else np.dtype(kind).itemsize)
+                        for kind in dtype.values())
+        return max(1, self.budget[stage] // row_bytes)
+
+    def __chunks(self, stage, path, dtype):
+        return pd.read_csv(path, usecols=list(dtype), dtype=dtype, chunksize=self.chunk_rows(stage, dtype))
+
+    @staticmethod
+    def __concat(chunks) -> pd.DataFrame:
+        """concatenate chunks, categorical columns are merged into one categorical"""
+        chunks = list(chunks)
+        if not chunks:
+            return pd.DataFrame()
+        table = pd.concat(chunks, ignore_index=True)
+        for col, kind in chunks[0].dtypes.items():
+            if kind == 'category':
+                table[col] = pd.api.types.union_categoricals([chunk[col] for chunk in chunks])
+        return table
+
+    def read_memory(self, path, pct_col) -> pd.DataFrame:
+        """
+        Args:
+            path (str): app_memory_percentiles file
+            pct_col (list): percentile columns used
+
+        Returns:
+            pd.DataFrame: HashOwner, HashApp, AverageAllocatedMb and pct_col of every row
+        """
+        dtype = dict({"HashOwner": 'category', "HashApp": 'category', "AverageAllocatedMb": np.float64},
+                     **{col: np.float64 for col in pct_col})
+        return self.__concat(self.__chunks("memory", path, dtype))
+
+    def read_duration(self, path, pct_col) -> pd.DataFrame:
+        """
+        Args:
+            path (str): function_durations_percentiles file
+            pct_col (list): percentile columns used
+
+        Returns:
+            pd.DataFrame: HashOwner, HashApp, HashFunction, Average and pct_col of every row
+        """
+        dtype = dict({"HashOwner": 'category', "HashApp": 'category', "HashFunction": 'category', "Average": np.float64},
+                     **{col: np.float64 for col in pct_col})
+        return self.__concat(self.__chunks("duration", path, dtype))
+
+    def read_invocations(self, path, ids) -> list:
+        """read the invocation counts of the known functions, rows of other functions are dropped chunk by chunk
+
+        Args:
+            path (str): invocations_per_function file
+            ids (HashInterner): function ids
+
+        Returns:
+            list: [function id of each row, invocation counts (row x minute)], rows sorted by function id
+                  (file order for the same function), counts in uint16 unless a count does not fit
+        """
+        dtype = dict({col: 'category' for col in self.hash_col}, **{col: np.uint32 for col in self.minute_col})
+        func_lst = []
+        count_lst = []
+        for chunk in self.__chunks("invocation", path, dtype):
+            func_ids = ids.encode_funcs(*[chunk[col].values for col in self.hash_col])
+            known = func_ids >= 0
+            counts = chunk[self.minute_col].values[known]
+            func_lst.append(func_ids[known])
+            count_lst.append(counts.astype(np.promote_types(np.uint16, np.min_scalar_type(counts.max(initial=0)))))
+        if not func_lst:
+            return [np.zeros(0, dtype=np.int32), np.zeros((0, len(self.minute_col)), dtype=np.uint16)]
+
+        func_ids = np.concatenate(func_lst)
+        order = np.argsort(func_ids, kind='stable')
+        return [func_ids[order], np.concatenate(count_lst)[order]]
@@ -0,0 +1,129 @@
+import numpy as np
+import random
+from util.Properties import take_segments
+
+
+class PyRandom():
+    """random number source backed by the global python random,
+    reproduces runs made with random.choices before the seeded sampler
+    """
+
+    def random(self, size):
+        return np.array([random.random() for _ in range(size)])
+
+
+class PropertySampler():
+    """batch sampler of function runtime and app memory of one day
+
+    The cumulative weights of every function and app are computed once into flat arrays
+    indexed by the function and app ids of HashInterner.
+    Each day has its own seeded random streams, one for runtime and one for memory,
+    so that results do not depend on which worker runs the day or in which order.
+    """
+
+    def __init__(self, properties, ids, seed=0) -> None:
+        """
+        Args:
+            properties (PropertyTable): properties of the day
+            ids (HashInterner): interned names of the properties
+            seed (int): seed of the random streams
+        """
+
+        self.day = int(properties.day) if len(properties.day) else 0
+        self.seed = seed
+        self.dur_rng = self.runtime_stream()
+        self.mem_rng = self.memory_stream()
+
+        # function: function id is the row of the property table
+        [self.dur_ave, self.dur_ptr] = [properties.dur_ave, properties.dur_ptr]
+        [self.dur_cum, self.dur_total] = self.__cum_weights(properties.dur_prob, properties.dur_ptr)
+
+        # app: memory of the first function of the app, all functions of an app share it
+        [flat_idx, self.mem_ptr] = take_segments(ids.app_ptr[:-1], properties.mem_ptr)
+        self.mem_ave = properties.mem_ave[flat_idx]
+        [self.mem_cum, self.mem_total] = self.__cum_weights(properties.mem_prob[flat_idx], self.mem_ptr)
+
+    def runtime_stream(self):
+        """
+        Returns:
+            np.random.Generator: runtime random stream of the day from its start, dur_rng is one
+        """
+        return np.random.default_rng([self.seed, self.day, 0])
+
+    def memory_stream(self):
+        """
+        Returns:
+            np.random.Generator: memory random stream of the day from its start, mem_rng is one
+        """
+        return np.random.default_rng([self.seed, self.day, 1])
+
+    @staticmethod
+    def __cum_weights(prob, ptr) -> list:
+        """cumulative weights inside each distribution, summed in the same order as itertools.accumulate
+
+        Returns:
+            list: flat cumulative weights, total weight of each distribution
+        """
+
+        n = ptr[1:] - ptr[:-1]
+        width = np.arange(n.max(initial=1))
+        pad = width[None, :] < n[:, None]
+        cum = np.zeros(pad.shape)
+        cum[pad] = prob
+        cum = np.cumsum(cum, axis=1)
+        total = cum[np.arange(len(n)), np.maximum(n - 1, 0)] + 0.0
+        return [cum[pad], total]
+
+    @staticmethod
+    def __bisect(cum, lo, n, target):
+        """vectorized bisect_right(cum[lo:lo+n], target, 0, n - 1), as used by random.choices
+
+        Returns:
+            ndarray: flat index of the drawn value
+        """
+
+        left = np.zeros(len(lo), dtype=np.int64)
+        right = n - 1
+        while True:
+            active = left < right
+            if not active.any():
+                break
+            mid = (left + right) // 2
+            go_left = target < cum[lo + mid]
+            right = np.where(active & go_left, mid, right)
+            left = np.where(active & ~go_left, mid + 1, left)
+        return lo + left
+
+    def draw_func_dur(self, func_ids, rand=None):
+        """generate randomly function runtime of many invocations at once
+
+        Args:
+            func_ids (ndarray): function id of each invocation
+            rand (ndarray): uniform random numbers in [0, 1), drawn from the runtime stream if None
+
+        Returns:
+            ndarray: randomly allocated run time in minute
+        """
+
+        if rand is None:
+            rand = self.dur_rng.random(len(func_ids))
+        lo = self.dur_ptr[func_ids]
+        idx = self.__bisect(self.dur_cum, lo, self.dur_ptr[func_ids + 1] - lo, rand * self.dur_total[func_ids])
+        return self.dur_ave[idx] / 60000.0
+
+    def draw_app_mem(self, app_ids, rand=None):
+        """generate randomly app memory allocation of many apps at once
+
+        Args:
+            app_ids (ndarray): app id of each sample
+            rand (ndarray): uniform random numbers in [0, 1), drawn from the memory stream if None
+
+        Returns:
+            ndarray: randomly allocated memory
+        """
+
+        if rand is None:
+            rand = self.mem_rng.random(len(app_ids))
+        lo = self.mem_ptr[app_ids]
+        idx = self.__bisect(self.mem_cum, lo, self.mem_ptr[app_ids + 1] - lo, rand * self.mem_total[app_ids])
+        return self.mem_ave[idx].astype(np.int64)
@@ -0,0 +1,323 @@
+import numpy as np
+import heapq
+import os
+import queue
+from functools import partialmethod
+from multiprocessing import Pool, resource_tracker, shared_memory
+from tqdm import tqdm
+from util.DataLoader import DataLoader
+from util.Simulator import FaasSimulator
+from util.Manager import BeladysimSys, FixIntervalEvaluator, FixIntervalsimSys, GreedysimSys, KeepAlivesimSys
+from util.Policy import HistogramKeepAlive
+from util.Telemetry import Telemetry
+from util.Cache import trace_fingerprint
+
+
+class SharedArrays():
+    """named arrays, each in its own shared memory block
+
+    The spec ({name: (block, shape, dtype)}) is small and picklable, processes attach to it without copying.
+    Only the creator unlinks the blocks.
+    """
+
+    def __init__(self, blocks, spec) -> None:
+        self.blocks = blocks
+        self.spec = spec
+        self.arrays = {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+                       for name, (_, shape, dtype) in spec.items()}
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    @classmethod
+    def create(cls, arrays):
+        """copy arrays into new shared memory blocks
+
+        Args:
+            arrays (dict): name -> ndarray
+        """
+        blocks = {}
+        spec = {}
+        for name, array in arrays.items():
+            blocks[name] = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            spec[name] = (blocks[name].name, array.shape, array.dtype.str)
+        shared = cls(blocks, spec)
+        for name, array in arrays.items():
+            shared.arrays[name][...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        return cls({name: shared_memory.SharedMemory(name=block) for name, (block, _, _) in spec.items()}, spec)
+
+    def close(self) -> None:
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+
+    def unlink(self) -> None:
+        self.close()
+        for block in self.blocks.values():
+            block.unlink()
+
+
+def share_day(path, day, seed, budget=None):
+    """load a day and put what the tasks need in shared memory: app ids, app execution series by minute
+    and app memory, drawn once for all memory sizes as in FaasSimulator.app_memory
+
+    Returns:
+        dict: spec of the SharedArrays of the day
+    """
+    loader = DataLoader(path=path, budget=budget)
+    loader.load_dataset(day)
+    simulator = FaasSimulator(loader, seed=seed)
+    simulator.prepare()
+    [app_ids, app_exe] = loader.ids.app_max(simulator.exe_func, simulator.exe_mat)
+    shared = SharedArrays.create({"app_ids": app_ids,
+                                  "exe_by_minute": np.ascontiguousarray(app_exe.T),
+                                  "app_mem": simulator.app_memory()[1]})
+    shared.close()
+    return shared.spec
+
+
+def quiet_worker() -> None:
+    """initializer of the workers: no progress bars of their own, the scheduler shows the overall progress"""
+    tqdm.__init__ = partialmethod(tqdm.__init__, disable=True)
+
+
+_attached = {} # SharedArrays of each day attached by this worker, by first block name
+
+def attach_day(spec) -> SharedArrays:
+    key = next(iter(spec.values()))[0]
+    if key not in _attached:
+        _attached[key] = SharedArrays.attach(spec)
+    return _attached[key]
+
+
+def run_task(spec, policy, arg_lst, telemetry=False) -> list:
+    """simulate one policy with several parameters on a shared day
+
+    Args:
+        spec (dict): spec of the day from share_day
+        policy (str): "greedy" (GreedysimSys, memory size), "oracle" (BeladysimSys, memory size),
+                      "fixed" (FixIntervalsimSys, keep alive interval),
+                      "keep-alive" (each app on its own, keep alive interval)
+                      or "histogram" (HistogramKeepAlive, tail percentile of the idle gaps)
+        arg_lst (list): parameters
+        telemetry (bool): record the per-minute Telemetry of the system simulators
+
+    Returns:
+        list: [cold start rates, memory waste rates], one list per parameter, and the Telemetry, one column
+              per parameter, or None if not recorded
+    """
+    day = attach_day(spec)
+    exe_by_minute = day["exe_by_minute"]
+    if policy == "keep-alive":
+        evaluator = FixIntervalEvaluator(exe_by_minute[1:].T)
+        result = [evaluator.evaluate(intv) for intv in arg_lst]
+        return [[r[0] for r in result], [r[1] for r in result], None]
+
+    if policy == "greedy":
+        simSys = GreedysimSys(day["app_ids"], day["app_mem"], n_policy=len(arg_lst))
+        simSys.total_mem = list(arg_lst)
+    elif policy == "oracle":
+        simSys = BeladysimSys(day["app_ids"], day["app_mem"], exe_by_minute, n_policy=len(arg_lst))
+        simSys.total_mem = list(arg_lst)
+    elif policy == "fixed":
+        simSys = FixIntervalsimSys(day["app_ids"], n_policy=len(arg_lst))
+        simSys.keep_alive_interval = list(arg_lst)
+    elif policy == "histogram":
+        simSys = KeepAlivesimSys(day["app_ids"], HistogramKeepAlive(tail=list(arg_lst)), n_policy=len(arg_lst))
+    else:
+        raise ValueError("unknown policy {}".format(policy))
+    if telemetry:
+        simSys.telemetry = Telemetry(exe_by_minute.shape[0], len(arg_lst))
+    for i in range(exe_by_minute.shape[0]):
+        if not simSys.update(exe_by_minute[i]):
+            print("System Memory Overflow!")
+            break
+    return [simSys.cal_cold_rate(), simSys.cal_mem_waste(), simSys.telemetry]
+
+
+class DayScheduler():
+    """run (day, policy, parameter) tasks on a worker pool, every day is loaded once into shared memory
+
+    Days are loaded by the workers first, the tasks of a day become ready as soon as it is loaded.
+    Tasks of the same day and policy are grouped by batch_size parameters into one batched simulator,
+    batch_size = 1 spreads every parameter on its own worker.
+    No task is bound to a worker in advance: at most n_worker tasks are in flight, and a worker that finishes
+    takes the longest ready task (estimated by POLICY_COST x apps of the day x parameters), so a slow day
+    is spread over the pool instead of setting the wall-clock time on its own.
+    With a ResultCache, the tasks found in it are not simulated and days without missing task are not loaded,
+    so growing the parameter list of a sweep only runs the new parameters.
+    """
+
+    POLICY_COST = {"keep-alive": 0.2, "fixed": 1.0, "greedy": 1.0, "oracle": 1.2, "histogram": 5.0} # time per app and parameter
+
+    def __init__(self, path, seed=0, n_worker=None, batch_size=1, budget=None, telemetry_dir=None, cache=None,
+                 progress=True) -> None:
+        """
+        Args:
+            path (str): folder of the trace
+            seed (int): seed of the random streams of every day
+            n_worker (int): number of processes, os.cpu_count() if None
+            batch_size (int): parameters simulated together by a task
+            budget (dict): memory budget of each stage of TraceReader
+            telemetry_dir (str): folder of the per-minute telemetry of each (day, policy, parameter),
+                                 telemetry_{day}_{policy}_{parameter}.npz (telemetry_{seed}_{day}_... in run_seeds),
+                                 not recorded if None
+            cache (ResultCache): results of previous runs, and store of the new ones
+            progress (bool): show one progress bar of the simulated parameters
+        """
+        self.path = path
+        self.seed = seed
+        self.n_worker = n_worker or os.cpu_count()
+        self.batch_size = batch_size
+        self.budget = budget
+        self.telemetry_dir = telemetry_dir
+        self.cache = cache
+        self.progress = progress
+
+    def __telemetry(self, policy) -> bool:
+        return self.telemetry_dir is not None and policy != "keep-alive" # apps simulated on their own, no system state
+
+    def __batches(self, tasks) -> dict:
+        """
+        Returns:
+            dict: (seed, day) -> list of (policy, parameters) of its tasks, in the order of tasks
+        """
+        groups = {}
+        for [seed, day, policy, arg] in tasks:
+            groups.setdefault((seed, day), {}).setdefault(policy, []).append(arg)
+        return {unit: [(policy, arg_lst[k:k + self.batch_size])
+                       for policy, arg_lst in by_policy.items()
+                       for k in range(0, len(arg_lst), self.batch_size)]
+                for unit, by_policy in groups.items()}
+
+    def __store(self, task, key, cold_rate, mem_rate, telemetry, name) -> None:
+        [seed, day, policy, arg] = task
+        meta = {"day": day, "seed": seed, "policy": policy, "arg": arg}
+        if telemetry is not None:
+            telemetry.save(os.path.join(self.telemetry_dir, "telemetry_{}.npz".format(name)), meta)
+        if key is not None:
+            self.cache.put(key, cold_rate, mem_rate, telemetry, meta)
+
+    def run(self, tasks) -> dict:
+        """
+        Args:
+            tasks (list): (day, policy, parameter) of each run, policy as in run_task
+
+        Returns:
+            dict: (day, policy, parameter) -> [cold start rates, memory waste rates], in the order of tasks
+        """
+        result = self.run_seeds([(self.seed, *task) for task in tasks], named_by_seed=False)
+        return {task[1:]: value for task, value in result.items()}
+
+    def run_seeds(self, tasks, named_by_seed=True) -> dict:
+        """
+        Args:
+            tasks (list): (seed, day, policy, parameter) of each run, a day is loaded once per seed
+            named_by_seed (bool): telemetry files are named by the seed too
+
+        Returns:
+            dict: (seed, day, policy, parameter) -> [cold start rates, memory waste rates], in the order of tasks
+        """
+        tasks = list(dict.fromkeys(tuple(task) for task in tasks))
+        name = {task: "_".join(str(x) for x in (task if named_by_seed else task[1:])) for task in tasks}
+        result = {}
+        keys = {}
+        missing = []
+        fingerprint = {}
+        for task in tasks:
+            [seed, day, policy, arg] = task
+            if self.cache is not None:
+                if day not in fingerprint:
+                    fingerprint[day] = trace_fingerprint(self.path, day)
+                keys[task] = self.cache.key(fingerprint[day], policy, arg, seed)
+                cached = self.cache.get(keys[task], telemetry=self.__telemetry(policy))
+                if cached is not None:
+                    result[task] = cached[:2]
+                    if cached[2] is not None:
+                        self.__store(task, None, *cached, name[task])
+                    continue
+            missing.append(task)
+        if self.cache is not None:
+            print("{} of {} tasks cached, {} to simulate".format(len(result), len(tasks), len(missing)))
+        if missing:
+            self.__dispatch(self.__batches(missing), result, keys, name)
+        return {task: result[task] for task in tasks}
+
+    def __dispatch(self, batches, result, keys, name) -> None:
+        """run the batches of every (seed, day), longest ready task first, results go into result"""
+        done = queue.SimpleQueue() # (kind, item, value) of each finished job, filled by the result thread of the pool
+        n_load = 0 # loads in flight, their shared blocks are only known once they are done
+        ready = [] # heap of (-estimated cost, order, job)
+        order = 0
+        for unit in batches: # loads come first, in the order of the days
+            heapq.heappush(ready, (-np.inf, order, ("load", unit)))
+            order += 1
+
+        def submit(job) -> None:
+            nonlocal n_load
+            if job[0] == "load":
+                n_load += 1
+                [seed, day] = job[1]
+                func, args = share_day, (self.path, day, seed, self.budget)
+            else:
+                [unit, spec, policy, arg_lst] = job[1]
+                func, args = run_task, (spec, policy, arg_lst, self.__telemetry(policy))
+            pool.apply_async(func, args, callback=lambda value: done.put((job[0], job[1], value)),
+                             error_callback=lambda error: done.put(("error", job, error)))
+
+        def finish() -> list:
+            """
+            Returns:
+                list: [kind, item, value] of the next finished job, the shared blocks of a load are attached
+            """
+            nonlocal n_load
+            [kind, item, value] = done.get()
+            if kind == "load" or (kind == "error" and item[0] == "load"):
+                n_load -= 1
+            if kind == "load":
+                shared.append(SharedArrays.attach(value)) # owned by the scheduler, unlinked at the end
+            return [kind, item, value]
+
+        shared = []
+        pbar = tqdm(total=sum(len(arg_lst) for unit_batches in batches.values() for _, arg_lst in unit_batches),
+                    desc="simulating", unit="run", disable=not self.progress)
+        resource_tracker.ensure_running() # shared by the workers, else each of them cleans up the blocks at exit
+        with Pool(self.n_worker, initializer=quiet_worker) as pool:
+            try:
+                n_job = len(ready) + sum(len(unit_batches) for unit_batches in batches.values())
+                n_flight = 0
+                while n_job > 0:
+                    while ready and n_flight < self.n_worker:
+                        submit(heapq.heappop(ready)[2])
+                        n_flight += 1
+                    [kind, item, value] = finish()
+                    n_flight -= 1
+                    n_job -= 1
+                    if kind == "error":
+                        raise value
+                    if kind == "load":
+                        n_app = value["app_ids"][1][0]
+                        for policy, arg_lst in batches[item]:
+                            cost = self.POLICY_COST.get(policy, 1.0) * n_app * len(arg_lst)
+                            heapq.heappush(ready, (-cost, order, ("task", (item, value, policy, arg_lst))))
+                            order += 1
+                        continue
+                    [unit, _, policy, arg_lst] = item
+                    [cold_rate_lst, mem_rate_lst, telemetry] = value
+                    for k, [arg, cold_rate, mem_rate] in enumerate(zip(arg_lst, cold_rate_lst, mem_rate_lst)):
+                        task = (*unit, policy, arg)
+                        result[task] = [cold_rate, mem_rate]
+                        self.__store(task, keys.get(task), cold_rate, mem_rate,
+                                     None if telemetry is None else telemetry.select([k]), name[task])
+                    pbar.update(len(arg_lst))
+            finally:
+                pbar.close()
+                while n_load > 0: # after an error, wait for the loads in flight to unlink their blocks too
+                    finish()
+                pool.terminate()
+                for day in shared:
+                    day.unlink()
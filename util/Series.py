@@ -0,0 +1,269 @@
+import numpy as np
+import json
+import os
+from util.Properties import atomic_write, fingerprint, fresh_source, take_segments
+
+
+class ExecutionRuns():
+    """run-length encoded execution series, one list of execution spans per row
+
+    A span is a flagged minute (number of invocations + 1) followed by busy minutes (1),
+    or busy minutes without flag, e.g. the tail of an execution overwritten by a later one.
+    Span j of the flat arrays covers minutes [start[j], start[j] + length[j]) of its row
+    and carries count[j] invocations (0 without flag). Rows own spans [row_ptr[k], row_ptr[k+1]).
+    """
+
+    version = 1
+
+    def __init__(self, row_id, row_ptr, start, length, count, n_minute=1440) -> None:
+        self.row_id = row_id
+        self.row_ptr = row_ptr
+        self.start = start
+        self.length = length
+        self.count = count
+        self.n_minute = n_minute
+
+    def __len__(self) -> int:
+        return len(self.row_id)
+
+    @property
+    def n_span(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def from_dense(cls, row_id, series):
+        """encode a dense execution series
+
+        Args:
+            row_id (ndarray): id of each row (function or app)
+            series (ndarray): execution series, row x minute
+
+        Returns:
+            ExecutionRuns: spans of every row
+        """
+
+        [row, t] = np.nonzero(series)
+        value = series[row, t]
+        prev_idle = np.ones(len(row), dtype=bool)
+        prev_idle[t > 0] = series[row[t > 0], t[t > 0] - 1] == 0
+        span_start = (value >= 2) | prev_idle
+
+        length = np.bincount(np.cumsum(span_start) - 1, minlength=np.count_nonzero(span_start))
+        row_ptr = np.concatenate([[0], np.cumsum(np.bincount(row[span_start], minlength=len(series)))]).astype(np.int64)
+        count = value[span_start] - 1
+        return cls(np.asarray(row_id),
+                   row_ptr,
+                   t[span_start].astype(np.int16),
+                   length.astype(np.int16),
+                   count.astype(np.min_scalar_type(count.max(initial=0))),
+                   series.shape[1])
+
+    def to_dense(self):
+        """
+        Returns:
+            ndarray: execution series, row x minute, in the smallest unsigned type holding it
+        """
+
+        series = np.zeros((len(self), self.n_minute), dtype=np.min_scalar_type(self.count.max(initial=0) + 1))
+        row = np.repeat(np.arange(len(self)), self.row_ptr[1:] - self.row_ptr[:-1])
+        [span_row, minute] = self.__span_minutes(row)
+        series[span_row, minute] = 1
+        series[row, self.start] = self.count.astype(series.dtype) + 1
+        return series
+
+    def __span_minutes(self, span_value):
+        """
+        Returns:
+            list: span_value of the span of every busy minute, busy minutes
+        """
+        length = self.length.astype(np.int64)
+        offset = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+        return [np.repeat(span_value, length), np.repeat(self.start.astype(np.int64), length) + offset]
+
+    def take(self, rows):
+        """
+        Returns:
+            ExecutionRuns: the given rows only
+        """
+
+        [flat_idx, row_ptr] = take_segments(rows, self.row_ptr)
+        return ExecutionRuns(self.row_id[rows], row_ptr,
+                             self.start[flat_idx], self.length[flat_idx], self.count[flat_idx], self.n_minute)
+
+    def events(self, by_minute=False) -> list:
+        """every execution span as flat arrays, for simulators iterating events instead of minutes
+
+        Args:
+            by_minute (bool): order by start minute (then by row) instead of by row (then by minute)
+
+        Returns:
+            list: [row, start, length, count] of each span
+        """
+
+        row = np.repeat(np.arange(len(self)), self.row_ptr[1:] - self.row_ptr[:-1])
+        order = np.argsort(self.start, kind='stable') if by_minute else slice(None)
+        return [row[order], self.start[order], self.length[order], self.count[order]]
+
+    def busy_runs(self) -> list:
+        """maximal busy runs, adjacent spans of a row are merged
+
+        Returns:
+            list: [row, start, length] of each run
+        """
+
+        [row, start, length, _] = self.events()
+        end = start.astype(np.int64) + length
+        new_run = np.ones(len(row), dtype=bool)
+        new_run[1:] = (row[1:] != row[:-1]) | (start[1:] != end[:-1])
+        run_id = np.cumsum(new_run) - 1
+        return [row[new_run], start[new_run].astype(np.int64), np.bincount(run_id, weights=length).astype(np.int64)]
+
+    def idle_runs(self) -> list:
+        """maximal idle runs, including the ones before the first and after the last busy run of a row
+
+        Returns:
+            list: [row, start, length] of each run
+        """
+
+        [row, start, length] = self.busy_runs()
+        n_busy = np.bincount(row, minlength=len(self))
+        # run k of a row is followed by idle run k + 1, idle run 0 starts the day
+        idle_row = np.repeat(np.arange(len(self)), n_busy + 1)
+        idle_start = np.zeros(len(idle_row), dtype=np.int64)
+        idle_end = np.full(len(idle_row), self.n_minute, dtype=np.int64)
+        busy_slot = np.arange(len(row)) + row # position of the idle run following each busy run
+        idle_start[busy_slot + 1] = start + length
+        idle_end[busy_slot] = start
+        keep = idle_end > idle_start
+        return [idle_row[keep], idle_start[keep], (idle_end - idle_start)[keep]]
+
+    def save(self, path, names, meta=None, sources=()) -> None:
+        """save the runs as an uncompressed npz file
+
+        Args:
+            path (str): output file
+            names (list): [HashOwner, HashApp, HashFunction] names of each row
+            meta (dict): extra metadata recorded with the runs
+            sources (list): paths of the source files, fingerprinted for invalidation
+        """
+
+        meta = dict(meta or {}, version=self.version, n_minute=self.n_minute,
+                    sources=[fingerprint(src) for src in sources])
+        with atomic_write(path) as f:
+            np.savez(f,
+                     meta=np.array(json.dumps(meta)),
+                     owner=np.asarray(names[0]).astype(bytes),
+                     app=np.asarray(names[1]).astype(bytes),
+                     func=np.asarray(names[2]).astype(bytes),
+                     row_ptr=self.row_ptr,
+                     start=self.start,
+                     length=self.length,
+                     count=self.count)
+
+    @classmethod
+    def load(cls, path, sources=None):
+        """load runs saved by save
+
+        Args:
+            path (str): npz file
+            sources (list): paths of the source files, skip the check if None
+
+        Returns:
+            list: [names, runs] with row_id the position in the file, None if the file is missing,
+                  of another version or out of date
+        """
+
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta["version"] != cls.version:
+                return None
+            if sources is not None and not fresh_source(path, meta, sources):
+                return None
+            names = [npz["owner"].astype(str), npz["app"].astype(str), npz["func"].astype(str)]
+            runs = cls(np.arange(len(names[0])), npz["row_ptr"], npz["start"], npz["length"], npz["count"], meta["n_minute"])
+        return [names, runs]
+
+
+class ExecutionStore():
+    """dense execution series on disk, opened as a memory map
+
+    The series is a fixed-width row x minute matrix in the smallest unsigned type holding it
+    (uint8 unless a minute has more than 254 invocations), saved as {path}.npy.
+    The index {path}.npz holds the names of the rows and the metadata.
+    Opening reads the index only, rows and minutes are read from disk when accessed.
+    """
+
+    version = 1
+
+    def __init__(self, names, matrix, meta) -> None:
+        self.names = names
+        self.matrix = matrix
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def read(self, rows=None, lo=0, hi=None):
+        """
+        Args:
+            rows (ndarray): rows to read, all rows if None
+            lo, hi (int): minute window [lo, hi)
+
+        Returns:
+            ndarray: copy of the window of the rows
+        """
+        if rows is None:
+            return np.array(self.matrix[:, lo:hi])
+        return self.matrix[np.asarray(rows), lo:hi]
+
+    @staticmethod
+    def save(path, names, series, meta=None, sources=()) -> None:
+        """save a dense execution series, the matrix first and the index last
+
+        Args:
+            path (str): output path without extension
+            names (list): [HashOwner, HashApp, HashFunction] names of each row
+            series (ndarray): execution series, row x minute
+            meta (dict): extra metadata recorded with the series
+            sources (list): paths of the source files, fingerprinted for invalidation
+        """
+
+        series = series.astype(np.min_scalar_type(series.max(initial=0)), copy=False)
+        meta = dict(meta or {}, version=ExecutionStore.version, shape=list(series.shape), dtype=series.dtype.str,
+                    sources=[fingerprint(src) for src in sources])
+        with atomic_write(path + ".npy") as f:
+            np.save(f, series)
+        with atomic_write(path + ".npz") as f:
+            np.savez(f,
+                     meta=np.array(json.dumps(meta)),
+                     owner=np.asarray(names[0]).astype(bytes),
+                     app=np.asarray(names[1]).astype(bytes),
+                     func=np.asarray(names[2]).astype(bytes))
+
+    @classmethod
+    def open(cls, path, sources=None):
+        """open a store saved by save
+
+        Args:
+            path (str): path without extension
+            sources (list): paths of the source files, skip the check if None
+
+        Returns:
+            ExecutionStore: the store, None if a file is missing, of another version or out of date
+        """
+
+        if not os.path.exists(path + ".npz") or not os.path.exists(path + ".npy"):
+            return None
+        with np.load(path + ".npz", allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta["version"] != cls.version:
+                return None
+            if sources is not None and not fresh_source(path + ".npz", meta, sources):
+                return None
+            names = [npz["owner"].astype(str), npz["app"].astype(str), npz["func"].astype(str)]
+        matrix = np.load(path + ".npy", mmap_mode='r')
+        if list(matrix.shape) != meta["shape"] or matrix.dtype.str != meta["dtype"]: # matrix of another save
+            return None
+        return cls(names, matrix, meta)
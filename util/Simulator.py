@@ -1,17 +1,20 @@
 import pandas as pd
 import numpy as np
-import random
 import os
 import copy
 import math
 from time import time
 import threading 
 import functools
-import matplotlib.pyplot as plt
 
 import ipdb
 from tqdm import tqdm, trange
-from util.Manager import FixIntervalsimApp, FixIntervalsimSys, GreedysimSys
+from util.Manager import FixIntervalEvaluator, FixIntervalsimSys, GreedysimSys, BeladysimSys, ClustersimSys, InstanceEvaluator
+from util.Sampler import PropertySampler
+from util.Series import ExecutionRuns, ExecutionStore
+from util.Reader import TraceReader
+from util.Engine import EventEngine
+from util.Telemetry import Telemetry
 
 
 def call_it(instance, name, arg):
@@ -19,176 +22,463 @@ def call_it(instance, name, arg):
     return getattr(instance, name)(arg)
 
 class FaasSimulator():
-    def __init__(self, data_loader) -> None:
+    def __init__(self, data_loader, seed=0) -> None:
         self.data_loader = data_loader
         # self.data_info = data_loader.data_info
-        self.dur_info = data_loader.data_info.sort_index()[["DurAve", "DurProb"]]
-        self.mem_info = data_loader.data_info.groupby(["Day", "HashOwner", "HashApp"]).max().sort_index()[["MemAve", "MemProb"]]
+        self.ids = data_loader.ids
+        self.seed = seed
+        self.sampler = PropertySampler(data_loader.properties, self.ids, seed=seed)
         self.max_day = data_loader.max_day
         self.data_path = data_loader.data_path
         self.day_id = data_loader.day_id
-        self.inv_raw = []
-        self.exe_raw = []
+        self.inv_func = None # function id of each row of inv_mat, None before reading
+        self.inv_mat = None # invocation counts, function x minute
+        self.exe_func = np.zeros(0, dtype=np.int32) # function id of each row of exe_mat
+        self.exe_mat = np.zeros((0, 1440), dtype=np.uint8) # execution series, function x minute
+        self.keep_alive_eval = None # FixIntervalEvaluator of the execution series
+        self.instance_eval = None # [app ids, InstanceEvaluator of the instances needed]
+        self.app_mem = None # [app ids, memory of each app], drawn once by app_memory
         self.system_clock = [0, 0] # [day, sec]
         self.system_monitor = dict()
-        self.owner_dict = dict()
         self.day_len = 1440
         self.invc_flag = [2, 1]
+    
+    def __fill_exec_span(self, series, row, t, state, dur):
+        """mark the minutes covered by each invocation in place,
+        the first minute of the execution is flagged with number of invocations + 1, 
+        the following minutes with 1. Later invocations overwrite earlier ones.
+
+        Args:
+            series (ndarray): execution series (function x minute), modified in place
+            row (ndarray): row of each invocation, in row-major order
+            t (ndarray): 0-based minute of each invocation
+            state (ndarray): number of invocations of each invocation minute
+            dur (ndarray): runtime in minute of each invocation
+        """
+        
+        end = t + 1
+        func_start_time = np.maximum(0.01, end - dur)
+        # same minutes as np.ceil(np.arange(func_start_time, t + 1, 1))
+        span = np.ceil(end - func_start_time).astype(np.int64)
+        second = func_start_time + 1.0
+        delta = second - func_start_time
+        
+        k = np.arange(span.sum()) - np.repeat(np.cumsum(span) - span, span)
+        exec_time = np.repeat(func_start_time, span) + k * np.repeat(delta, span)
+        exec_time[k == 1] = np.repeat(second, span)[k == 1]
+        exec_time = np.ceil(exec_time).astype(np.int64) - 1
+        
+        value = np.where(k == 0, np.repeat(state + 1, span), 1)
+        cell = np.repeat(row, span) * series.shape[1] + exec_time
+        in_day = exec_time < series.shape[1]
         
-        # self.baseM = BaselineManager(data_info=self.data_info, owner_dict=self.owner_dict)
+        # keep the last write of each cell
+        [cell, last] = np.unique(cell[in_day][::-1], return_index=True)
+        series.flat[cell] = value[in_day][::-1][last]
     
-    def __generate_func_dur(self, ID_arr):
-        """generate randomly function runtime usage based on dataset information
+    def __draw_invocations(self, rng) -> list:
+        """invocation minutes of the functions with memory/duration properties,
+        with the uniform number of the runtime draw of each of them
 
         Args:
-            day (str): day of running
-            ID_arr (ndarray): ID in a array ([OwnerID, AppID, FunctionID])
+            rng (np.random.Generator): runtime random stream
 
         Returns:
-            float: randomly allocated run time in minute
+            list: [function id of each row, invocation counts (row x minute)], 
+                  [row, 0-based minute, invocation count, uniform number] of each invocation minute
         """
+        if self.inv_func is None:
+            self.__read_invocations()
         
-        [owner_id, app_id, func_id] = ID_arr
-        # func_properties = self.data_info.loc[day].loc[owner_id].loc[app_id].loc[func_id]
-        # func_properties = self.data_info.loc[day, owner_id, app_id, func_id]
-        DurAve = self.dur_info.loc[(str(self.day_id), owner_id, app_id, func_id), "DurAve"]
-        DurProb = self.dur_info.loc[(str(self.day_id), owner_id, app_id, func_id), "DurProb"]
-        rand_dur = random.choices(DurAve, weights=DurProb, k=1)[0] / 60000.0
+        # random numbers are consumed in the same order as the per-function loop:
+        # duration and memory trial draw of each function, then one duration per invoked minute
+        func_row = self.inv_func
+        n_invoc = np.count_nonzero(self.inv_mat, axis=1)
+        n_rand = 2 + n_invoc
+        rand = rng.random(n_rand.sum())
+        rand_start = np.cumsum(n_rand) - n_rand + 2
         
-        return rand_dur
+        series = self.inv_mat.astype(np.min_scalar_type(int(self.inv_mat.max(initial=0)) + 1)) # room for the flags
+        [row, t] = np.nonzero(series)
+        state = series[row, t]
+        rank = np.arange(len(row)) - np.repeat(np.cumsum(n_invoc) - n_invoc, n_invoc)
+        return [func_row, series, row, t, state, rand[rand_start[row] + rank]]
+    
+    def __gen_invoc_series(self, save=True, chunk_size=1 << 22):
+        """generate execution series from the invocation counts on the whole int matrix,
+        functions without memory/duration properties are dropped
 
+        Args:
+            save (bool): whether to save the series
+            chunk_size (int): number of invocation minutes processed at once
+        """
+        [func_row, series, row, t, state, rand] = self.__draw_invocations(self.sampler.dur_rng)
         
-    def __generate_app_mem(self, ID_arr):
-        """generate randomly app memory allocation based on dataset information
+        with tqdm(total=len(row)) as pbar:
+            for lo in range(0, len(row), chunk_size):
+                hi = min(lo + chunk_size, len(row))
+                dur = self.sampler.draw_func_dur(func_row[row[lo:hi]], rand[lo:hi])
+                dur[dur == 0] = 0.01
+                self.__fill_exec_span(series, row[lo:hi], t[lo:hi], state[lo:hi], dur)
+                pbar.update(hi - lo)
+        
+        self.exe_func = func_row
+        self.exe_mat = series.astype(np.min_scalar_type(series.max(initial=0)))
+        if save == True:
+            self.__save_store()
+    
+    def exec_spans(self, sub_minute=False) -> list:
+        """execution spans of every app, the input of EventEngine
 
         Args:
-            ID_arr (ndarray): ID in a array ([OwnerID, AppID])
+            sub_minute (bool): use the drawn runtimes of the invocations instead of the minute series,
+                               an execution ends at the end of its invocation minute like in the series
 
         Returns:
-            int: randomly allocated memory
-        """
-        
-        [owner_id, app_id] = ID_arr
-
-            
-        MemAve = self.mem_info.loc[(str(self.day_id), owner_id, app_id), "MemAve"]
-        MemProb = self.mem_info.loc[(str(self.day_id), owner_id, app_id), "MemProb"]
-        
-        rand_mem_alloc = random.choices(MemAve, weights=MemProb, k=1)[0]
-        
-        if type(rand_mem_alloc) == dict:
-            ipdb.set_trace()
-        return int(rand_mem_alloc)
-    
-    def __gen_invoc_series(self, save=True):
-        # i = arg[0]
-        # save = arg[1]
-        invoc_info_col = ["HashOwner", "HashApp", "HashFunction"]
-
-        inv_tmp = copy.deepcopy(self.inv_raw).set_index(invoc_info_col).iloc[:, 1:].sort_index()
-        
-        # ipdb.set_trace()
-        
-        # func_name = inv_tmp[invoc_info_col].values
-        func_name = np.vstack([[inv_tmp.index.get_level_values(0).values, 
-                                inv_tmp.index.get_level_values(1).values, 
-                                inv_tmp.index.get_level_values(2).values]]).T 
-        # ipdb.set_trace()        
-        with tqdm(total=len(func_name)) as pbar:
-            for func_ in func_name:
-                pbar.update(1)
-                
-                try: # skip rows without memory/duration
-                    dur = self.__generate_func_dur(ID_arr=func_)
-                    mem = self.__generate_app_mem(ID_arr=func_[:2])
-                except KeyError:
-                    inv_tmp = inv_tmp.drop(index=(func_[0], func_[1], func_[2]))
-                    continue # we do not have info for this func               
-                
-                func_invc_series = inv_tmp.loc[(func_[0], func_[1], func_[2])].values
-                for t, state in enumerate(func_invc_series):
-                    if state:
-                        dur = self.__generate_func_dur(ID_arr=func_)
-                        if not dur:
-                            dur = 0.01                        
-                        func_start_time = max(0.01, t + 1 - dur)
-                        exec_time = np.ceil(np.arange(func_start_time, t + 1, 1)).astype(int).astype(str) # the duration of this exec
-                        if dur <= 1: # within 1min: num of invocation+1
-                            inv_tmp.loc[(func_[0], func_[1], func_[2]), exec_time[0]] = state + 1
-                        else:   # func has some duration: first time slot: num of invocation+1; following time slot: 1
-                            inv_tmp.loc[(func_[0], func_[1], func_[2]), exec_time[0]] = state + 1
-                            inv_tmp.loc[(func_[0], func_[1], func_[2]), (x for x in exec_time[1:])] = 1
-        
-        
-        self.exe_raw = inv_tmp.sort_index()
-        if save == True:
-            output_path = os.path.join(self.data_path, "execution_series_{}.csv".format(self.day_id))
-            inv_tmp.to_csv(output_path)
+            list: [app id, start, end, number of invocations] of each span, in minutes from the start of the day
+        """
+        if not sub_minute:
+            [app_ids, app_exe] = self.ids.app_max(self.exe_func, self.exe_mat)
+            [row, start, length, count] = ExecutionRuns.from_dense(app_ids, app_exe).events()
+            start = start.astype(np.float64)
+            return [app_ids[row].astype(np.int64), start, start + length, count.astype(np.int64)]
+        
+        [func_row, _, row, t, state, rand] = self.__draw_invocations(self.sampler.runtime_stream())
+        dur = self.sampler.draw_func_dur(func_row[row], rand)
+        dur[dur == 0] = 0.01
+        end = t + 1.0
+        return [self.ids.func_app[func_row[row]].astype(np.int64), np.maximum(0.01, end - dur), end, state.astype(np.int64)]
 
+    def instance_demand(self, chunk_size=1 << 22) -> list:
+        """instances every app needs at every minute, from the invocation counts and the drawn runtimes
+
+        The invocations of a function in one minute share their drawn runtime and cover the same minutes
+        as in the execution series. They run on min(count, ceil(count * runtime)) instances:
+        the ones shorter than a minute follow each other on the same instance. 
+        The executions of all functions of an app add up.
+
+        Args:
+            chunk_size (int): number of app minutes accumulated at once
 
+        Returns:
+            list: [app ids, instances (app x minute) in the smallest unsigned type, invocations of each app]
+        """
+        [func_row, _, row, t, state, rand] = self.__draw_invocations(self.sampler.runtime_stream())
+        dur = self.sampler.draw_func_dur(func_row[row], rand)
+        dur[dur == 0] = 0.01
+        start = np.maximum(0.01, t + 1.0 - dur)
+        first = np.ceil(start).astype(np.int64) - 1
+        end = np.minimum(first + np.ceil(t + 1.0 - start).astype(np.int64), self.day_len)
+        width = np.clip(np.ceil(state * dur), 1, state).astype(np.int64)
+        
+        # functions are sorted by app, so are the invocations in row-major order
+        func_app = self.ids.func_app[func_row]
+        [app_ids, app_first] = np.unique(func_app, return_index=True)
+        app_row = np.searchsorted(app_ids, func_app[row])
+        n_invoc = np.add.reduceat(self.inv_mat.sum(axis=1, dtype=np.int64), app_first) if len(app_ids) else np.zeros(0, dtype=np.int64)
+        
+        bound = np.bincount(app_row, weights=width, minlength=len(app_ids)).max(initial=0)
+        demand = np.zeros((len(app_ids), self.day_len), dtype=np.min_scalar_type(int(bound)))
+        block = max(1, chunk_size // (self.day_len + 1))
+        for lo in range(0, len(app_ids), block):
+            hi = min(lo + block, len(app_ids))
+            [ev_lo, ev_hi] = np.searchsorted(app_row, [lo, hi])
+            base = (app_row[ev_lo:ev_hi] - lo) * (self.day_len + 1)
+            size = (hi - lo) * (self.day_len + 1)
+            diff = np.bincount(base + first[ev_lo:ev_hi], weights=width[ev_lo:ev_hi], minlength=size) - \
+                   np.bincount(base + end[ev_lo:ev_hi], weights=width[ev_lo:ev_hi], minlength=size)
+            demand[lo:hi] = np.cumsum(diff.reshape(hi - lo, -1), axis=1)[:, :-1]
+        return [app_ids, demand, n_invoc]
+
+    def __read_invocations(self) -> None:
+        [self.inv_func, self.inv_mat] = self.data_loader.reader.read_invocations(self.__inv_path(), self.ids)
+    
+    @property
+    def inv_raw(self) -> pd.DataFrame:
+        """invocation counts of the known functions as a frame indexed by [HashOwner, HashApp, HashFunction], built on access"""
+        return pd.DataFrame(self.inv_mat, 
+                            index=self.ids.func_frame_index(self.inv_func), 
+                            columns=[str(t + 1) for t in range(self.inv_mat.shape[1])])
+    
+    @inv_raw.setter
+    def inv_raw(self, value) -> None:
+        """intern an invocation table as in the trace file, rows of functions without properties are dropped"""
+        func_ids = self.ids.encode_funcs(*[value[col].values for col in TraceReader.hash_col])
+        order = np.flatnonzero(func_ids >= 0)
+        order = order[np.argsort(func_ids[order], kind='stable')]
+        self.inv_func = func_ids[order]
+        self.inv_mat = value[TraceReader.minute_col].values[order]
+    
+    @property
+    def exe_raw(self) -> pd.DataFrame:
+        """execution series as a frame indexed by [HashOwner, HashApp, HashFunction], built on access"""
+        return pd.DataFrame(self.exe_mat, 
+                            index=self.ids.func_frame_index(self.exe_func), 
+                            columns=[str(t + 1) for t in range(self.exe_mat.shape[1])])
+    
+    @exe_raw.setter
+    def exe_raw(self, value) -> None:
+        """intern an execution series frame, functions without properties are dropped"""
+        value = value.sort_index()
+        func_ids = self.ids.encode_funcs(*[value.index.get_level_values(k) for k in range(3)])
+        series = value.values[func_ids >= 0]
+        self.exe_func = func_ids[func_ids >= 0]
+        self.exe_mat = series.astype(np.min_scalar_type(series.max(initial=0)))
+
+
+
+    @property
+    def exe_runs(self) -> ExecutionRuns:
+        """execution series as runs of execution spans, row_id is the function id"""
+        return ExecutionRuns.from_dense(self.exe_func, self.exe_mat)
+    
+    @exe_runs.setter
+    def exe_runs(self, value) -> None:
+        self.exe_func = value.row_id.astype(np.int32)
+        self.exe_mat = value.to_dense()
+    
+    def __exec_path(self, ext) -> str:
+        return os.path.join(self.data_path, "execution_series_{}.{}".format(self.day_id, ext))
+    
+    def __inv_path(self) -> str:
+        return os.path.join(self.data_path, self.data_loader.inv_files[self.day_id-1])
+
+    def __series_sources(self) -> list:
+        """files the execution series are drawn from: the invocations, and the durations and memory
+        that decide the sampled runtimes and which functions are kept"""
+        loader = self.data_loader
+        return [self.__inv_path()] + [os.path.join(self.data_path, files[self.day_id-1]) for files in [loader.dur_files, loader.mem_files]]
+    
+    def __load_runs(self) -> bool:
+        """load the execution series saved as runs, functions without properties are dropped
+
+        Returns:
+            bool: False if there is no up-to-date file
+        """
+        loaded = ExecutionRuns.load(self.__exec_path("npz"), [self.__inv_path()])
+        if loaded is None:
+            return False
+        [names, runs] = loaded
+        func_ids = self.ids.encode_funcs(*names)
+        order = np.flatnonzero(func_ids >= 0)
+        order = order[np.argsort(func_ids[order], kind='stable')]
+        runs = runs.take(order)
+        runs.row_id = func_ids[order]
+        self.exe_runs = runs
+        return True
+    
+    def __store_path(self) -> str:
+        """the series are drawn from the seed, each seed has its own store (seed 0 keeps the name of older stores)"""
+        suffix = "" if self.seed == 0 else "_seed{}".format(self.seed)
+        return os.path.join(self.data_path, "execution_store_{}{}".format(self.day_id, suffix))
+    
+    def __open_store(self) -> bool:
+        """open the execution series store, exe_mat is memory mapped if the rows are the known functions in order
+
+        Returns:
+            bool: False if there is no up-to-date store
+        """
+        store = ExecutionStore.open(self.__store_path(), self.__series_sources())
+        if store is None or store.meta.get("seed") != self.seed: # out of date, or drawn with another seed
+            return False
+        func_ids = self.ids.encode_funcs(*store.names)
+        if (func_ids >= 0).all() and (np.diff(func_ids) > 0).all():
+            [self.exe_func, self.exe_mat] = [func_ids, store.matrix]
+        else: # properties changed since the save, read the known functions in order
+            order = np.flatnonzero(func_ids >= 0)
+            order = order[np.argsort(func_ids[order], kind='stable')]
+            [self.exe_func, self.exe_mat] = [func_ids[order], store.read(order)]
+        return True
+    
+    def __save_store(self) -> None:
+        ExecutionStore.save(self.__store_path(), self.ids.decode_funcs(self.exe_func), self.exe_mat,
+                            meta={"day": self.day_id, "seed": self.seed}, sources=self.__series_sources())
+        self.__open_store()
+    
+    def exec_window(self, app_ids=None, lo=0, hi=None) -> list:
+        """part of the execution series, with a memory mapped store only the rows and minutes asked are read
+
+        Args:
+            app_ids (ndarray): apps to read, all apps if None
+            lo, hi (int): minute window [lo, hi)
+
+        Returns:
+            list: [function id of each row, execution series (row x minute)]
+        """
+        if app_ids is None:
+            return [self.exe_func, np.array(self.exe_mat[:, lo:hi])]
+        rows = np.flatnonzero(np.isin(self.ids.func_app[self.exe_func], app_ids))
+        return [self.exe_func[rows], self.exe_mat[rows, lo:hi]]
 
     def prepare(self):
         print("[P_{}] Getting execution series...".format(self.day_id))
-        # exec_ = f"invocations_per_function_md.anon.d{i:02}.csv"
-        # if exec_ in self.data_loader.inv_files:
-        exec_ = "execution_series_{}.csv".format(self.day_id)
-        if exec_ in self.data_loader.exec_files:
+        if self.__open_store():
+            print("[P_{}] Opening execution series store...".format(self.day_id))
+        elif self.seed == 0 and self.__load_runs(): # series saved as runs before the store, drawn with seed 0
+            print("[P_{}] Loading execution series from runs...".format(self.day_id))
+            self.__save_store()
+        elif self.seed == 0 and os.path.exists(self.__exec_path("csv")): # series saved before the run-length format
             print("[P_{}] Loading execution series from CSV...".format(self.day_id))
-            self.exe_raw = pd.read_csv(os.path.join(self.data_path, exec_)).set_index(["HashOwner", "HashApp", "HashFunction"]).sort_index()
+            self.exe_raw = pd.read_csv(self.__exec_path("csv")).set_index(["HashOwner", "HashApp", "HashFunction"])
             # self.exe_raw[:] = self.exe_raw[:].values.astype(bool) # for raw dataset
+            self.__save_store()
         else:
             print("[P_{}] Generating series from dataset...".format(self.day_id))
-            self.inv_raw = pd.read_csv(os.path.join(self.data_path, self.data_loader.inv_files[self.day_id-1]))
+            self.__read_invocations()
             self.__gen_invoc_series()
+        self.keep_alive_eval = None
+        self.instance_eval = None
+        self.app_mem = None
         print("[P_{}] Series getting SUCCESS!".format(self.day_id))
         
         
     def run_app(self, intv):
-        cold_rate = []
-        mem_rate = []
-
-        owner_lst = self.exe_raw.index.get_level_values(0).unique().values
-        with tqdm(total=len(owner_lst)) as pbar:
-            for owner in owner_lst:
-                pbar.update(1)
-                
-                app_lst = self.exe_raw.loc[owner].index.get_level_values(0).unique().values
-                for app in app_lst:
-                    # ipdb.set_trace()
-                    # func_exec_series = self.exe_raw[i].loc[owner, app].iloc[:, 1:].values
-                    exec_series = np.max(self.exe_raw.loc[owner, app].iloc[:, 1:].values, axis=0)
-                    
-                    simApp = FixIntervalsimApp(intv, exec_series)
-                    if not simApp.never_launch:
-                        cold_rate.append(simApp.cold_start_rate)
-                        mem_rate.append(simApp.mem_waste_rate)
-        # cold_start_rate_lst.append(cold_rate)
-        # wasted_mem_rate_lst.append(mem_rate)
-
-        return [cold_rate, mem_rate]
-        # ipdb.set_trace()
-
-    def run_sys(self, arg_lst):
-        app_exe_raw = self.exe_raw.reset_index().groupby(["HashOwner", "HashApp"]).max().sort_index().iloc[:, 1:]
-        app_name_list = app_exe_raw.reset_index().iloc[:, :2].values
-        app_mem_list = np.array([self.__generate_app_mem(app) for app in app_name_list])
+        """fixed keep alive interval, each app simulated on its own
+
+        Returns:
+            list: [cold start rates, memory waste rates] of the launched apps
+        """
+        if self.keep_alive_eval is None: # idle gaps are extracted once for all intervals
+            [app_ids, app_exe] = self.ids.app_max(self.exe_func, self.exe_mat)
+            self.keep_alive_eval = FixIntervalEvaluator(app_exe[:, 1:])
+        return self.keep_alive_eval.evaluate(intv)
+    
+    def run_app_sweep(self, intv_lst):
+        """
+        Returns:
+            list: [cold start rates, memory waste rates], one list per interval of intv_lst
+        """
+        result = [self.run_app(intv) for intv in intv_lst]
+        return [[r[0] for r in result], [r[1] for r in result]]
+
+    def run_instances(self, intv_lst):
+        """fixed keep alive intervals of every instance, apps run one instance per concurrent execution
+
+        Returns:
+            list: [cold start rates, memory waste rates], one list per interval of intv_lst
+        """
+        if self.instance_eval is None: # instances are counted once for all intervals
+            [app_ids, demand, n_invoc] = self.instance_demand()
+            self.instance_eval = [app_ids, InstanceEvaluator(demand, n_invoc)]
+        result = [self.instance_eval[1].evaluate(intv) for intv in intv_lst]
+        return [[r[0] for r in result], [r[1] for r in result]]
+    
+    def instance_memory(self, intv):
+        """
+        Returns:
+            ndarray: memory held by the warm instances at each minute, each instance holds the memory of its app
+        """
+        if self.instance_eval is None:
+            self.run_instances([])
+        [app_ids, evaluator] = self.instance_eval
+        return evaluator.memory(intv, self.app_mem_by_id()[app_ids])
+
+    def app_memory(self) -> list:
+        """memory of the apps with execution series, drawn once for the day from the start of the memory stream,
+        so that every run on this simulator, whatever the order of the calls, sees the same memory
+
+        Returns:
+            list: [app ids in the order of app_max, memory of each app]
+        """
+        if self.app_mem is None:
+            app_ids = np.unique(self.ids.func_app[self.exe_func])
+            self.app_mem = [app_ids, self.sampler.draw_app_mem(app_ids, self.sampler.memory_stream().random(len(app_ids)))]
+        return self.app_mem
+
+    def run_sys(self, arg_lst, telemetry_path=None, oracle=False):
+        """simulate all memory sizes of arg_lst together in a single pass over the day
+
+        Args:
+            arg_lst (list): memory sizes
+            telemetry_path (str): npz file of the per-minute Telemetry of the run, not recorded if None
+            oracle (bool): evict the apps invoked again furthest in the future (BeladysimSys) 
+                           instead of the greedy priority, an offline heuristic, not a bound of the greedy priority
 
+        Returns:
+            list: [cold start rates, memory waste rates], one list per memory size
+        """
+        [app_ids, app_exe] = self.ids.app_max(self.exe_func, self.exe_mat)
+        app_mem_list = self.app_memory()[1]
+        exe_by_minute = np.ascontiguousarray(app_exe.T) # one row per minute
+
+        if oracle:
+            simSys = BeladysimSys(app_ids, app_mem_list, exe_by_minute, n_policy=len(arg_lst))
+        else:
+            simSys = GreedysimSys(app_ids, app_mem_list, n_policy=len(arg_lst))
+        simSys.total_mem = arg_lst
+        
+        # simSys = FixIntervalsimSys(app_ids, n_policy=len(arg_lst))
+        # simSys.keep_alive_interval = arg_lst
+        if telemetry_path is not None:
+            simSys.telemetry = Telemetry(self.day_len, len(arg_lst))
+        for i in trange(self.day_len):
+            if not simSys.update(exe_by_minute[i]):
+                print("System Memory Overflow!")
+                break
+        if telemetry_path is not None:
+            simSys.telemetry.save(telemetry_path, meta={"day": self.day_id, "seed": self.seed, "arg_lst": list(arg_lst)})
+        
+        return [simSys.cal_cold_rate(), simSys.cal_mem_waste()]
+    
+    def run_cluster(self, arg_lst, n_node, placement, telemetry_path=None):
+        """simulate all memory sizes of arg_lst together on a cluster of n_node nodes, see ClustersimSys
+
+        Args:
+            arg_lst (list): memory sizes of the whole cluster
+            n_node (int): number of nodes, each holds memory size / n_node
+            placement: FirstFit, BestFit or OwnerHashRing of util.Placement, owners are hashed by name
+            telemetry_path (str): npz file of the per-minute Telemetry of the run, not recorded if None
+
+        Returns:
+            list: [cold start rates, memory waste rates, per-node metrics, cluster-wide metrics],
+                  one list per memory size and frames indexed by policy as in ClustersimSys
+        """
+        [app_ids, app_exe] = self.ids.app_max(self.exe_func, self.exe_mat)
+        app_mem_list = self.app_memory()[1]
+        exe_by_minute = np.ascontiguousarray(app_exe.T)
 
+        simSys = ClustersimSys(app_ids, app_mem_list, placement, n_node, 
+                               app_key=self.ids.owner_name[self.ids.app_owner[app_ids]], n_policy=len(arg_lst))
+        simSys.total_mem = arg_lst
+        if telemetry_path is not None:
+            simSys.telemetry = Telemetry(self.day_len, len(arg_lst))
+        for i in trange(self.day_len):
+            if not simSys.update(exe_by_minute[i]):
+                print("System Memory Overflow!")
+                break
+        if telemetry_path is not None:
+            simSys.telemetry.save(telemetry_path, meta={"day": self.day_id, "seed": self.seed, "arg_lst": list(arg_lst), 
+                                                        "n_node": n_node, "placement": type(placement).__name__})
+        
+        return [simSys.cal_cold_rate(), simSys.cal_mem_waste(), simSys.node_stats(), simSys.cluster_stats()]
+
+    def app_mem_by_id(self):
+        """
+        Returns:
+            ndarray: randomly allocated memory of every app id, 0 for the apps without execution series
+        """
+        [app_ids, app_mem] = self.app_memory()
+        app_mem_list = np.zeros(self.ids.n_app, dtype=np.int64)
+        app_mem_list[app_ids] = app_mem
+        return app_mem_list
+    
+    def run_events(self, policies, sub_minute=False):
+        """simulate each policy with the discrete-event engine, 
+        e.g. [GreedyMemoryPolicy(arg, app_mem_by_id()) for arg in arg_lst]
+
+        Args:
+            policies (list): KeepAlivePolicy or GreedyMemoryPolicy of each run
+            sub_minute (bool): use the drawn runtimes of the invocations instead of the minute series
+
+        Returns:
+            list: [cold start rates, memory waste rates], one list per policy
+        """
+        spans = self.exec_spans(sub_minute)
         cold_rate_lst = []
         mem_rate_lst = []
-        for idx, arg in enumerate(arg_lst):
-            simSys = GreedysimSys(app_name_list, app_mem_list)
-            simSys.total_mem = arg
-            
-            # simSys = FixIntervalsimSys(app_name_list)
-            # simSys.keep_alive_interval = arg
-            for i in trange(self.day_len):
-                t = i + 1
-                exec_now = app_exe_raw[str(t)].values
-                if not simSys.update(exec_now):
-                    print("System Memory Overflow!")
-                    break
-            cold_rate_lst.append(simSys.cal_cold_rate())
-            mem_rate_lst.append(simSys.cal_mem_waste())
-        
-        return [cold_rate_lst, mem_rate_lst]
\ No newline at end of file
+        for policy in policies:
+            engine = EventEngine(self.ids.n_app, policy, horizon=self.day_len).run(*spans)
+            cold_rate_lst.append(engine.cal_cold_rate())
+            mem_rate_lst.append(engine.cal_mem_waste())
+        
+        return [cold_rate_lst, mem_rate_lst]
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import json
+from util.Properties import atomic_write
+
+
+class Telemetry():
+    """per-minute time series of a system simulation, one column per policy of a sweep
+
+    Rows are preallocated for n_tick minutes and doubled when a longer run goes past them.
+    Columns:
+        memory: memory held by the launched apps (0 without memory model)
+        busy_apps, idle_apps: launched apps running / not running at the end of the minute
+        cold_starts: apps launched by an invocation
+        evictions: apps shut down by the policy (evicted or timed out)
+        rejected: invocations dropped for lack of memory
+    """
+
+    version = 1
+    columns = ["memory", "busy_apps", "idle_apps", "cold_starts", "evictions", "rejected"]
+
+    def __init__(self, n_tick=1440, n_policy=1) -> None:
+        self.n_tick = 0
+        self.series = {col: np.zeros((n_tick, n_policy), dtype=np.int64) for col in self.columns}
+
+    def record(self, memory, busy_apps, idle_apps, cold_starts, evictions, rejected) -> None:
+        """append one minute, each value is a scalar or one value per policy"""
+        if self.n_tick == len(self.series["memory"]):
+            self.series = {col: np.concatenate([value, np.zeros_like(value)]) for col, value in self.series.items()}
+        row = self.n_tick
+        self.series["memory"][row] = memory
+        self.series["busy_apps"][row] = busy_apps
+        self.series["idle_apps"][row] = idle_apps
+        self.series["cold_starts"][row] = cold_starts
+        self.series["evictions"][row] = evictions
+        self.series["rejected"][row] = rejected
+        self.n_tick += 1
+
+    def __getitem__(self, col):
+        """
+        Returns:
+            ndarray: recorded minutes of a column, minute x policy
+        """
+        return self.series[col][:self.n_tick]
+
+    def select(self, policies):
+        """
+        Args:
+            policies (list): columns kept, e.g. one parameter of a batched sweep
+
+        Returns:
+            Telemetry: the recorded minutes of these policies
+        """
+        telemetry = Telemetry(self.n_tick, len(policies))
+        telemetry.series = {col: self[col][:, policies].copy() for col in self.columns}
+        telemetry.n_tick = self.n_tick
+        return telemetry
+
+    def to_frame(self) -> pd.DataFrame:
+        """recorded minutes as a frame indexed by [Minute, Policy]"""
+        n_policy = self.series["memory"].shape[1]
+        index = pd.MultiIndex.from_product([range(self.n_tick), range(n_policy)], names=["Minute", "Policy"])
+        return pd.DataFrame({col: self[col].ravel() for col in self.columns}, index=index)
+
+    def save(self, path, meta=None) -> None:
+        """save the recorded minutes as an npz file, each column in the smallest integer type holding it
+
+        Args:
+            path (str): output file
+            meta (dict): extra metadata, e.g. the parameter of each policy
+        """
+        meta = dict(meta or {}, version=self.version)
+        with atomic_write(path) as f:
+            np.savez(f, meta=np.array(json.dumps(meta)),
+                     **{col: self[col].astype(np.promote_types(np.min_scalar_type(self[col].max(initial=0)),
+                                                               np.min_scalar_type(self[col].min(initial=0))))
+                        for col in self.columns})
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns:
+            list: [Telemetry, meta] saved by save, None if the file is of another version
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if meta["version"] != cls.version:
+                return None
+            series = {col: npz[col].astype(np.int64) for col in cls.columns}
+        telemetry = cls(len(series["memory"]), series["memory"].shape[1])
+        telemetry.series = series
+        telemetry.n_tick = len(series["memory"])
+        return [telemetry, meta]